@@ -48,7 +48,15 @@ from .event.message import (
     MessageEvent,
     TempMessage,
 )
-from .event.mirai import FriendEvent, GroupEvent
+from .event.mirai import (
+    BotLeaveEventActive,
+    BotLeaveEventDisband,
+    BotLeaveEventKick,
+    FriendEvent,
+    GroupEvent,
+    MemberLeaveEventKick,
+    MemberLeaveEventQuit,
+)
 from .exception import AriadneConfigurationError, UnknownTarget
 from .message import Source
 from .message.chain import MessageChain, MessageContainer
@@ -82,6 +90,8 @@ from .util import (
     loguru_exc_callback,
     loguru_exc_callback_async,
 )
+from .util.archive import MessageArchive
+from .util.cache import CacheConfig, CacheWarmup, MessageCache, RelationshipCache
 
 if TYPE_CHECKING:
     from .message.element import Image, Voice
@@ -185,6 +195,8 @@ class Ariadne:
         self,
         connection: Iterable[U_Info] = (),
         log_config: Optional[LogConfig] = None,
+        cache_config: Optional[CacheConfig] = None,
+        archive: Optional[MessageArchive] = None,
     ) -> None:
         """针对单个账号初始化 Ariadne 实例.
 
@@ -193,6 +205,8 @@ class Ariadne:
         Args:
             connection (Iterable[U_Info]): 连接信息, 通过 `graia.ariadne.connection.config` 生成
             log_config (Optional[LogConfig], optional): 日志配置
+            cache_config (Optional[CacheConfig], optional): 缓存配置
+            archive (Optional[MessageArchive], optional): 本地消息存档, 可由多个账号共享
 
         Returns:
             None: 无返回值
@@ -214,6 +228,30 @@ class Ariadne:
             account
         )
         self.log_config: LogConfig = log_config or LogConfig()
+        self.cache_config: CacheConfig = cache_config or CacheConfig()
+        self.relationship_cache: RelationshipCache = RelationshipCache(
+            self.cache_config.relationship_ttl, self.cache_config.relationship_max_size
+        )
+        """好友, 群组与群成员缓存"""
+        self.message_cache: MessageCache = MessageCache(
+            self.cache_config.message_ttl,
+            self.cache_config.message_max_size,
+            self.cache_config.message_max_bytes,
+            self.cache_config.message_compress_threshold,
+        )
+        """消息缓存"""
+        self.cache_warmup: Optional[CacheWarmup] = (
+            CacheWarmup(self, self.cache_config.warmup) if self.cache_config.warmup else None
+        )
+        """缓存预热任务, 由 `ElizabethService` 在账号启动后开始"""
+        self.archive: Optional[MessageArchive] = archive
+        """本地消息存档"""
+        if archive is not None:
+            registered = Ariadne.launch_manager.launchables.get(archive.id)
+            if registered is None:
+                Ariadne.launch_manager.add_launchable(archive)
+            elif registered is not archive:
+                raise AriadneConfigurationError(f"Another archive is already using {archive.path}")
         self.connection.add_callback(self.log_config.event_hook(self))
         self.connection.add_callback(self._event_hook)
 
@@ -221,44 +259,49 @@ class Ariadne:
         with ExitStack() as stack:
             stack.enter_context(enter_context(self, event))
             sys.audit("AriadnePostRemoteEvent", event)
-            cache_set = self.launch_manager.get_interface(Memcache).set
 
             if isinstance(event, (MessageEvent, ActiveMessage)):
-                await cache_set(f"account.{self.account}.message.{int(event)}", event)
                 if not event.message_chain:
                     event.message_chain.append("<! 不支持的消息类型 !>")
+                data: Optional[bytes] = self.message_cache.set(event)
+                if self.archive is not None:
+                    if self.archive.compress_threshold != self.message_cache.compress_threshold:
+                        data = None  # 压缩阈值不同, 由存档重新编码
+                    self.archive.add(self.account, event, data)
 
             if isinstance(event, FriendEvent):
                 stack.enter_context(enter_message_send_context(UploadMethod.Friend))
 
                 friend: Optional[Friend] = getattr(event, "sender", None) or getattr(event, "friend", None)
                 if friend:
-                    await cache_set(f"account.{self.account}.friend.{int(friend)}", friend)
+                    self.relationship_cache.set_friends((friend,))
 
             elif isinstance(event, GroupEvent):
                 stack.enter_context(enter_message_send_context(UploadMethod.Group))
-                group: Optional[Group] = None
-
-                member: Optional[Member] = getattr(event, "sender", None) or getattr(event, "member", None)
-                if member:
-                    group = member.group
-                    await asyncio.gather(
-                        cache_set(f"account.{self.account}.group.{int(group)}", group),
-                        cache_set(f"account.{self.account}.group.{int(group)}.member.{int(member)}", member),
-                    )
-
-                member: Optional[Member] = getattr(event, "operator", None) or getattr(event, "inviter", None)
-                if member:
-                    if not group:
-                        group = member.group
-                        await cache_set(f"account.{self.account}.group.{int(group)}", group)
-                    await cache_set(f"account.{self.account}.group.{int(group)}.member.{int(member)}", member)
-
-                if not group and (group := getattr(event, "group", None)):
-                    await cache_set(f"account.{self.account}.group.{int(group)}", group)
+                members: List[Member] = [
+                    member
+                    for attr in ("sender", "member", "operator", "inviter")
+                    if isinstance(member := getattr(event, attr, None), Member)
+                ]
+                if members:
+                    self.relationship_cache.set_members(members)
+                elif group := getattr(event, "group", None):
+                    self.relationship_cache.set_groups((group,))
+
+                if isinstance(event, (BotLeaveEventActive, BotLeaveEventKick, BotLeaveEventDisband)):
+                    self.relationship_cache.delete_group(int(event.group))
+                elif isinstance(event, (MemberLeaveEventKick, MemberLeaveEventQuit)):
+                    self.relationship_cache.delete_member(int(event.member.group), int(event.member))
 
             self.service.broadcast.postEvent(event)
 
+    async def _find_message(self, message_id: int) -> Optional[Union[MessageEvent, ActiveMessage]]:
+        """从消息缓存与本地消息存档中查找消息"""
+        if event := self.message_cache.get(message_id):
+            return event
+        if self.archive is not None:
+            return await self.archive.get(self.account, message_id)
+
     @classmethod
     def _patch_launch_manager(cls) -> None:
         from graia.amnesia.builtins.aiohttp import AiohttpClientInterface
@@ -1048,11 +1091,9 @@ class Ariadne:
         if tuple(map(int, (await self.get_version(cache=True)).split("."))) >= (2, 6, 0):
             if target is not None:
                 pass
-            elif (
-                event := await self.launch_manager.get_interface(Memcache).get(
-                    f"account.{self.account}.message.{int(message)}"
-                )
-            ) and isinstance(event, (GroupMessage, ActiveGroupMessage)):
+            elif (event := await self._find_message(int(message))) and isinstance(
+                event, (GroupMessage, ActiveGroupMessage)
+            ):
                 return await self.set_essence(event)
             elif (
                 target := await DispatcherInterface.ctx.get().lookup_param("target", Optional[Group], None)
@@ -1246,8 +1287,7 @@ class Ariadne:
             )
         ]
 
-        cache_set = self.launch_manager.get_interface(Memcache).set
-        await asyncio.gather(*(cache_set(f"account.{self.account}.friend.{int(i)}", i) for i in result))
+        self.relationship_cache.set_friends(result)
         return result
 
     @overload
@@ -1297,15 +1337,12 @@ class Ariadne:
             Friend: 操作成功, 你得到了你应得的.
             None: 未能获取到.
         """
-        cache_get = self.launch_manager.get_interface(Memcache).get
-        key = f"account.{self.account}.friend.{friend_id}"
-
-        if cache and (friend := await cache_get(key)):
+        if cache and (friend := self.relationship_cache.get_friend(friend_id)):
             return friend
 
         await self.get_friend_list()
 
-        if friend := await cache_get(key):
+        if friend := self.relationship_cache.get_friend(friend_id):
             return friend
 
         if assertion:
@@ -1327,8 +1364,7 @@ class Ariadne:
             )
         ]
 
-        cache_set = self.launch_manager.get_interface(Memcache).set
-        await asyncio.gather(*(cache_set(f"account.{self.account}.group.{int(i)}", i) for i in result))
+        self.relationship_cache.set_groups(result)
         return result
 
     @overload
@@ -1378,15 +1414,12 @@ class Ariadne:
             Group: 操作成功, 你得到了你应得的.
             None: 未能获取到.
         """
-        cache_get = self.launch_manager.get_interface(Memcache).get
-        key = f"account.{self.account}.group.{group_id}"
-
-        if cache and (group := await cache_get(key)):
+        if cache and (group := self.relationship_cache.get_group(group_id)):
             return group
 
         await self.get_group_list()
 
-        if group := await cache_get(key):
+        if group := self.relationship_cache.get_group(group_id):
             return group
 
         if assertion:
@@ -1415,12 +1448,9 @@ class Ariadne:
             )
         ]
 
-        cache_set = self.launch_manager.get_interface(Memcache).set
-
-        await asyncio.gather(
-            cache_set(f"account.{self.account}.group.{group_id}", result[0].group),
-            *(cache_set(f"account.{self.account}.group.{group_id}.member.{int(i)}", i) for i in result),
-        )
+        # the fetched list is complete, so members that left are dropped from the cache
+        self.relationship_cache.delete_members(group_id)
+        self.relationship_cache.set_members(result)
 
         return result
 
@@ -1436,11 +1466,9 @@ class Ariadne:
         Returns:
             Member: 对应群成员对象
         """
-        interface = self.launch_manager.get_interface(Memcache)
         group_id = int(group)
-        key = f"account.{self.account}.group.{group_id}.member.{member_id}"
 
-        if cache and (member := await interface.get(key)):
+        if cache and (member := self.relationship_cache.get_member(group_id, member_id)):
             return member
 
         result = Member.parse_obj(
@@ -1454,9 +1482,7 @@ class Ariadne:
             )
         )
 
-        await asyncio.gather(
-            interface.set(f"account.{self.account}.group.{group_id}", result), interface.set(key, result)
-        )
+        self.relationship_cache.set_members((result,))
 
         return result
 
@@ -1566,9 +1592,7 @@ class Ariadne:
         if tuple(map(int, (await self.get_version(cache=True)).split("."))) >= (2, 6, 0):
             if target is not None:
                 pass
-            elif event := await self.launch_manager.get_interface(Memcache).get(
-                f"account.{self.account}.message.{message}"
-            ):
+            elif event := await self._find_message(int(message)):
                 return event
             elif (
                 target := await DispatcherInterface.ctx.get().lookup_param(
@@ -1640,7 +1664,7 @@ class Ariadne:
                     CallMethod.POST,
                     {
                         "target": int(target),
-                        "messageChain": message.dict()["__root__"],
+                        "messageChain": message.to_wire(),
                         **({"quote": quote} if quote else {}),
                     },
                 )
@@ -1649,6 +1673,8 @@ class Ariadne:
                     source=Source(id=result["messageId"], time=datetime.now()),
                     subject=(await self.get_friend(int(target), assertion=True, cache=True)),
                 )
+                if self.archive is not None:
+                    self.archive.add(self.account, event)
                 with enter_context(self, event):
                     await self.log_config.log(self, event)
                     self.service.broadcast.postEvent(event)
@@ -1656,9 +1682,7 @@ class Ariadne:
                     logger.warning("Failed to send message, your account may be blocked.")
                 return event
             except UnknownTarget:
-                await self.launch_manager.get_interface(Memcache).delete(
-                    f"account.{self.account}.friend.{int(target)}"
-                )
+                self.relationship_cache.delete_friend(int(target))
                 raise
 
     @ariadne_api
@@ -1714,7 +1738,7 @@ class Ariadne:
                     CallMethod.POST,
                     {
                         "target": int(target),
-                        "messageChain": message.dict()["__root__"],
+                        "messageChain": message.to_wire(),
                         **({"quote": quote} if quote else {}),
                     },
                 )
@@ -1723,6 +1747,8 @@ class Ariadne:
                     source=Source(id=result["messageId"], time=datetime.now()),
                     subject=(await self.get_group(int(target), assertion=True, cache=True)),
                 )
+                if self.archive is not None:
+                    self.archive.add(self.account, event)
                 with enter_context(self, event):
                     await self.log_config.log(self, event)
                     self.service.broadcast.postEvent(event)
@@ -1730,9 +1756,7 @@ class Ariadne:
                     logger.warning("Failed to send message, your account may be blocked.")
                 return event
             except UnknownTarget:
-                await self.launch_manager.get_interface(Memcache).delete(
-                    f"account.{self.account}.group.{int(target)}"
-                )
+                self.relationship_cache.delete_group(int(target))
                 raise
 
     @ariadne_api
@@ -1796,7 +1820,7 @@ class Ariadne:
                     {
                         "group": int(group),
                         "qq": int(target),
-                        "messageChain": new_msg.dict()["__root__"],
+                        "messageChain": new_msg.to_wire(),
                         **({"quote": quote} if quote else {}),
                     },
                 )
@@ -1805,6 +1829,8 @@ class Ariadne:
                     source=Source(id=result["messageId"], time=datetime.now()),
                     subject=(await self.get_member(int(group), int(target), cache=True)),
                 )
+                if self.archive is not None:
+                    self.archive.add(self.account, event)
                 with enter_context(self, event):
                     await self.log_config.log(self, event)
                     self.service.broadcast.postEvent(event)
@@ -1812,9 +1838,7 @@ class Ariadne:
                     logger.warning("Failed to send message, your account may be limited.")
                 return event
             except UnknownTarget:
-                await self.launch_manager.get_interface(Memcache).delete(
-                    f"account.{self.account}.group.{int(group)}.member.{int(target)}"
-                )
+                self.relationship_cache.delete_member(int(group), int(target))
                 raise
 
     @overload
@@ -2008,9 +2032,7 @@ class Ariadne:
         if tuple(map(int, (await self.get_version(cache=True)).split("."))) >= (2, 6, 0):
             if target is not None:
                 pass
-            elif event := await self.launch_manager.get_interface(Memcache).get(
-                f"account.{self.account}.message.{int(message)}"
-            ):
+            elif event := await self._find_message(int(message)):
                 return await self.recall_message(event)
             elif (
                 target := await DispatcherInterface.ctx.get().lookup_param(
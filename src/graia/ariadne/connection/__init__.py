@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+from collections import deque
 from typing import (
     TYPE_CHECKING,
     Any,
     Awaitable,
     Callable,
     ClassVar,
+    Deque,
     Dict,
     Generic,
+    Hashable,
     List,
     Optional,
     Set,
@@ -18,10 +22,12 @@ from graia.amnesia.transport.common.status import (
     ConnectionStatus as BaseConnectionStatus,
 )
 from launart import ExportInterface, Launchable, LaunchableStatus
+from loguru import logger
 from statv import Stats
 from typing_extensions import Self
 
 from ..event import MiraiEvent
+from ..typing import MaybeFlag, Sentinel
 from ..util import camel_to_snake
 from ._info import (
     HttpClientInfo,
@@ -29,9 +35,16 @@ from ._info import (
     T_Info,
     U_Info,
     WebsocketClientInfo,
+    WebsocketPoolInfo,
     WebsocketServerInfo,
 )
-from .util import CallMethod
+from .util import (
+    COALESCED_COMMANDS,
+    COALESCED_METHODS,
+    CallMethod,
+    EventQueueConfig,
+    EventQueuePolicy,
+)
 
 if TYPE_CHECKING:
     from ..service import ElizabethService
@@ -44,6 +57,18 @@ class ConnectionStatus(BaseConnectionStatus, LaunchableStatus):
 
     def __init__(self) -> None:
         self._session_key: Optional[str] = None
+        self.queue_depth: int = 0
+        """事件队列中等待处理的事件数"""
+        self.dropped_events: Dict[str, int] = {}
+        """因事件队列已满而被丢弃的事件数, 以事件类型分类"""
+        self.timed_out_calls: int = 0
+        """超时未收到响应的 API 调用数"""
+        self.coalesced_calls: int = 0
+        """与进行中的相同调用合并, 未单独发出的 API 调用数"""
+        self.reconnect_attempts: int = 0
+        """连续重连失败的次数"""
+        self.circuit_open: bool = False
+        """是否因连续重连失败而进入熔断状态"""
         super().__init__()
 
     @property
@@ -67,11 +92,152 @@ class ConnectionStatus(BaseConnectionStatus, LaunchableStatus):
                     f"alive={self.alive}",
                     f"verified={self.session_key is not None}",
                     f"stage={self.stage}",
+                    f"queue_depth={self.queue_depth}",
+                    f"dropped={sum(self.dropped_events.values())}",
+                    f"circuit_open={self.circuit_open}",
                 ]
             )
         )
 
 
+class EventQueue:
+    """连接读取端与事件回调之间的有界事件队列"""
+
+    connection: ConnectionMixin
+    config: EventQueueConfig
+
+    def __init__(self, connection: ConnectionMixin, config: EventQueueConfig) -> None:
+        """初始化事件队列
+
+        Args:
+            connection (ConnectionMixin): 所属的连接, 事件会被交给其 `event_callbacks` 处理
+            config (EventQueueConfig): 队列配置
+        """
+        self.connection = connection
+        self.config = config
+        self.policy = EventQueuePolicy(config.policy)
+        self.droppable = frozenset(config.droppable)
+        self.events: Deque[MiraiEvent] = deque()
+        self.consumers: List[asyncio.Task] = []
+        self.processing: int = 0
+        """正在交给事件回调处理的事件数"""
+        self._not_empty: asyncio.Event = asyncio.Event()
+        self._not_full: asyncio.Event = asyncio.Event()
+        self._drained: asyncio.Event = asyncio.Event()
+        self._not_full.set()
+        self._drained.set()
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    @property
+    def full(self) -> bool:
+        """队列是否已满"""
+        return 0 < self.config.size <= len(self.events)
+
+    def _update_depth(self) -> None:
+        self.connection.status.queue_depth = len(self.events)
+        if self.full:
+            self._not_full.clear()
+        else:
+            self._not_full.set()
+        if self.events:
+            self._not_empty.set()
+        else:
+            self._not_empty.clear()
+        if self.events or self.processing:
+            self._drained.clear()
+        else:
+            self._drained.set()
+
+    def _drop(self, event: MiraiEvent) -> None:
+        dropped = self.connection.status.dropped_events
+        dropped[event.type] = dropped.get(event.type, 0) + 1
+        logger.warning(f"Event queue of {self.connection.id} is full, dropped {event.type}")
+
+    def _make_room(self, event: MiraiEvent) -> bool:
+        """在队列已满时按策略腾出空间
+
+        Returns:
+            bool: 新事件是否仍应入队
+        """
+        if self.policy is EventQueuePolicy.DROP_OLDEST:
+            self._drop(self.events.popleft())
+        elif self.policy is EventQueuePolicy.DROP_BY_TYPE:
+            if event.type in self.droppable:
+                self._drop(event)
+                return False
+            for queued in self.events:
+                if queued.type in self.droppable:
+                    self.events.remove(queued)
+                    self._drop(queued)
+                    break
+        return True
+
+    async def put(self, event: MiraiEvent) -> None:
+        """将事件放入队列, 在 `BLOCK` 策略 (或没有可丢弃的事件) 下队列已满时等待
+
+        Args:
+            event (MiraiEvent): 事件
+        """
+        self.start()
+        if self.full and not self._make_room(event):
+            return
+        while self.full:
+            await self._not_full.wait()
+        self.events.append(event)
+        self._update_depth()
+
+    async def consume(self) -> None:
+        """持续从队列中取出事件并交给连接的事件回调"""
+        while True:
+            while not self.events:
+                await self._not_empty.wait()
+            event = self.events.popleft()
+            self.processing += 1
+            self._update_depth()
+            try:
+                await asyncio.gather(*(callback(event) for callback in self.connection.event_callbacks))
+            except Exception as e:
+                logger.exception(e)
+            finally:
+                self.processing -= 1
+                self._update_depth()
+
+    def start(self) -> None:
+        """启动消费任务 (若尚未启动)"""
+        if self.consumers:
+            return
+        self._update_depth()
+        self.consumers = [
+            asyncio.create_task(self.consume(), name=f"{self.connection.id}.consumer.{i}")
+            for i in range(max(self.config.consumers, 1))
+        ]
+
+    def stop(self) -> None:
+        """停止消费任务, 队列中的事件会被保留"""
+        for task in self.consumers:
+            task.cancel()
+        self.consumers = []
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """等待队列中的事件处理完毕后停止消费任务, 超时后未处理的事件会被保留
+
+        Args:
+            timeout (Optional[float], optional): 最长等待时间 (秒), 默认使用 `EventQueueConfig.drain_timeout`
+        """
+        timeout = self.config.drain_timeout if timeout is None else timeout
+        if self.consumers and not self._drained.is_set():
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Event queue of {self.connection.id} is not drained in {timeout}s, "
+                    f"{len(self.events) + self.processing} events left"
+                )
+        self.stop()
+
+
 class ConnectionMixin(Launchable, Generic[T_Info]):
     status: ConnectionStatus
     info: T_Info
@@ -79,6 +245,9 @@ class ConnectionMixin(Launchable, Generic[T_Info]):
 
     fallback: Optional["HttpClientConnection"]
     event_callbacks: List[Callable[[MiraiEvent], Awaitable[Any]]]
+    event_queue: EventQueue
+    coalesced_commands: Set[str]
+    coalescing: Dict[Hashable, asyncio.Task]
 
     @property
     def required(self) -> Set[str | type[ExportInterface]]:
@@ -101,6 +270,19 @@ class ConnectionMixin(Launchable, Generic[T_Info]):
         self.fallback = None
         self.event_callbacks = []
         self.status = ConnectionStatus()
+        self.event_queue = EventQueue(self, info.event_queue)
+        self.coalesced_commands = set(COALESCED_COMMANDS)
+        """合并相同并发调用的命令, 可增删以按命令配置"""
+        self.coalescing = {}
+        """进行中的可合并调用"""
+
+    async def dispatch(self, event: MiraiEvent) -> None:
+        """将事件放入事件队列, 由消费任务调用事件回调
+
+        Args:
+            event (MiraiEvent): 事件
+        """
+        await self.event_queue.put(event)
 
     async def call(
         self,
@@ -109,6 +291,7 @@ class ConnectionMixin(Launchable, Generic[T_Info]):
         params: Optional[dict] = None,
         *,
         in_session: bool = True,
+        timeout: MaybeFlag[Optional[float]] = Sentinel,
     ) -> Any:
         """调用下层 API
 
@@ -116,9 +299,10 @@ class ConnectionMixin(Launchable, Generic[T_Info]):
             command (str): 命令
             method (CallMethod): 调用类型
             params (dict, optional): 调用参数
+            timeout (Optional[float], optional): 超时时间 (秒), 为 None 时不限制, 默认使用连接配置
         """
         if self.fallback:
-            return await self.fallback.call(command, method, params, in_session=in_session)
+            return await self.fallback.call(command, method, params, in_session=in_session, timeout=timeout)
         raise NotImplementedError(
             f"Connection {self} can't perform {command!r}, consider configuring a HttpClientConnection?"
         )
@@ -130,12 +314,14 @@ class ConnectionMixin(Launchable, Generic[T_Info]):
 from .http import HttpClientConnection as HttpClientConnection  # noqa: E402
 from .http import HttpServerConnection as HttpServerConnection  # noqa: E402
 from .ws import WebsocketClientConnection as WebsocketClientConnection  # noqa: E402
+from .ws import WebsocketPoolConnection as WebsocketPoolConnection  # noqa: E402
 from .ws import WebsocketServerConnection as WebsocketServerConnection  # noqa: E402
 
 CONFIG_MAP: Dict[Type[U_Info], Type[ConnectionMixin]] = {
     HttpClientInfo: HttpClientConnection,
     HttpServerInfo: HttpServerConnection,
     WebsocketClientInfo: WebsocketClientConnection,
+    WebsocketPoolInfo: WebsocketPoolConnection,
     WebsocketServerInfo: WebsocketServerConnection,
 }
 
@@ -179,15 +365,22 @@ class ConnectionInterface(ExportInterface["ElizabethService"]):
         *,
         account: Optional[int] = None,
         in_session: bool = True,
+        timeout: MaybeFlag[Optional[float]] = Sentinel,
+        coalesce: Optional[bool] = None,
     ) -> Any:
         """发起一个调用
 
+        可合并的调用在已有参数相同的调用进行中时不会再次发出, 而是共享其结果, 因此结果不应被修改.
+
         Args:
             command (str): 调用命令
             method (CallMethod): 调用方法
             params (dict): 调用参数
             account (Optional[int], optional): 账号. Defaults to None.
             in_session (bool, optional): 是否在会话中. Defaults to True.
+            timeout (Optional[float], optional): 超时时间 (秒), 为 None 时不限制. 默认使用连接配置.
+            coalesce (Optional[bool], optional): 是否合并相同的并发调用. \
+                默认仅合并 `coalesced_commands` 中调用类型属于 `COALESCED_METHODS` 的命令.
 
         Returns:
             Any: 调用结果
@@ -199,7 +392,47 @@ class ConnectionInterface(ExportInterface["ElizabethService"]):
         if connection is None:
             raise ValueError(f"Unable to find connection to execute {command}")
 
-        return await connection.call(command, method, params, in_session=in_session)
+        if coalesce is None:
+            coalesce = method in COALESCED_METHODS and command in connection.coalesced_commands
+        if coalesce:
+            try:
+                key = (command, method, in_session, frozenset(params.items()))
+            except TypeError:  # unhashable parameters
+                pass
+            else:
+                return await self._coalesce(connection, key, timeout)
+        return await connection.call(command, method, params, in_session=in_session, timeout=timeout)
+
+    @staticmethod
+    async def _coalesce(connection: ConnectionMixin, key: tuple, timeout: MaybeFlag[Optional[float]]) -> Any:
+        coalescing = connection.coalescing
+        if (task := coalescing.get(key)) is not None:
+            connection.status.coalesced_calls += 1
+            if timeout is Sentinel:
+                timeout = getattr(connection.info, "call_timeout", None)
+            if timeout is not None:
+                # the shared call runs with the first caller's timeout, later callers keep their own
+                try:
+                    return await asyncio.wait_for(asyncio.shield(task), timeout)
+                except asyncio.TimeoutError:
+                    connection.status.timed_out_calls += 1
+                    logger.warning(f"Call {key[0]!r} timed out after {timeout}s")
+                    raise
+        else:
+            command, method, in_session, params = key
+            task = coalescing[key] = asyncio.create_task(
+                connection.call(command, method, dict(params), in_session=in_session, timeout=timeout)
+            )
+
+            def done(task: asyncio.Task) -> None:
+                if coalescing.get(key) is task:
+                    del coalescing[key]
+                if not task.cancelled():
+                    task.exception()  # retrieved even if every caller was cancelled
+
+            task.add_done_callback(done)
+        # a cancelled caller must not cancel the call shared with others
+        return await asyncio.shield(task)
 
     def add_callback(self, callback: Callable[[MiraiEvent], Awaitable[Any]]) -> None:
         """添加事件回调
@@ -211,6 +444,13 @@ class ConnectionInterface(ExportInterface["ElizabethService"]):
             raise ValueError("Unable to find connection to add callback")
         self.connection.event_callbacks.append(callback)
 
+    @property
+    def coalesced_commands(self) -> Set[str]:
+        """获取合并相同并发调用的命令, 可增删以按命令配置"""
+        if self.connection:
+            return self.connection.coalesced_commands
+        raise ValueError(f"{self} is not bound to an account")
+
     @property
     def status(self) -> ConnectionStatus:
         """获取连接状态"""
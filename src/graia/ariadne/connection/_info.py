@@ -1,12 +1,17 @@
-from typing import Dict, NamedTuple, TypeVar, Union
+from typing import Dict, NamedTuple, Optional, TypeVar, Union
 
 from yarl import URL
 
+from .util import EventQueueConfig, PollingConfig, ReconnectConfig
+
 
 class HttpClientInfo(NamedTuple):
     account: int
     verify_key: str
     host: str
+    event_queue: EventQueueConfig = EventQueueConfig()
+    session_store: Optional[str] = None
+    polling: PollingConfig = PollingConfig()
 
     def get_url(self, route: str) -> str:
         return str((URL(self.host) / route))
@@ -16,6 +21,24 @@ class WebsocketClientInfo(NamedTuple):
     account: int
     verify_key: str
     host: str
+    event_queue: EventQueueConfig = EventQueueConfig()
+    call_timeout: Optional[float] = 60.0
+    max_in_flight: int = 0
+    reconnect: ReconnectConfig = ReconnectConfig()
+
+    def get_url(self, route: str) -> str:
+        return str((URL(self.host) / route))
+
+
+class WebsocketPoolInfo(NamedTuple):
+    account: int
+    verify_key: str
+    host: str
+    size: int = 2
+    event_queue: EventQueueConfig = EventQueueConfig()
+    call_timeout: Optional[float] = 60.0
+    max_in_flight: int = 0
+    reconnect: ReconnectConfig = ReconnectConfig()
 
     def get_url(self, route: str) -> str:
         return str((URL(self.host) / route))
@@ -27,6 +50,9 @@ class WebsocketServerInfo(NamedTuple):
     path: str
     params: Dict[str, str]
     headers: Dict[str, str]
+    event_queue: EventQueueConfig = EventQueueConfig()
+    call_timeout: Optional[float] = 60.0
+    max_in_flight: int = 0
 
 
 class HttpServerInfo(NamedTuple):
@@ -34,8 +60,9 @@ class HttpServerInfo(NamedTuple):
     verify_key: str
     path: str
     headers: Dict[str, str]
+    event_queue: EventQueueConfig = EventQueueConfig()
 
 
-U_Info = Union[HttpClientInfo, WebsocketClientInfo, WebsocketServerInfo, HttpServerInfo]
+U_Info = Union[HttpClientInfo, WebsocketClientInfo, WebsocketPoolInfo, WebsocketServerInfo, HttpServerInfo]
 
 T_Info = TypeVar("T_Info", bound=U_Info)
@@ -3,6 +3,7 @@ from typing import (
     Dict,
     List,
     NamedTuple,
+    Optional,
     Sequence,
     Type,
     Union,
@@ -17,8 +18,13 @@ from ._info import (
     HttpServerInfo,
     U_Info,
     WebsocketClientInfo,
+    WebsocketPoolInfo,
     WebsocketServerInfo,
 )
+from .util import EventQueueConfig as EventQueueConfig
+from .util import EventQueuePolicy as EventQueuePolicy  # noqa: F401
+from .util import PollingConfig as PollingConfig
+from .util import ReconnectConfig as ReconnectConfig
 
 if TYPE_CHECKING:
     from ..app import Ariadne
@@ -29,6 +35,31 @@ class WebsocketClientConfig(NamedTuple):
 
     host: str = "http://localhost:8080"
     """mirai-api-http 的 Endpoint"""
+    event_queue: EventQueueConfig = EventQueueConfig()
+    """事件队列配置"""
+    call_timeout: Optional[float] = 60.0
+    """API 调用的默认超时时间 (秒), 为 None 时不限制"""
+    max_in_flight: int = 0
+    """同时等待响应的 API 调用数上限, 为 0 时不限制"""
+    reconnect: ReconnectConfig = ReconnectConfig()
+    """断线重连配置"""
+
+
+class WebsocketPoolConfig(NamedTuple):
+    """Websocket 连接池配置, 会为同一账号建立多个 Websocket 客户端连接"""
+
+    host: str = "http://localhost:8080"
+    """mirai-api-http 的 Endpoint"""
+    size: int = 2
+    """连接数"""
+    event_queue: EventQueueConfig = EventQueueConfig()
+    """事件队列配置"""
+    call_timeout: Optional[float] = 60.0
+    """API 调用的默认超时时间 (秒), 为 None 时不限制"""
+    max_in_flight: int = 0
+    """每个连接同时等待响应的 API 调用数上限, 为 0 时不限制"""
+    reconnect: ReconnectConfig = ReconnectConfig()
+    """断线重连配置"""
 
 
 class WebsocketServerConfig(NamedTuple):
@@ -40,6 +71,12 @@ class WebsocketServerConfig(NamedTuple):
     """用于验证的参数"""
     headers: Dict[str, str] = {}
     """用于验证的请求头"""
+    event_queue: EventQueueConfig = EventQueueConfig()
+    """事件队列配置"""
+    call_timeout: Optional[float] = 60.0
+    """API 调用的默认超时时间 (秒), 为 None 时不限制"""
+    max_in_flight: int = 0
+    """同时等待响应的 API 调用数上限, 为 0 时不限制"""
 
 
 class HttpClientConfig(NamedTuple):
@@ -47,6 +84,12 @@ class HttpClientConfig(NamedTuple):
 
     host: str = "http://localhost:8080"
     """mirai-api-http 的 Endpoint"""
+    event_queue: EventQueueConfig = EventQueueConfig()
+    """事件队列配置"""
+    session_store: Optional[str] = None
+    """保存 session key 的文件路径, 重启后会先尝试重新绑定其中的 session"""
+    polling: PollingConfig = PollingConfig()
+    """轮询配置"""
 
 
 class HttpServerConfig(NamedTuple):
@@ -57,13 +100,18 @@ class HttpServerConfig(NamedTuple):
 
     headers: Dict[str, str] = {}
     """用于验证的请求头"""
+    event_queue: EventQueueConfig = EventQueueConfig()
+    """事件队列配置"""
 
 
-U_Config = Union[HttpClientConfig, WebsocketClientConfig, WebsocketServerConfig, HttpServerConfig]
+U_Config = Union[
+    HttpClientConfig, WebsocketClientConfig, WebsocketPoolConfig, WebsocketServerConfig, HttpServerConfig
+]
 
 _CFG_INFO_MAP = {
     HttpClientConfig: HttpClientInfo,
     WebsocketClientConfig: WebsocketClientInfo,
+    WebsocketPoolConfig: WebsocketPoolInfo,
     WebsocketServerConfig: WebsocketServerInfo,
     HttpServerConfig: HttpServerInfo,
 }
@@ -76,7 +124,7 @@ def config(account: int, verify_key: str, *configs: Union[Type[U_Config], U_Conf
         account (int): 账号
         verify_key (str): mirai-api-http 使用的 VerifyKey
         *configs (Union[Type[U_Config], U_Config]): 配置, 为 \
-            `HttpClientConfig`, `WebsocketClientConfig`, \
+            `HttpClientConfig`, `WebsocketClientConfig`, `WebsocketPoolConfig`, \
             `WebsocketServerConfig`, `HttpServerConfig` 类或实例
 
     Returns:
@@ -93,11 +141,21 @@ def config(account: int, verify_key: str, *configs: Union[Type[U_Config], U_Conf
     return infos
 
 
+def _load_config(cfg_type: Type[U_Config], data: DictStrAny) -> U_Config:
+    """从字典构建配置, 嵌套的配置项 (如 `event_queue`) 也可以用字典表示"""
+    data = dict(data)
+    for name, default in cfg_type._field_defaults.items():
+        if isinstance(default, tuple) and isinstance(data.get(name), dict):
+            data[name] = type(default)(**data[name])
+    return cfg_type(**data)
+
+
 class ConfigTypedDict(TypedDict):
     account: Required[int]
     verify_key: Required[str]
     http_client: NotRequired[DictStrAny]
     websocket_client: NotRequired[DictStrAny]
+    websocket_pool: NotRequired[DictStrAny]
     http_server: NotRequired[DictStrAny]
     websocket_server: NotRequired[DictStrAny]
 
@@ -118,13 +176,15 @@ def from_obj(obj: Union[ConfigTypedDict, Sequence[ConfigTypedDict]]) -> Union[Li
     if isinstance(obj, dict):
         extras: List[U_Config] = []
         if "http_client" in obj:
-            extras.append(HttpClientConfig(**obj["http_client"]))
+            extras.append(_load_config(HttpClientConfig, obj["http_client"]))
         if "websocket_client" in obj:
-            extras.append(WebsocketClientConfig(**obj["websocket_client"]))
+            extras.append(_load_config(WebsocketClientConfig, obj["websocket_client"]))
+        if "websocket_pool" in obj:
+            extras.append(_load_config(WebsocketPoolConfig, obj["websocket_pool"]))
         if "http_server" in obj:
-            extras.append(HttpServerConfig(**obj["http_server"]))
+            extras.append(_load_config(HttpServerConfig, obj["http_server"]))
         if "websocket_server" in obj:
-            extras.append(WebsocketServerConfig(**obj["websocket_server"]))
+            extras.append(_load_config(WebsocketServerConfig, obj["websocket_server"]))
 
         from ..app import Ariadne
 
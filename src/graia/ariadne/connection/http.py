@@ -1,11 +1,12 @@
 import asyncio
 import json as json_mod
+import time
+from pathlib import Path
 from typing import Any, Optional
 
 from aiohttp import FormData
 from graia.amnesia.builtins.aiohttp import AiohttpClientInterface
 from graia.amnesia.builtins.memcache import Memcache
-from graia.amnesia.json import Json
 from graia.amnesia.transport import Transport
 from graia.amnesia.transport.common.http import AbstractServerRequestIO, HttpEndpoint
 from graia.amnesia.transport.common.http.extra import HttpRequest
@@ -14,10 +15,11 @@ from launart import Launart
 from launart.utilles import wait_fut
 from loguru import logger
 
-from ..exception import InvalidSession
+from ..exception import AccountNotFound, InvalidSession, InvalidVerifyKey
+from ..typing import MaybeFlag, Sentinel
 from . import ConnectionMixin
 from ._info import HttpClientInfo, HttpServerInfo
-from .util import CallMethod, DatetimeJsonEncoder, build_event, validate_response
+from .util import CallMethod, build_event, json_dumps, json_loads, validate_response
 
 
 class HttpServerConnection(ConnectionMixin[HttpServerInfo], Transport):
@@ -36,17 +38,22 @@ class HttpServerConnection(ConnectionMixin[HttpServerInfo], Transport):
         for k, v in self.info.headers.items():
             if req.headers.get(k) != v:
                 return "Authorization failed", {"status": 401}
-        data = Json.deserialize((await io.read()).decode("utf-8"))
+        data = json_loads(await io.read())
         assert isinstance(data, dict)
         self.status.connected = True
         self.status.alive = True
-        event = build_event(data)
-        await asyncio.gather(*(callback(event) for callback in self.event_callbacks))
+        await self.dispatch(build_event(data))
         return {"command": "", "data": {}}
 
+    @property
+    def stages(self):
+        return {"cleanup"}
+
     async def launch(self, mgr: Launart) -> None:
         router = mgr.get_interface(AbstractRouter)
         router.use(self)
+        async with self.stage("cleanup"):
+            await self.event_queue.close()
 
 
 class HttpClientConnection(ConnectionMixin[HttpClientInfo]):
@@ -55,9 +62,46 @@ class HttpClientConnection(ConnectionMixin[HttpClientInfo]):
     dependencies = {AiohttpClientInterface}
     http_interface: AiohttpClientInterface
 
+    auth_retries: int = 3
+    """认证失败后的重试次数"""
+
+    auth_backoff: float = 1.0
+    """认证重试的初始等待时间 (秒), 每次重试翻倍"""
+
     def __init__(self, config: HttpClientInfo) -> None:
         super().__init__(config)
         self.is_hook: bool = False
+        self.auth_task: Optional[asyncio.Task] = None
+        self.stored_session: Optional[str] = self.load_session()
+        self.poll_count: int = config.polling.min_count
+        """下一次 `fetchMessage` 请求的消息数"""
+        self.poll_interval: float = config.polling.min_interval
+        """当前的轮询间隔 (秒)"""
+        self.poll_latency: Optional[float] = None
+        """从发起轮询到事件进入事件队列的耗时 (秒, 指数加权平均)"""
+
+    def adjust_polling(self, received: int) -> float:
+        """根据上一次轮询取得的事件数调整轮询参数
+
+        批次已满时增大 `poll_count` 并立即再次轮询; 没有事件时按指数退避延长轮询间隔, 直至上限.
+
+        Args:
+            received (int): 上一次轮询取得的事件数
+
+        Returns:
+            float: 下一次轮询前需要等待的时间 (秒)
+        """
+        polling = self.info.polling
+        if received >= self.poll_count:
+            self.poll_count = min(self.poll_count * 2, polling.max_count)
+            self.poll_interval = polling.min_interval
+            return 0.0
+        if received:
+            self.poll_interval = polling.min_interval
+        else:
+            self.poll_count = max(self.poll_count // 2, polling.min_count)
+            self.poll_interval = min(self.poll_interval * 2, polling.max_interval)
+        return self.poll_interval
 
     async def request(
         self,
@@ -73,24 +117,54 @@ class HttpClientConnection(ConnectionMixin[HttpClientInfo]):
                 form.add_field(k, **v) if isinstance(v, dict) else form.add_field(k, v)
             data = form
         if json:
-            data = json_mod.dumps(json, cls=DatetimeJsonEncoder)
+            data = json_dumps(json)
         rider = await self.http_interface.request(method, url, params=params, data=data)
-        byte_data = await rider.io().read()
-        result = Json.deserialize(byte_data.decode("utf-8"))
+        result = json_loads(await rider.io().read())
         return validate_response(result)
 
-    async def http_auth(self) -> None:
-        from ..app import Ariadne
+    def load_session(self) -> Optional[str]:
+        """从 `session_store` 读取上次使用的 session key
 
-        app = Ariadne.current()
-        await app.launch_manager.get_interface(Memcache).delete(f"account.{app.account}.version")
+        Returns:
+            Optional[str]: session key, 未配置或不存在时为 None
+        """
+        if not self.info.session_store:
+            return None
+        path = Path(self.info.session_store)
+        try:
+            return json_mod.loads(path.read_text("utf-8")).get(str(self.info.account))
+        except (OSError, ValueError, AttributeError):
+            return None
 
-        data = await self.request(
-            "POST",
-            self.info.get_url("verify"),
-            json={"verifyKey": self.info.verify_key},
-        )
-        session_key = data["session"]
+    def save_session(self, session_key: Optional[str]) -> None:
+        """将 session key 写入 `session_store`
+
+        Args:
+            session_key (Optional[str]): session key, 为 None 时删除记录
+        """
+        if not self.info.session_store:
+            return
+        path = Path(self.info.session_store)
+        try:
+            sessions = json_mod.loads(path.read_text("utf-8"))
+            assert isinstance(sessions, dict)
+        except (OSError, ValueError, AssertionError):
+            sessions = {}
+        if session_key is None:
+            sessions.pop(str(self.info.account), None)
+        else:
+            sessions[str(self.info.account)] = session_key
+        try:
+            path.write_text(json_mod.dumps(sessions), "utf-8")
+        except OSError as e:
+            logger.warning(f"Failed to save session key to {path}: {e}")
+
+    async def bind(self, session_key: str) -> None:
+        """将 session key 绑定到账号
+
+        Args:
+            session_key (str): session key
+        """
         await self.request(
             "POST",
             self.info.get_url("bind"),
@@ -98,26 +172,83 @@ class HttpClientConnection(ConnectionMixin[HttpClientInfo]):
         )
         self.status.session_key = session_key
 
+    async def authenticate(self) -> None:
+        """认证并绑定会话, 优先尝试重新绑定上次保存的 session key, 失败时按退避策略重试"""
+        from ..app import Ariadne
+
+        app = Ariadne.current(self.info.account)
+        await app.launch_manager.get_interface(Memcache).delete(f"account.{app.account}.version")
+
+        if stored_session := self.stored_session:
+            self.stored_session = None
+            try:
+                await self.bind(stored_session)
+                logger.info("HttpClient: rebound previous session", style="dark_orange")
+                return
+            except Exception as e:
+                logger.debug(f"HttpClient: failed to rebind previous session: {e!r}")
+
+        for retry in range(self.auth_retries + 1):
+            try:
+                data = await self.request(
+                    "POST",
+                    self.info.get_url("verify"),
+                    json={"verifyKey": self.info.verify_key},
+                )
+                await self.bind(data["session"])
+                self.save_session(data["session"])
+                return
+            except (InvalidVerifyKey, AccountNotFound):
+                raise
+            except Exception as e:
+                if retry == self.auth_retries:
+                    raise
+                delay = min(self.auth_backoff * 2**retry, 30.0)
+                logger.warning(f"HttpClient: authentication failed ({e!r}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+    async def http_auth(self) -> None:
+        """认证会话, 同一时间只会进行一次认证, 并发的调用者共享其结果"""
+        if self.auth_task is None or self.auth_task.done():
+            self.auth_task = asyncio.create_task(self.authenticate())
+        await asyncio.shield(self.auth_task)
+
     async def call(
-        self, command: str, method: CallMethod, params: Optional[dict] = None, *, in_session: bool = True
+        self,
+        command: str,
+        method: CallMethod,
+        params: Optional[dict] = None,
+        *,
+        in_session: bool = True,
+        timeout: MaybeFlag[Optional[float]] = Sentinel,
     ) -> Any:
         params = params or {}
         command = command.replace("_", "/")
         while not self.status.connected:
             await self.status.wait_for_update()
+        session_key: Optional[str] = None
         if in_session:
             if not self.status.session_key:
                 await self.http_auth()
-            params["sessionKey"] = self.status.session_key
+            session_key = params["sessionKey"] = self.status.session_key
+        if method in (CallMethod.GET, CallMethod.RESTGET):
+            request = self.request("GET", self.info.get_url(command), params=params)
+        elif method in (CallMethod.POST, CallMethod.RESTPOST):
+            request = self.request("POST", self.info.get_url(command), json=params)
+        elif method == CallMethod.MULTIPART:
+            request = self.request("POST", self.info.get_url(command), data=params)
+        else:
+            return
         try:
-            if method in (CallMethod.GET, CallMethod.RESTGET):
-                return await self.request("GET", self.info.get_url(command), params=params)
-            elif method in (CallMethod.POST, CallMethod.RESTPOST):
-                return await self.request("POST", self.info.get_url(command), json=params)
-            elif method == CallMethod.MULTIPART:
-                return await self.request("POST", self.info.get_url(command), data=params)
+            if timeout is Sentinel or timeout is None:
+                return await request
+            return await asyncio.wait_for(request, timeout)
+        except asyncio.TimeoutError:
+            self.status.timed_out_calls += 1
+            raise
         except InvalidSession:
-            self.status.session_key = None
+            if session_key and self.status.session_key == session_key:
+                self.status.session_key = None
             raise
 
     @property
@@ -135,10 +266,11 @@ class HttpClientConnection(ConnectionMixin[HttpClientInfo]):
                     if not self.status.session_key:
                         logger.info("HttpClient: authenticate", style="dark_orange")
                         await self.http_auth()
+                    poll_start = time.monotonic()
                     data = await self.request(
                         "GET",
                         self.info.get_url("fetchMessage"),
-                        {"sessionKey": self.status.session_key, "count": 10},
+                        {"sessionKey": self.status.session_key, "count": self.poll_count},
                     )
                     self.status.alive = True
                 except Exception as e:
@@ -148,9 +280,15 @@ class HttpClientConnection(ConnectionMixin[HttpClientInfo]):
                     continue
                 assert isinstance(data, list)
                 for event_data in data:
-                    event = build_event(event_data)
-                    await asyncio.gather(*(callback(event) for callback in self.event_callbacks))
-                await wait_fut(
-                    [asyncio.sleep(0.5), exit_signal],
-                    return_when=asyncio.FIRST_COMPLETED,
-                )
+                    await self.dispatch(build_event(event_data))
+                if data:
+                    latency = time.monotonic() - poll_start
+                    if self.poll_latency is not None:
+                        latency = 0.8 * self.poll_latency + 0.2 * latency
+                    self.poll_latency = latency
+                if delay := self.adjust_polling(len(data)):
+                    await wait_fut(
+                        [asyncio.sleep(delay), exit_signal],
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+            await self.event_queue.close()
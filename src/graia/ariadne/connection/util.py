@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import contextlib
 import json
 from datetime import datetime
 from enum import Enum
-from functools import lru_cache
-from typing import TYPE_CHECKING, Any, Dict, Literal, Optional, Type, Union, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Literal,
+    NamedTuple,
+    Optional,
+    Type,
+    Union,
+    overload,
+)
 
 from loguru import logger
 
@@ -22,6 +33,10 @@ from ..exception import (
 )
 from ..util import gen_subclass
 
+orjson = None
+with contextlib.suppress(ImportError):
+    import orjson
+
 if TYPE_CHECKING:
     from ..event import MiraiEvent
 
@@ -62,11 +77,30 @@ def validate_response(data: Any, raising: bool = True):
     return exc
 
 
-@lru_cache(maxsize=1024)
-def extract_event_type(event_type: str) -> Optional[Type[MiraiEvent]]:
+EVENT_TYPE_MAPPING: Dict[str, Type[MiraiEvent]] = {}
+"""事件类型名到事件类的映射, 在首次解析时构建, 遇到未知类型时会重新扫描以纳入新定义的事件"""
+
+
+def refresh_event_type_mapping() -> None:
+    """重新扫描 `MiraiEvent` 的子类并更新 `EVENT_TYPE_MAPPING`"""
     from ..event import MiraiEvent
 
-    return next((cls for cls in gen_subclass(MiraiEvent) if cls.__name__ == event_type), None)
+    for cls in gen_subclass(MiraiEvent):
+        EVENT_TYPE_MAPPING.setdefault(cls.__name__, cls)
+
+
+def extract_event_type(event_type: str) -> Optional[Type[MiraiEvent]]:
+    """从事件类型名获取对应的事件类
+
+    Args:
+        event_type (str): 事件类型名
+
+    Returns:
+        Optional[Type[MiraiEvent]]: 事件类, 未找到时为 None
+    """
+    if event_type not in EVENT_TYPE_MAPPING:
+        refresh_event_type_mapping()
+    return EVENT_TYPE_MAPPING.get(event_type)
 
 
 def build_event(data: dict) -> MiraiEvent:
@@ -90,12 +124,10 @@ def build_event(data: dict) -> MiraiEvent:
     if not event_class:
         logger.error("An event is not recognized! Please report with your log to help us diagnose.")
         raise ValueError(f"Unable to find event: {event_type}", data)
-    data = {k: v for k, v in data.items() if k != "type"}
     return event_class.parse_obj(data)
 
 
 class CallMethod(str, Enum):
-
     GET = "GET"
     POST = "POST"
     RESTGET = "get"
@@ -103,6 +135,29 @@ class CallMethod(str, Enum):
     MULTIPART = "multipart"
 
 
+COALESCED_METHODS: FrozenSet[CallMethod] = frozenset({CallMethod.GET, CallMethod.RESTGET})
+"""可以合并相同调用的调用类型"""
+
+COALESCED_COMMANDS: FrozenSet[str] = frozenset(
+    {
+        "about",
+        "friendList",
+        "groupList",
+        "memberList",
+        "memberInfo",
+        "groupConfig",
+        "botProfile",
+        "friendProfile",
+        "memberProfile",
+        "userProfile",
+        "anno_list",
+        "file_list",
+        "file_info",
+    }
+)
+"""默认合并相同并发调用的只读命令, 仅在调用类型属于 `COALESCED_METHODS` 时生效"""
+
+
 class UploadMethod(str, Enum):
     """用于向 `upload` 系列方法描述上传类型"""
 
@@ -119,8 +174,163 @@ class UploadMethod(str, Enum):
         return self.value
 
 
+class EventQueuePolicy(str, Enum):
+    """事件队列已满时的处理策略"""
+
+    BLOCK = "block"
+    """阻塞读取端, 直到队列有空位"""
+
+    DROP_OLDEST = "drop_oldest"
+    """丢弃队列中最早的事件"""
+
+    DROP_BY_TYPE = "drop_by_type"
+    """丢弃可丢弃类型的事件 (优先丢弃新事件), 没有可丢弃的事件时阻塞"""
+
+
+class EventQueueConfig(NamedTuple):
+    """连接事件队列配置"""
+
+    size: int = 1024
+    """队列容量, 为 0 时不限制"""
+
+    policy: EventQueuePolicy = EventQueuePolicy.BLOCK
+    """队列已满时的处理策略"""
+
+    droppable: FrozenSet[str] = frozenset()
+    """`DROP_BY_TYPE` 策略下允许丢弃的事件类型名"""
+
+    consumers: int = 1
+    """消费事件的任务数, 大于 1 时不保证事件回调的顺序"""
+
+    drain_timeout: float = 5.0
+    """连接停止时等待队列中剩余事件处理完毕的最长时间 (秒)"""
+
+
+class PollingConfig(NamedTuple):
+    """HTTP 客户端轮询配置"""
+
+    min_count: int = 10
+    """单次 `fetchMessage` 请求的最小消息数"""
+
+    max_count: int = 200
+    """单次 `fetchMessage` 请求的最大消息数"""
+
+    min_interval: float = 0.05
+    """最短轮询间隔 (秒)"""
+
+    max_interval: float = 0.5
+    """没有新事件时轮询间隔退避的上限 (秒)"""
+
+
+class ReconnectConfig(NamedTuple):
+    """Websocket 客户端重连配置
+
+    连接断开后第一次重连等待 `initial_delay`, 之后的重连等待时间从 `base_delay` 开始按 `factor` 增长,
+    直至 `max_delay`. 连续失败 `circuit_threshold` 次后进入熔断状态, 此后每隔 `circuit_cooldown` 才尝试一次.
+    """
+
+    initial_delay: float = 0.0
+    """第一次重连前的等待时间 (秒)"""
+
+    base_delay: float = 1.0
+    """第二次重连前的等待时间 (秒)"""
+
+    factor: float = 2.0
+    """每次重连失败后等待时间的增长倍数"""
+
+    max_delay: float = 60.0
+    """重连等待时间的上限 (秒)"""
+
+    jitter: float = 0.5
+    """随机缩短等待时间的比例, 避免多个连接同时重连"""
+
+    circuit_threshold: int = 10
+    """进入熔断状态前允许连续失败的次数, 为 0 时不熔断"""
+
+    circuit_cooldown: float = 300.0
+    """熔断状态下的重连间隔 (秒)"""
+
+
 class DatetimeJsonEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, datetime):
             return int(obj.timestamp())
         return json.JSONEncoder.default(self, obj)
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return int(obj.timestamp())
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+class JsonCodec:
+    """与 mirai-api-http 通信时使用的 JSON 编解码器, 基于标准库 `json`
+
+    `datetime` 会被编码为 Unix 时间戳.
+    """
+
+    name: str = "json"
+
+    def dumps(self, obj: Any) -> str:
+        """将对象编码为 JSON 字符串
+
+        Args:
+            obj (Any): 要编码的对象
+
+        Returns:
+            str: JSON 字符串
+        """
+        return json.dumps(obj, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """解码 JSON 数据
+
+        Args:
+            data (Union[str, bytes]): JSON 字符串或 UTF-8 编码的字节串
+
+        Returns:
+            Any: 解码得到的对象
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """基于 `orjson` 的 JSON 编解码器"""
+
+    name: str = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        self.option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj, default=_json_default, option=self.option).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+
+json_codec: JsonCodec = JsonCodec() if orjson is None else OrjsonCodec()
+"""当前使用的 JSON 编解码器, 安装了 `orjson` 时默认使用 `OrjsonCodec`"""
+
+
+def set_json_codec(codec: JsonCodec) -> None:
+    """替换连接使用的 JSON 编解码器
+
+    Args:
+        codec (JsonCodec): 新的编解码器
+    """
+    global json_codec
+    json_codec = codec
+
+
+def json_dumps(obj: Any) -> str:
+    """使用当前的编解码器将对象编码为 JSON 字符串"""
+    return json_codec.dumps(obj)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """使用当前的编解码器解码 JSON 数据, 可直接传入字节串"""
+    return json_codec.loads(data)
@@ -1,8 +1,8 @@
 import asyncio
-import json as json_mod
+import random
 import secrets
-from typing import Any, Dict, MutableMapping, Optional
-from weakref import WeakValueDictionary
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
 
 from graia.amnesia.builtins.aiohttp import AiohttpClientInterface
 from graia.amnesia.builtins.memcache import Memcache
@@ -19,16 +19,16 @@ from graia.amnesia.transport.common.websocket import (
     WSConnectionAccept,
     WSConnectionClose,
 )
-from graia.amnesia.transport.common.websocket.shortcut import data_type, json_require
 from graia.amnesia.transport.utilles import TransportRegistrar
 from launart import Launart
 from launart.utilles import wait_fut
 from loguru import logger
 from yarl import URL
 
-from . import ConnectionMixin
-from ._info import T_Info, WebsocketClientInfo, WebsocketServerInfo
-from .util import CallMethod, DatetimeJsonEncoder, build_event, validate_response
+from ..typing import MaybeFlag, Sentinel
+from . import ConnectionMixin, ConnectionStatus
+from ._info import T_Info, WebsocketClientInfo, WebsocketPoolInfo, WebsocketServerInfo
+from .util import CallMethod, build_event, json_dumps, json_loads, validate_response
 
 t = TransportRegistrar()
 
@@ -36,16 +36,17 @@ t = TransportRegistrar()
 @t.apply
 class WebsocketConnectionMixin(Transport, ConnectionMixin[T_Info]):
     ws_io: Optional[AbstractWebsocketIO]
-    futures: MutableMapping[str, asyncio.Future]
+    futures: Dict[str, asyncio.Future]
+    call_semaphore: Optional[asyncio.Semaphore]
 
     def __init__(self, info: T_Info) -> None:
         super().__init__(info=info)
-        self.futures = WeakValueDictionary()
+        self.futures = {}
+        self.call_semaphore = None
 
     @t.on(WebsocketReceivedEvent)
-    @data_type(str)
-    @json_require
-    async def _(self, _: AbstractWebsocketIO, raw: Any) -> None:  # event pass and callback
+    async def _(self, _: AbstractWebsocketIO, data: Union[str, bytes]) -> None:  # event pass and callback
+        raw = json_loads(data)
         assert isinstance(raw, dict)
         if "code" in raw:  # something went wrong
             validate_response(raw)  # raise it
@@ -53,38 +54,48 @@ class WebsocketConnectionMixin(Transport, ConnectionMixin[T_Info]):
         data = raw.get("data", None)
         data = validate_response(data, raising=False)
         if isinstance(data, Exception):
-            if sync_id in self.futures:
+            if sync_id in self.futures and not self.futures[sync_id].done():
                 self.futures[sync_id].set_exception(data)
             return
         if "session" in data:
             self.status.session_key = data["session"]
+            self.status.reconnect_attempts = 0
+            self.status.circuit_open = False
             logger.success("Successfully got session key", style="green bold")
             return
         if sync_id in self.futures:
-            self.futures[sync_id].set_result(data)
+            if not self.futures[sync_id].done():
+                self.futures[sync_id].set_result(data)
         elif "type" in data:
             self.status.alive = True
-            event = build_event(data)
-            await asyncio.gather(*(callback(event) for callback in self.event_callbacks))
+            await self.receive_event(data)
         else:
             logger.warning(f"Got unknown data: {raw}")
 
-    @t.handle(WebsocketReconnect)
-    async def _(self, _) -> bool:
-        logger.warning("Websocket reconnecting in 5s...", style="dark_orange")
-        await asyncio.sleep(5)
-        logger.warning("Websocket reconnecting...", style="dark_orange")
-        return True
-
-    @t.on(WebsocketCloseEvent)
-    async def _(self, _: AbstractWebsocketIO) -> None:
+    async def invalidate_cache(self) -> None:
+        """清除在连接断开后失效的缓存"""
         from ..app import Ariadne
 
-        app = Ariadne.current()
+        app = Ariadne.current(self.info.account)
         await app.launch_manager.get_interface(Memcache).delete(f"account.{app.account}.version")
 
+    async def receive_event(self, data: dict) -> None:
+        """处理从 Websocket 收到的事件数据
+
+        Args:
+            data (dict): 序列化态的事件
+        """
+        await self.dispatch(build_event(data))
+
+    @t.on(WebsocketCloseEvent)
+    async def _(self, _: AbstractWebsocketIO) -> None:
+        if self.status.session_key is not None:
+            await self.invalidate_cache()
         self.status.session_key = None
         self.status.alive = False
+        for fut in self.futures.values():
+            if not fut.done():
+                fut.set_exception(ConnectionError("Websocket connection closed"))
         logger.info("Websocket connection closed", style="dark_orange")
 
     async def call(
@@ -94,12 +105,10 @@ class WebsocketConnectionMixin(Transport, ConnectionMixin[T_Info]):
         params: Optional[dict] = None,
         *,
         in_session: bool = True,
+        timeout: MaybeFlag[Optional[float]] = Sentinel,
     ) -> Any:
         params = params or {}
-        sync_id: str = secrets.token_urlsafe(12)
-        fut = asyncio.get_running_loop().create_future()
         content: Dict[str, Any] = {
-            "syncId": sync_id,
             "command": command,
             "content": params or {},
         }
@@ -108,11 +117,35 @@ class WebsocketConnectionMixin(Transport, ConnectionMixin[T_Info]):
         elif method == CallMethod.RESTPOST:
             content["subCommand"] = "update"
         elif method == CallMethod.MULTIPART:
-            return await super().call(command, method, params, in_session=in_session)
+            return await super().call(command, method, params, in_session=in_session, timeout=timeout)
+        if timeout is Sentinel:
+            timeout = self.info.call_timeout
+        if self.call_semaphore is None and self.info.max_in_flight > 0:
+            self.call_semaphore = asyncio.Semaphore(self.info.max_in_flight)
+        if self.call_semaphore is None:
+            return await self._call(content, timeout)
+        async with self.call_semaphore:
+            return await self._call(content, timeout)
+
+    async def _call(self, content: Dict[str, Any], timeout: Optional[float]) -> Any:
+        sync_id: str = secrets.token_urlsafe(12)
+        fut = asyncio.get_running_loop().create_future()
+        content["syncId"] = sync_id
         self.futures[sync_id] = fut
+        try:
+            return await asyncio.wait_for(self._send(content, fut), timeout)
+        except asyncio.TimeoutError:
+            self.status.timed_out_calls += 1
+            logger.warning(f"Call {content['command']!r} timed out after {timeout}s")
+            raise
+        finally:
+            del self.futures[sync_id]
+
+    async def _send(self, content: Dict[str, Any], fut: asyncio.Future) -> Any:
+        """等待连接可用后发送请求并等待响应, 整个过程共用一个超时"""
         await self.status.wait_for_available()
         assert self.ws_io
-        await self.ws_io.send(json_mod.dumps(content, cls=DatetimeJsonEncoder))
+        await self.ws_io.send(json_dumps(content))
         return await fut
 
 
@@ -129,9 +162,15 @@ class WebsocketServerConnection(WebsocketConnectionMixin[WebsocketServerInfo]):
         super().__init__(info)
         self.declares.append(WebsocketEndpoint(self.info.path))
 
+    @property
+    def stages(self):
+        return {"cleanup"}
+
     async def launch(self, mgr: Launart) -> None:
         router = mgr.get_interface(AbstractRouter)
         router.use(self)
+        async with self.stage("cleanup"):
+            await self.event_queue.close()
 
     @t.on(WebsocketConnectEvent)
     async def _(self, io: AbstractWebsocketIO) -> None:
@@ -172,23 +211,187 @@ class WebsocketClientConnection(WebsocketConnectionMixin[WebsocketClientInfo]):
         return {"blocking"}
 
     async def launch(self, mgr: Launart) -> None:
+        async with self.stage("blocking"):
+            await self.connect(mgr)
+            await self.event_queue.close()
+
+    async def connect(self, mgr: Launart) -> None:
+        """连接到 mirai-api-http 并保持连接, 直到程序退出
+
+        Args:
+            mgr (Launart): 启动管理器
+        """
         self.http_interface = mgr.get_interface(AiohttpClientInterface)
         config = self.info
-        async with self.stage("blocking"):
-            rider = self.http_interface.websocket(
-                str(
-                    (URL(config.host) / "all").with_query(
-                        {"qq": config.account, "verifyKey": config.verify_key}
-                    )
-                ),
-                heartbeat=30.0,
-            )
+        rider = self.http_interface.websocket(
+            str(
+                (URL(config.host) / "all").with_query({"qq": config.account, "verifyKey": config.verify_key})
+            ),
+            heartbeat=30.0,
+        )
+        await wait_fut(
+            [rider.use(self), mgr.status.wait_for_sigexit()],
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+
+    def reconnect_delay(self) -> float:
+        """计算下一次重连前的等待时间, 并记录一次重连失败
+
+        Returns:
+            float: 等待时间 (秒)
+        """
+        config = self.info.reconnect
+        attempts = self.status.reconnect_attempts
+        self.status.reconnect_attempts += 1
+        if config.circuit_threshold and attempts >= config.circuit_threshold:
+            if not self.status.circuit_open:
+                logger.error(
+                    f"Websocket failed to reconnect {attempts} times, "
+                    f"retrying every {config.circuit_cooldown}s",
+                )
+            self.status.circuit_open = True
+            return config.circuit_cooldown
+        if not attempts:
+            return config.initial_delay
+        delay = min(config.base_delay * config.factor ** (attempts - 1), config.max_delay)
+        return delay * (1 - random.uniform(0, config.jitter))
+
+    @t.handle(WebsocketReconnect)
+    async def _(self, _) -> bool:
+        mgr = Launart.current()
+        delay = self.reconnect_delay()
+        if delay > 0:
+            logger.warning(f"Websocket reconnecting in {delay:.1f}s...", style="dark_orange")
             await wait_fut(
-                [rider.use(self), mgr.status.wait_for_sigexit()],
+                [asyncio.sleep(delay), mgr.status.wait_for_sigexit()],
                 return_when=asyncio.FIRST_COMPLETED,
             )
+        if mgr.status.exiting:
+            return False
+        logger.warning("Websocket reconnecting...", style="dark_orange")
+        return True
 
     @t.on(WebsocketConnectEvent)
     async def _(self, io: AbstractWebsocketIO) -> None:  # start authenticate
         self.ws_io = io
         self.status.alive = True
+
+
+class PooledWebsocketConnection(WebsocketClientConnection):
+    """Websocket 连接池中的单个连接, 收到的事件会交给连接池处理"""
+
+    pool: "WebsocketPoolConnection"
+
+    def __init__(self, info: WebsocketClientInfo, pool: "WebsocketPoolConnection", index: int) -> None:
+        super().__init__(info)
+        self.pool = pool
+        self.index = index
+        self.id = f"{pool.id}.{index}"
+
+    async def invalidate_cache(self) -> None:
+        # other members of the pool are still connected to the same mirai-api-http
+        if not any(member.status.available for member in self.pool.members if member is not self):
+            await super().invalidate_cache()
+
+    async def receive_event(self, data: dict) -> None:
+        await self.pool.receive_event(self, data)
+
+
+class WebsocketPoolConnection(ConnectionMixin[WebsocketPoolInfo]):
+    """Websocket 连接池, 为同一账号建立多个 Websocket 连接
+
+    API 调用会分配给等待响应数最少的可用连接, 多个连接收到的同一事件只会被分发一次.
+    """
+
+    dependencies = {AiohttpClientInterface}
+    members: List[PooledWebsocketConnection]
+
+    dedupe_size: int = 4096
+    """用于事件去重的记录数上限"""
+
+    def __init__(self, info: WebsocketPoolInfo) -> None:
+        super().__init__(info)
+        member_info = WebsocketClientInfo(
+            info.account,
+            info.verify_key,
+            info.host,
+            info.event_queue,
+            info.call_timeout,
+            info.max_in_flight,
+            info.reconnect,
+        )
+        self.members = [PooledWebsocketConnection(member_info, self, i) for i in range(max(info.size, 1))]
+        self.received: "OrderedDict[str, Dict[int, int]]" = OrderedDict()
+        for member in self.members:
+            member.status.on_update(ConnectionStatus.alive)(self._on_member_update)
+            member.status.on_update(ConnectionStatus.connected)(self._on_member_update)
+
+    @property
+    def stages(self):
+        return {"blocking"}
+
+    async def launch(self, mgr: Launart) -> None:
+        async with self.stage("blocking"):
+            await asyncio.gather(*(member.connect(mgr) for member in self.members))
+            await self.event_queue.close()
+
+    def _on_member_update(self, *_) -> None:
+        # the monitor runs before the new value is stored
+        asyncio.get_running_loop().call_soon(self.refresh_status)
+
+    def refresh_status(self) -> None:
+        """根据各连接的状态更新连接池的状态"""
+        available = [member for member in self.members if member.status.available]
+        session_key = self.status.session_key
+        if all(member.status.session_key != session_key for member in available):
+            session_key = available[0].status.session_key if available else None
+        self.status.session_key = session_key
+        self.status.alive = bool(available)
+
+    async def receive_event(self, member: PooledWebsocketConnection, data: dict) -> None:
+        """接收连接池中某个连接收到的事件, 丢弃其他连接已经收到过的同一事件
+
+        同一事件会在每个连接上各出现一次, 因此按事件内容记录每个连接收到的次数,
+        只有某个连接收到的次数超过已分发的次数时才分发.
+
+        Args:
+            member (PooledWebsocketConnection): 收到事件的连接
+            data (dict): 序列化态的事件
+        """
+        if len(self.members) > 1:
+            key = json_dumps(data)
+            counts = self.received.get(key)
+            if counts is None:
+                counts = self.received[key] = {}
+                if len(self.received) > self.dedupe_size:
+                    self.received.popitem(last=False)
+            else:
+                self.received.move_to_end(key)
+            seen = counts[member.index] = counts.get(member.index, 0) + 1
+            if seen <= counts.get(-1, 0):
+                return
+            counts[-1] = seen
+        await self.dispatch(build_event(data))
+
+    async def call(
+        self,
+        command: str,
+        method: CallMethod,
+        params: Optional[dict] = None,
+        *,
+        in_session: bool = True,
+        timeout: MaybeFlag[Optional[float]] = Sentinel,
+    ) -> Any:
+        if method == CallMethod.MULTIPART:
+            return await super().call(command, method, params, in_session=in_session, timeout=timeout)
+        await self.status.wait_for_available()
+        member = min(
+            (member for member in self.members if member.status.available),
+            key=lambda member: len(member.futures),
+            default=self.members[0],
+        )
+        try:
+            return await member.call(command, method, params, in_session=in_session, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.status.timed_out_calls += 1
+            raise
@@ -7,6 +7,7 @@ from ..app import Ariadne as Ariadne
 from ..connection.config import HttpClientConfig as HttpClientConfig
 from ..connection.config import HttpServerConfig as HttpServerConfig
 from ..connection.config import WebsocketClientConfig as WebsocketClientConfig
+from ..connection.config import WebsocketPoolConfig as WebsocketPoolConfig
 from ..connection.config import WebsocketServerConfig as WebsocketServerConfig
 from ..connection.config import config as config
 from ..connection.util import UploadMethod as UploadMethod
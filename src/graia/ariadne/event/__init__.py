@@ -18,8 +18,9 @@ class MiraiEvent(Dispatchable, AriadneBaseModel):
         """验证事件类型, 通过比对 type 字段实现"""
         if not isinstance(cls, type):
             raise TypeError("cls must be a class!")
-        if cls.type != v:
-            raise InvalidEventTypeDefinition(f"{cls.__name__}'s type must be '{cls.type}', not '{v}'")
+        expected = cls.__fields__["type"].default
+        if expected is not None and expected != v:
+            raise InvalidEventTypeDefinition(f"{cls.__name__}'s type must be '{expected}', not '{v}'")
         return v
 
     Dispatcher = BaseDispatcher
@@ -1,13 +1,16 @@
 """Ariadne 消息链的实现"""
+import operator
 import re
-from copy import deepcopy
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
+    Hashable,
     Iterable,
     List,
     Literal,
+    Optional,
     Sequence,
     Tuple,
     Type,
@@ -18,9 +21,11 @@ from typing import (
 
 from graia.amnesia.json import Json
 from graia.amnesia.message import MessageChain as BaseMessageChain
+from pydantic import BaseModel, PrivateAttr
 from typing_extensions import Self
 
 from ..model import AriadneBaseModel
+from ..typing import T
 from ..util import gen_subclass, unescape_bracket
 from .element import (
     At,
@@ -47,6 +52,139 @@ ELEMENT_MAPPING: Dict[str, Type[Element]] = {
 }
 ORDINARY_ELEMENT_TYPES = frozenset([Plain, Image, Face, At, AtAll, Source, Quote])
 
+ElementSerializer = Callable[[Any], Dict[str, Any]]
+ElementDeserializer = Callable[[Dict[str, Any]], Element]
+
+ELEMENT_SERIALIZERS: Dict[Type[BaseModel], ElementSerializer] = {}
+"""元素 (及 `ForwardNode` 等嵌套模型) 类到序列化函数的映射, 未注册的类会按字段自动生成"""
+
+ELEMENT_DESERIALIZERS: Dict[str, ElementDeserializer] = {}
+"""元素类型到反序列化函数的映射, 未注册的类型使用 `parse_obj`"""
+
+_PLAIN_VALUE_TYPES = (str, int, float, bool, type(None))
+
+
+def _wire_value(value: Any) -> Any:
+    if value.__class__ in _PLAIN_VALUE_TYPES:
+        return value
+    if isinstance(value, MessageChain):
+        return value.to_wire()
+    if isinstance(value, BaseModel):
+        return serialize_element(value)
+    if isinstance(value, list):
+        return [_wire_value(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_wire_value(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _wire_value(v) for k, v in value.items()}
+    return value
+
+
+def _model_serializer(model_cls: Type[BaseModel]) -> ElementSerializer:
+    aliases: Dict[str, str] = {name: field.alias for name, field in model_cls.__fields__.items()}
+
+    def serializer(model: BaseModel) -> Dict[str, Any]:
+        return {
+            aliases.get(key, key): value if value.__class__ in _PLAIN_VALUE_TYPES else _wire_value(value)
+            for key, value in model.__dict__.items()
+            if value is not None
+        }
+
+    return serializer
+
+
+def serialize_element(element: BaseModel) -> Dict[str, Any]:
+    """将元素转换为 mirai-api-http 使用的字典, 结果与 `element.dict()` 相同
+
+    Args:
+        element (BaseModel): 元素, 也可以是 `ForwardNode` 等嵌套在元素中的模型
+
+    Returns:
+        Dict[str, Any]: 序列化态的元素
+    """
+    serializer = ELEMENT_SERIALIZERS.get(element.__class__)
+    if serializer is None:
+        serializer = ELEMENT_SERIALIZERS[element.__class__] = _model_serializer(element.__class__)
+    return serializer(element)
+
+
+def _fast_deserializer(element_cls: Type[Element], **value_types: Tuple[type, ...]) -> ElementDeserializer:
+    """为字段均为简单类型的元素生成反序列化函数, 数据类型与预期不符时退回 `parse_obj`"""
+    fields = [(name, field.alias, field.default) for name, field in element_cls.__fields__.items()]
+    required = frozenset(field.alias for field in element_cls.__fields__.values() if field.required)
+    value_types["type"] = (str,)
+
+    def deserializer(obj: Dict[str, Any]) -> Element:
+        if not required.issubset(obj):
+            return element_cls.parse_obj(obj)
+        for key, value in obj.items():
+            if value.__class__ not in value_types.get(key, ()):
+                return element_cls.parse_obj(obj)
+        element = element_cls.__new__(element_cls)
+        values = {name: obj.get(alias, default) for name, alias, default in fields}
+        object.__setattr__(element, "__dict__", values)
+        object.__setattr__(element, "__fields_set__", {name for name, alias, _ in fields if alias in obj})
+        return element
+
+    return deserializer
+
+
+ELEMENT_DESERIALIZERS.update(
+    {
+        "Plain": _fast_deserializer(Plain, text=(str,)),
+        "At": _fast_deserializer(At, target=(int,), display=(str, type(None))),
+        "AtAll": _fast_deserializer(AtAll),
+        "Face": _fast_deserializer(Face, faceId=(int, type(None)), name=(str, type(None))),
+    }
+)
+
+
+def deserialize_element(obj: Dict[str, Any]) -> Optional[Element]:
+    """将 mirai-api-http 使用的字典转换为元素, 结果与对应元素类的 `parse_obj` 相同
+
+    Args:
+        obj (Dict[str, Any]): 序列化态的元素
+
+    Returns:
+        Optional[Element]: 元素, 类型未知时为 None
+    """
+    element_type = obj.get("type", "Unknown")
+    if deserializer := ELEMENT_DESERIALIZERS.get(element_type):
+        return deserializer(obj)
+    if element_cls := ELEMENT_MAPPING.get(element_type):
+        return element_cls.parse_obj(obj)
+    return None
+
+
+_RAW_STR_CONSTANTS: Dict[str, str] = {
+    "AtAll": "@全体成员",
+    "Xml": "[XML消息]",
+    "Json": "[JSON消息]",
+    "App": "[APP消息]",
+    "Image": "[图片]",
+    "FlashImage": "[闪照]",
+    "Voice": "[语音]",
+}
+"""字符串形式与元素内容无关的元素类型"""
+
+
+def _raw_str(obj: Dict[str, Any]) -> Optional[str]:
+    """不反序列化元素, 直接获取序列化态元素的字符串形式, 无法直接获取时为 None"""
+    element_type = obj.get("type")
+    if element_type == "Plain":
+        return text if (text := obj.get("text")).__class__ is str else None
+    if element_type == "At":
+        target, display = obj.get("target"), obj.get("display")
+        if target.__class__ is not int or display.__class__ not in (str, type(None)):
+            return None
+        return f"@{display or target}"
+    if element_type in _RAW_STR_CONSTANTS:
+        return _RAW_STR_CONSTANTS[element_type]
+    if element_type not in ELEMENT_MAPPING:  # 未知类型的元素不会进入消息链
+        return ""
+    return None
+
+
 MessageOrigin = Union[str, Element]
 
 MessageContainer = Union[MessageOrigin, Sequence["MessageContainer"], "MessageChain"]
@@ -60,11 +198,125 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
     __root__: List[Element]
     """底层元素列表"""
 
+    _raw: Optional[List[Dict[str, Any]]] = PrivateAttr(None)
+    """惰性消息链尚未反序列化的元素"""
+
+    _projections: Optional[Dict[Hashable, Any]] = PrivateAttr(None)
+    """投影缓存"""
+
+    _snapshot: Optional[Tuple[Element, ...]] = PrivateAttr(None)
+    """生成投影缓存时的元素, 用于判断缓存是否失效"""
+
     @property
     def content(self) -> List[Element]:
         """Amnesia MessageChain 的内容代理"""
         return self.__root__
 
+    def __getattr__(self, name: str) -> Any:
+        if name == "__root__" and self._raw is not None:
+            return self._materialize()
+        raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
+
+    def _materialize(self) -> List[Element]:
+        raw, self._raw = self._raw, None
+        root = self.__dict__["__root__"] = self.build_chain(raw or [])
+        if self._projections is not None:
+            self._snapshot = tuple(root)
+        return root
+
+    def _projections_valid(self) -> bool:
+        if self._raw is not None:
+            return True
+        snapshot, content = self._snapshot, self.__root__
+        return (
+            snapshot is not None
+            and len(snapshot) == len(content)
+            and all(map(operator.is_, snapshot, content))
+        )
+
+    def projection(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """获取消息链的投影 (如映射字符串, 切分结果, 显示字符串), 结果会缓存在消息链上供所有解析器共享.
+
+        消息链中的元素被增删或替换后缓存失效. 投影结果是共享的, 不应修改.
+
+        Args:
+            key (Hashable): 投影的键, 应包含所有影响结果的参数
+            factory (Callable[[], T]): 生成投影的函数
+
+        Returns:
+            T: 投影结果
+        """
+        projections = self._projections
+        if projections is None or not self._projections_valid():
+            projections = self._projections = {}
+            self._snapshot = None if self._raw is not None else tuple(self.__root__)
+        if key not in projections:
+            projections[key] = factory()
+        return projections[key]
+
+    def _iter(self, *args, **kwargs):
+        self.__root__  # materialize before pydantic reads __dict__
+        return super()._iter(*args, **kwargs)
+
+    @classmethod
+    def lazy(cls, obj: List[Dict[str, Any]]) -> Self:
+        """从序列化态的元素列表创建惰性消息链, 元素在首次访问消息链内容时才会被反序列化
+
+        `has`, `only`, `display` 等方法在可能时会直接读取序列化态的元素.
+
+        Args:
+            obj (List[Dict[str, Any]]): 序列化态的元素列表
+
+        Returns:
+            MessageChain: 惰性消息链
+        """
+        special_cnt: int = 0
+        for o in obj:
+            element_cls = ELEMENT_MAPPING.get(o.get("type", "Unknown"))
+            if element_cls is not None and element_cls not in ORDINARY_ELEMENT_TYPES:
+                special_cnt += 1
+        if special_cnt > 1:
+            raise ValueError("An MessageChain can only contain *one* special element")
+        chain = cls.__new__(cls)
+        object.__setattr__(chain, "__dict__", {})
+        object.__setattr__(chain, "__fields_set__", {"__root__"})
+        chain._init_private_attributes()
+        chain._raw = obj
+        return chain
+
+    @classmethod
+    def validate(cls: Type[Self], value: Any) -> Self:
+        if isinstance(value, list) and all(isinstance(o, dict) for o in value):
+            return cls.lazy(value)
+        return super().validate(value)
+
+    def _raw_types(self) -> List[Type[Element]]:
+        return [
+            element_cls
+            for o in self._raw or []
+            if (element_cls := ELEMENT_MAPPING.get(o.get("type", "Unknown"))) is not None
+        ]
+
+    def has(self, item: Union[Element, Type[Element], Self, Sequence[Union[str, Element]]]) -> bool:
+        if self._raw is not None and isinstance(item, type):
+            return item in self._raw_types()
+        return super().has(item)
+
+    def only(self, *element_classes: Type[Element]) -> bool:
+        if self._raw is not None:
+            return all(issubclass(element_cls, element_classes) for element_cls in self._raw_types())
+        return super().only(*element_classes)
+
+    def __str__(self) -> str:
+        if self._raw is not None:
+            texts: List[str] = []
+            for o in self._raw:
+                if (text := _raw_str(o)) is None:
+                    return super().__str__()
+                texts.append(text)
+            return "".join(texts)
+        return super().__str__()
+
     @staticmethod
     def build_chain(obj: Union[List[Dict], MessageContainer]) -> List[Element]:
         """内部接口, 会自动反序列化对象并生成.
@@ -77,7 +329,7 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
         """
         # single object
         if isinstance(obj, MessageChain):
-            return deepcopy(obj.content)
+            return obj.content[:]
         if isinstance(obj, Element):
             return [obj]
         if isinstance(obj, str):
@@ -85,8 +337,8 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
         element_list: List[Element] = []
         for o in obj:
             if isinstance(o, dict):
-                if typ := ELEMENT_MAPPING.get(o.get("type", "Unknown")):
-                    element_list.append(typ.parse_obj(o))
+                if (element := deserialize_element(o)) is not None:
+                    element_list.append(element)
             else:
                 element_list.extend(MessageChain.build_chain(o))
 
@@ -188,6 +440,14 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
         """
         return self.exclude(File)
 
+    def to_wire(self) -> List[Dict[str, Any]]:
+        """将消息链转换为 mirai-api-http 使用的列表, 结果与 `self.dict()["__root__"]` 相同
+
+        Returns:
+            List[Dict[str, Any]]: 序列化态的消息链
+        """
+        return [serialize_element(element) for element in self.__root__]
+
     def get(self, element_class: Type[Element_T], count: int = -1) -> List[Element_T]:
         res = super().get(element_class, count)
         if isinstance(res, (Quote, Source)):
@@ -207,22 +467,44 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
         return other.content == self.content
 
     def __mul__(self, time: int) -> Self:
-        result = []
-        for _ in range(time):
-            result.extend(deepcopy(self.content))
-        return MessageChain(result, inline=True)
+        return MessageChain(self.content * time, inline=True)
 
     def __imul__(self, time: int) -> Self:
-        result = []
-        for _ in range(time):
-            result.extend(deepcopy(self.content))
-        self.content.clear()
-        self.content.extend(result)
+        self.content[:] = self.content * time
         return self
 
+    def copy(self) -> Self:
+        """拷贝本消息链. 元素在消息链之间共享, 修改元素前应先替换为其副本.
+
+        Returns:
+            MessageChain: 拷贝的副本.
+        """
+        return self.__class__(self.content[:], inline=True)
+
+    def extend(self, *content: Union[Self, Element, List[Union[Element, str]]], copy: bool = False) -> Self:
+        if copy:
+            return self.copy().extend(*content)
+        return super().extend(*content)
+
+    def join(self, *chains: Union[Self, Iterable[Self]]) -> Self:
+        result: List[Element] = []
+        first = True
+        for chain in chains:
+            for c in [chain] if isinstance(chain, MessageChain) else chain:
+                if not first:
+                    result.extend(self.content)
+                result.extend(c.content)
+                first = False
+        return self.__class__(result, inline=True).merge()
+
     def __len__(self) -> int:
+        if self._raw is not None:
+            return len(self._raw_types())
         return len(self.content)
 
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
     def as_persistent_string(
         self,
         *,
@@ -303,6 +585,14 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
         Returns:
             Tuple[str, Dict[str, Element]]: 生成的映射字符串与映射字典的元组
         """
+        return self.projection(
+            ("mapping_str", remove_source, remove_quote, remove_extra_space),
+            lambda: self._build_mapping_str(remove_source, remove_quote, remove_extra_space),
+        )
+
+    def _build_mapping_str(
+        self, remove_source: bool, remove_quote: bool, remove_extra_space: bool
+    ) -> Tuple[str, Dict[str, Element]]:
         elem_mapping: Dict[str, Element] = {}
         elem_str_list: List[str] = []
         for i, elem in enumerate(self.content):
@@ -372,13 +662,10 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
                     header.append(element)
                 else:
                     elements.append(element)
-        if copy:
-            header = deepcopy(header)
-            elements = deepcopy(elements)
         if not elements or not isinstance(elements[0], Plain):
             return self.copy() if copy else self
         if elements[0].text.startswith(prefix):
-            elements[0].text = elements[0].text[len(prefix) :]
+            elements[0] = elements[0].copy(update={"text": elements[0].text[len(prefix) :]})
         if copy:
             return MessageChain(header + elements, inline=True)
         self.content.clear()
@@ -395,12 +682,12 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
         Returns:
             MessageChain: 修改后的消息链, 若未移除则原样返回.
         """
-        elements = deepcopy(self.content) if copy else self.content
+        elements = self.content[:] if copy else self.content
         if not elements or not isinstance(elements[-1], Plain):
             return self.copy() if copy else self
         last_elem: Plain = elements[-1]
         if last_elem.text.endswith(suffix):
-            last_elem.text = last_elem.text[: -len(suffix)]
+            elements[-1] = last_elem.copy(update={"text": last_elem.text[: -len(suffix)]})
         if copy:
             return MessageChain(elements, inline=True)
         self.content.clear()
@@ -467,7 +754,7 @@ class MessageChain(BaseMessageChain, AriadneBaseModel):
         Returns:
             str: 消息链的显示字符串.
         """
-        return str(self)
+        return self.projection("display", self.__str__)
 
     @property
     def safe_display(self) -> str:
@@ -4,7 +4,6 @@ import asyncio
 import contextlib
 import copy
 import inspect
-from contextvars import ContextVar
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -34,6 +33,7 @@ from graia.broadcast.utilles import dispatcher_mixin_handler
 from pydantic import BaseConfig, BaseModel
 from pydantic.class_validators import Validator
 from pydantic.fields import ModelField
+from pydantic.validators import bool_validator, int_validator, str_validator
 from typing_extensions import Self
 
 from ...context import event_ctx
@@ -48,10 +48,10 @@ from .util import (
     AnnotatedParam,
     ChainContent,
     ChainContentList,
-    ContextVarDispatcher,
     MatchEntry,
     MatchNode,
     Param,
+    ParamDispatcher,
     Text,
     convert_empty,
     extract_str,
@@ -103,9 +103,71 @@ def wildcard_validator(value: ChainContentList, field: ModelField) -> Any:
     return [chain_validator(v, altered_field) for v in value] or field.get_default() or []
 
 
+def _content_str(content: ChainContent) -> str:
+    if all(v.__class__ is str for v in content):
+        return "".join(content)  # type: ignore
+    return str(MessageChain(content))
+
+
+def _pydantic_caster(validator: Callable[[Any], Any]) -> Callable[[ChainContent], Any]:
+    def caster(content: ChainContent) -> Any:
+        try:
+            return validator(_content_str(content))
+        except (TypeError, ValueError):
+            return Sentinel
+
+    return caster
+
+
+def _element_caster(element_type: Type[Element]) -> Callable[[ChainContent], Any]:
+    def caster(content: ChainContent) -> Any:
+        if len(content) != 1:
+            return Sentinel
+        if element_type is Plain:
+            return Plain(content[0]) if content[0].__class__ is str else Sentinel
+        return content[0] if content[0].__class__ is element_type else Sentinel
+
+    return caster
+
+
+def _chain_caster(content: ChainContent) -> Any:
+    try:
+        return MessageChain(content)
+    except ValueError:
+        return Sentinel
+
+
+CHAIN_CASTERS: Dict[Any, Callable[[ChainContent], Any]] = {
+    MessageChain: _chain_caster,
+    str: _pydantic_caster(str_validator),
+    int: _pydantic_caster(int_validator),
+    bool: _pydantic_caster(bool_validator),
+}
+"""常见类型标注的快速转换函数, 接收非空的 ChainContent, 结果与 `chain_validator` 及 pydantic 验证相同, \
+无法处理时返回 Sentinel"""
+
+
+def get_chain_caster(annotation: Any) -> Optional[Callable[[ChainContent], Any]]:
+    """获取类型标注对应的快速转换函数
+
+    Args:
+        annotation (Any): 类型标注
+
+    Returns:
+        Optional[Callable[[ChainContent], Any]]: 快速转换函数, 不支持该类型时为 None
+    """
+    if annotation in CHAIN_CASTERS:
+        return CHAIN_CASTERS[annotation]
+    if isinstance(annotation, type) and issubclass(annotation, Element):
+        return _element_caster(annotation)
+    return None
+
+
 class ParamDesc(abc.ABC):
     field: ModelField
     dest: str
+    caster: Optional[Callable[[Any], Any]] = None
+    """在 `command()` 时生成的快速转换函数, 返回 Sentinel 时回退到 pydantic 验证"""
 
     @abc.abstractmethod
     def populate_field(self, validators: Iterable[Callable]) -> None:
@@ -117,6 +179,8 @@ class ParamDesc(abc.ABC):
         ...
 
     def validate(self, v: Any) -> Any:
+        if self.caster is not None and (res := self.caster(v)) is not Sentinel:
+            return res
         res, err = self.field.validate(v, {self.field.name: v}, loc=self.dest)
         if err:
             raise ValueError(err)
@@ -188,6 +252,35 @@ class Slot(ParamDesc):
             self.default_factory,
             validators,
         )
+        self.caster = None
+        if self.is_wildcard:
+            if list(validators) == [wildcard_validator]:
+                self.caster = self._compile_wildcard_caster()
+        elif list(validators) == [chain_validator] and (caster := get_chain_caster(self.type)):
+            self.caster = lambda v: caster(v) if v.__class__ is list and v else Sentinel
+
+    def _compile_wildcard_caster(self) -> Optional[Callable[[Any], Any]]:
+        if self.type is raw:
+
+            def join(v: Any) -> Any:
+                if v.__class__ is not list:
+                    return Sentinel
+                try:
+                    return MessageChain(" ").join([MessageChain(content) for content in v])
+                except ValueError:
+                    return Sentinel
+
+            return join
+        if not (caster := get_chain_caster(self.field.type_)):
+            return None
+
+        def cast_all(v: Any) -> Any:
+            if v.__class__ is not list or not v or not all(v):
+                return Sentinel
+            result = [caster(content) for content in v]
+            return Sentinel if any(r is Sentinel for r in result) else result
+
+        return cast_all
 
     def merge(self, other: Self) -> Self:
         if self.type is Sentinel and other.type is not Sentinel:
@@ -256,6 +349,17 @@ class Arg(ParamDesc):
         assert self.type is not Sentinel, f"{self} don't have an appropriate type!"
         assert self.default_factory is not Sentinel, f"{self} doesn't have default value!"
         self.field = _make_field(self.dest, self.type, Sentinel, validators)
+        self.caster = None
+        if list(validators) != [chain_validator]:
+            return
+        if not self.tags and self.type is bool:
+            self.caster = lambda v: v if v.__class__ is bool else Sentinel
+        elif (
+            len(self.tags) == 1
+            and not (isinstance(self.type, type) and issubclass(self.type, Element))
+            and (caster := get_chain_caster(self.type))
+        ):  # the value is a list holding one ChainContent
+            self.caster = lambda v: caster(v[0]) if v.__class__ is list and len(v) == 1 and v[0] else Sentinel
 
     def update(self, annotation: MaybeFlag[Any], default: MaybeFlag[Any]) -> None:
         if self.type is Sentinel and annotation is not Sentinel:
@@ -358,11 +462,6 @@ class ParseData(NamedTuple):
     params: Tuple[ChainContent, ...]
 
 
-commander_param_ctx = ContextVar("commander_param_ctx")
-
-param_dispatcher = ContextVarDispatcher(commander_param_ctx)
-
-
 class Commander:
     """便利的指令触发体系"""
 
@@ -574,7 +673,7 @@ class Commander:
         pending_exec: Dict[int, List[Tuple[CommandEntry, dict]]] = {}
         pending_next: Deque[ParseData] = Deque([ParseData(0, self.match_root, ())])
 
-        dispatchers: List[T_Dispatcher] = [param_dispatcher]
+        dispatchers: List[T_Dispatcher] = []
 
         if event := event_ctx.get(None):
             dispatchers.extend(dispatcher_mixin_handler(event.Dispatcher))
@@ -603,11 +702,38 @@ class Commander:
                 push_pending(index, nxt, params + (frag,))
 
         for _, execution in sorted(pending_exec.items()):
-            tasks: List[asyncio.Task] = []
-            for entry, param in execution:
-                commander_param_ctx.set(param)
-                tasks.append(self.broadcast.loop.create_task(self.broadcast.Executor(entry, dispatchers)))
-            done, _ = await asyncio.wait(tasks)
-            for task in done:
-                if task.exception() and isinstance(task.exception(), PropagationCancelled):
-                    return
+            if await self.run_group(execution, dispatchers):
+                return
+
+    async def run_group(
+        self, execution: List[Tuple[CommandEntry, dict]], dispatchers: List[T_Dispatcher]
+    ) -> bool:
+        """执行同一优先级的所有匹配项.
+
+        仅有一个匹配项时直接在当前任务中执行, 否则并发执行并等待全部完成.
+        参数通过各自的 `ParamDispatcher` 显式传递.
+
+        Args:
+            execution (List[Tuple[CommandEntry, dict]]): 匹配项与其参数
+            dispatchers (List[T_Dispatcher]): 附加的 Dispatcher
+
+        Returns:
+            bool: 是否有匹配项取消了传播
+        """
+        if len(execution) == 1:
+            entry, param = execution[0]
+            try:
+                await self.broadcast.Executor(entry, [ParamDispatcher(param), *dispatchers])
+            except PropagationCancelled:
+                return True
+            except Exception:
+                pass  # Executor 已经处理了异常
+            return False
+        results = await asyncio.gather(
+            *(
+                self.broadcast.Executor(entry, [ParamDispatcher(param), *dispatchers])
+                for entry, param in execution
+            ),
+            return_exceptions=True,
+        )
+        return any(isinstance(result, PropagationCancelled) for result in results)
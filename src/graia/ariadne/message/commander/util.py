@@ -12,13 +12,12 @@ from typing import (
     Generic,
     Iterable,
     List,
-    MutableMapping,
     Optional,
     Set,
     TypeVar,
     Union,
 )
-from weakref import WeakKeyDictionary, WeakSet
+from weakref import WeakSet
 
 from graia.broadcast.entities.decorator import Decorator
 from graia.broadcast.entities.dispatcher import BaseDispatcher
@@ -28,6 +27,7 @@ from typing_extensions import Self
 from ...typing import MaybeFlag, Sentinel, T
 from ..chain import MessageChain
 from ..element import Element, Plain, Quote, Source
+from ..parser.util import SPLIT_QUOTE_PAIRS, SplitMode, scan_quoted
 
 L_PAREN = ("{", "[")
 R_PAREN = ("}", "]")
@@ -281,13 +281,27 @@ class ContextVarDispatcher(BaseDispatcher):
         return self.data_ctx.get().get(interface.name)
 
 
+class ParamDispatcher(BaseDispatcher):
+    """分发单次执行的参数给指定名称的参数
+
+    Broadcast 会缓存成功分发参数的 Dispatcher 实例, 因此参数存放在本次执行的 `DispatcherInterface` 上.
+    """
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.data = data
+
+    async def beforeExecution(self, interface: DispatcherInterface):
+        interface.local_storage["commander_param"] = self.data
+
+    async def catch(self, interface: DispatcherInterface):
+        return interface.local_storage.get("commander_param", {}).get(interface.name)
+
+
 ChainContent = List[Union[str, Element]]
 
 ChainContentList = List[ChainContent]
 
-split_cache: MutableMapping[MessageChain, ChainContentList] = WeakKeyDictionary()
-
-quote_pairs = {"'": "'", '"': '"', "‘": "’", "“": "”"}
+quote_pairs = SPLIT_QUOTE_PAIRS[SplitMode.COMMANDER]
 
 
 def extract_str(buf: ChainContent) -> Optional[str]:
@@ -296,8 +310,10 @@ def extract_str(buf: ChainContent) -> Optional[str]:
 
 
 def split(chain: MessageChain) -> ChainContentList:
-    if chain in split_cache:
-        return split_cache[chain]
+    return chain.projection("commander_split", lambda: _split(chain))
+
+
+def _split(chain: MessageChain) -> ChainContentList:
     result: ChainContentList = []
     quote: str = ""
     buffer: ChainContent = []
@@ -308,30 +324,13 @@ def split(chain: MessageChain) -> ChainContentList:
         if not isinstance(elem, Plain):
             buffer.append(elem)
             continue
-        cache: List[str] = []
-        skipping: bool = False
-        for char in elem.text:
-            if char == "\\" or skipping:
-                skipping = not skipping
-                continue
-            if char in quote_pairs and not quote:
-                quote = quote_pairs[char]
-                continue
-            elif char == quote:
-                quote = ""
-                continue
-            if char == " " and (cache or buffer) and not quote:
-                if cache:
-                    buffer.append("".join(cache))
-                    cache.clear()
-                if buffer:
-                    result.append(buffer)
-                    buffer = []  # buffer is "move"d, so DO NOT clear.
-            elif quote or char != " ":
-                cache.append(char)
-        if cache:
-            buffer.append("".join(cache))
+        tokens, quote = scan_quoted(elem.text, SplitMode.COMMANDER, quote)
+        for index, token in enumerate(tokens):
+            if index and buffer:
+                result.append(buffer)
+                buffer = []  # buffer is "move"d, so DO NOT clear.
+            if token:
+                buffer.append(token)
     if buffer:
         result.append(buffer)
-    split_cache[chain] = result
     return result
@@ -1,9 +1,7 @@
 """Ariadne 基础的 parser, 包括 DetectPrefix 与 DetectSuffix"""
 import abc
-import difflib
 import fnmatch
 import re
-import weakref
 from collections import defaultdict
 from typing import (
     ClassVar,
@@ -30,11 +28,15 @@ from ...event.message import GroupMessage, MessageEvent
 from ...typing import Unions, generic_issubclass, get_origin
 from ..chain import MessageChain
 from ..element import At, Element, Plain
+from .util import ChainMatcher, FuzzyIndex
 
 
 class ChainDecorator(abc.ABC, Decorator, Derive[MessageChain]):
     pre = True
 
+    matcher: ClassVar[ChainMatcher] = ChainMatcher()
+    """所有解析器共享的多模式匹配器"""
+
     @abc.abstractmethod
     async def __call__(self, chain: MessageChain, interface: DispatcherInterface) -> Optional[MessageChain]:
         ...
@@ -56,10 +58,13 @@ class DetectPrefix(ChainDecorator):
             prefix (Union[str, Iterable[str]]): 要匹配的前缀
         """
         self.prefix: List[str] = [prefix] if isinstance(prefix, str) else list(prefix)
+        for p in self.prefix:
+            self.matcher.add_prefix(p)
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
+        matched = self.matcher.prefixes(chain)
         for prefix in self.prefix:
-            if chain.startswith(prefix):
+            if prefix in matched:
                 return chain.removeprefix(prefix).removeprefix(" ")
 
         raise ExecutionStop
@@ -75,10 +80,13 @@ class DetectSuffix(ChainDecorator):
             suffix (Union[str, Iterable[str]]): 要匹配的后缀
         """
         self.suffix: List[str] = [suffix] if isinstance(suffix, str) else list(suffix)
+        for s in self.suffix:
+            self.matcher.add_suffix(s)
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
+        matched = self.matcher.suffixes(chain)
         for suffix in self.suffix:
-            if chain.endswith(suffix):
+            if suffix in matched:
                 return chain.removesuffix(suffix).removesuffix(" ")
         raise ExecutionStop
 
@@ -146,9 +154,11 @@ class ContainKeyword(ChainDecorator):
             keyword (str): 关键字
         """
         self.keyword: str = keyword
+        if keyword:
+            self.matcher.add_keyword(keyword)
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
-        if self.keyword not in chain:
+        if self.keyword not in (self.matcher.keywords(chain) if self.keyword else chain):
             raise ExecutionStop
         return chain
 
@@ -165,7 +175,7 @@ class MatchContent(ChainDecorator):
         self.content: Union[str, MessageChain] = content
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
-        if isinstance(self.content, str) and str(chain) != self.content:
+        if isinstance(self.content, str) and chain.display != self.content:
             raise ExecutionStop
         if isinstance(self.content, MessageChain) and chain != self.content:
             raise ExecutionStop
@@ -299,6 +309,8 @@ class FuzzyMatch(ChainDecorator):
         我们更推荐使用 FuzzyDispatcher 来进行模糊匹配操作, 因为其具有上下文匹配数量限制.
     """
 
+    index: ClassVar[FuzzyIndex] = FuzzyIndex()
+
     def __init__(self, template: str, min_rate: float = 0.6) -> None:
         """初始化
 
@@ -308,23 +320,11 @@ class FuzzyMatch(ChainDecorator):
         """
         self.template: str = template
         self.min_rate: float = min_rate
+        self.index.add(template)
 
     def match(self, chain: MessageChain):
         """匹配消息链"""
-        text_frags: List[str] = []
-        for element in chain:
-            if isinstance(element, Plain):
-                text_frags.append(element.text)
-            else:
-                text_frags.append(str(element))
-        text = "".join(text_frags)
-        matcher = difflib.SequenceMatcher(a=text, b=self.template)
-        # return false when **any** ratio calc falls undef the rate
-        if matcher.real_quick_ratio() < self.min_rate:
-            return False
-        if matcher.quick_ratio() < self.min_rate:
-            return False
-        return matcher.ratio() >= self.min_rate
+        return self.index.rate(chain.display, self.template, self.min_rate) >= self.min_rate
 
     async def __call__(self, chain: MessageChain, _) -> Optional[MessageChain]:
         if not self.match(chain):
@@ -334,7 +334,7 @@ class FuzzyMatch(ChainDecorator):
 
 class FuzzyDispatcher(BaseDispatcher):
     scope_map: ClassVar[DefaultDict[str, List[str]]] = defaultdict(list)
-    event_ref: ClassVar["Dict[int, Dict[str, Tuple[str, float]]]"] = {}
+    index_map: ClassVar[DefaultDict[str, FuzzyIndex]] = defaultdict(FuzzyIndex)
 
     def __init__(self, template: str, min_rate: float = 0.6, scope: str = "") -> None:
         """初始化
@@ -348,43 +348,20 @@ class FuzzyDispatcher(BaseDispatcher):
         self.min_rate: float = min_rate
         self.scope: str = scope
         self.scope_map[scope].append(template)
+        self.index_map[scope].add(template)
 
     async def beforeExecution(self, interface: DispatcherInterface):
-        event = interface.event
-        if id(event) not in self.event_ref:
-            chain: MessageChain = await interface.lookup_param("message_chain", MessageChain, None)
-            text_frags: List[str] = []
-            for element in chain:
-                if isinstance(element, Plain):
-                    text_frags.append(element.text)
-                else:
-                    text_frags.append(str(element))
-            text = "".join(text_frags)
-            matcher = difflib.SequenceMatcher()
-            matcher.set_seq2(text)
-            rate_calc = self.event_ref[id(event)] = {}
-            weakref.finalize(event, lambda d: self.event_ref.pop(d), id(event))
-            for scope, templates in self.scope_map.items():
-                max_match: float = 0.0
-                for template in templates:
-                    matcher.set_seq1(template)
-                    if matcher.real_quick_ratio() < max_match:
-                        continue
-                    if matcher.quick_ratio() < max_match:
-                        continue
-                    if matcher.ratio() < max_match:
-                        continue
-                    rate_calc[scope] = (template, matcher.ratio())
-                    max_match = matcher.ratio()
-        win_template, win_rate = self.event_ref[id(event)].get(self.scope, (self.template, 0.0))
+        chain = getattr(interface.event, "message_chain", None)
+        if not isinstance(chain, MessageChain):
+            chain = await interface.lookup_param("message_chain", MessageChain, None)
+        win_template, win_rate = self.index_map[self.scope].best(chain.display) or (self.template, 0.0)
         if win_template != self.template or win_rate < self.min_rate:
             raise ExecutionStop
+        interface.local_storage[f"fuzzy_rate.{self.scope}"] = win_rate
 
     async def catch(self, i: DispatcherInterface) -> Optional[float]:
-        event = i.event
-        _, rate = self.event_ref[id(event)].get(self.scope, (self.template, 0.0))
         if generic_issubclass(float, i.annotation) and "rate" in i.name:
-            return rate
+            return i.local_storage.get(f"fuzzy_rate.{self.scope}", 0.0)
 
 
 StartsWith = DetectPrefix
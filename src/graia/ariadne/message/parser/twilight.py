@@ -10,6 +10,7 @@ from typing import (
     Any,
     Awaitable,
     Callable,
+    ClassVar,
     DefaultDict,
     Dict,
     Generic,
@@ -17,6 +18,7 @@ from typing import (
     List,
     Literal,
     Optional,
+    Set,
     Tuple,
     Type,
     TypedDict,
@@ -26,6 +28,7 @@ from typing import (
     final,
     overload,
 )
+from weakref import WeakSet
 
 from graia.broadcast.builtin.derive import Derive, DeriveDispatcher
 from graia.broadcast.entities.decorator import Decorator
@@ -53,6 +56,7 @@ from .util import (
     ElementType,
     MessageChainType,
     TwilightHelpManager,
+    TwilightOptionParser,
     TwilightParser,
     Unmatched,
     elem_mapping_ctx,
@@ -420,10 +424,49 @@ class ArgResult(Generic[T], MatchResult[T, ArgumentMatch]):
     ...
 
 
+_result_slot = MatchResult.__dict__["result"]
+
+
 class RegexResult(MatchResult[MessageChain, RegexMatch]):
-    """表示 RegexMatch 匹配结果"""
+    """表示 RegexMatch 匹配结果, 消息链在首次访问 `result` 时才会从映射字符串还原"""
 
-    ...
+    __slots__ = ("_source",)
+
+    def __init__(
+        self,
+        matched: bool,
+        origin: RegexMatch,
+        result: Optional[MessageChain] = None,
+        *,
+        source: Optional[Tuple[str, Dict[str, Element]]] = None,
+    ) -> None:
+        """初始化 RegexResult 对象.
+
+        Args:
+            matched (bool): 是否匹配成功
+            origin (RegexMatch): 原来的 Match 对象
+            result (MessageChain, optional): 匹配结果. Defaults to None.
+            source (Tuple[str, Dict[str, Element]], optional): 匹配到的映射字符串与元素映射, \
+                指定时 `result` 会在首次访问时由其生成. Defaults to None.
+        """
+        super().__init__(matched, origin, result)
+        self._source = source
+
+    @property
+    def result(self) -> Optional[MessageChain]:  # type: ignore
+        """匹配结果"""
+        if self._source is not None:
+            string, mapping = self._source
+            self.result = MessageChain._from_mapping_string(string, mapping)
+        return _result_slot.__get__(self)
+
+    @result.setter
+    def result(self, value: Optional[MessageChain]) -> None:
+        self._source = None
+        _result_slot.__set__(self, value)
+
+    def __repr_args__(self):
+        return [("matched", self.matched), ("result", self.result), ("origin", self.origin)]
 
 
 class ElementResult(MatchResult[Element, ElementMatch]):
@@ -522,6 +565,32 @@ class TwilightMatcher:
                     self.dispatch_ref[m.dest] = m
 
         self._regex_pattern: re.Pattern = re.compile("".join(regex_str_list))
+        self._option_parser: Union[TwilightOptionParser, TwilightParser] = (
+            TwilightOptionParser.compile(self._parser) or self._parser
+        )
+
+        self.prefixes: Optional[Tuple[str, ...]] = None
+        """消息必须以其中之一开头 (忽略反斜杠), 为 None 时不限制"""
+        regex_matches = self.match_ref[RegexMatch]
+        if regex_matches and not self.match_ref[ArgumentMatch]:
+            head = regex_matches[0]
+            if not head.optional and not head._flags:
+                if head.__class__ is FullMatch:
+                    self.prefixes = (head.pattern,)
+                elif head.__class__ is UnionMatch and head.pattern:
+                    self.prefixes = tuple(head.pattern)
+
+        self.min_tokens: int = 1
+        """消息至少需要的以空格分隔的片段数"""
+        for m in regex_matches:
+            if m.space_policy is SpacePolicy.FORCE:
+                self.min_tokens += 1
+            if m.optional:
+                continue
+            if m.__class__ is FullMatch:
+                self.min_tokens += m.pattern.count(" ")
+            elif m.__class__ is UnionMatch and m.pattern:
+                self.min_tokens += min(p.count(" ") for p in m.pattern)
 
     def match(
         self, arguments: List[str], elem_mapping: Dict[str, Element]
@@ -536,7 +605,7 @@ class TwilightMatcher:
         """
         result: Dict[Union[int, str], MatchResult] = {}
         if self._dest_map:
-            namespace, arguments = self._parser.parse_known_args(arguments)
+            namespace, arguments = self._option_parser.parse_known_args(arguments)
             nbsp_dict: Dict[str, Any] = namespace.__dict__
             for k, v in self._dest_map.items():
                 res = nbsp_dict.get(k, Unmatched)
@@ -545,20 +614,15 @@ class TwilightMatcher:
             raise ValueError(f"{' '.join(arguments)} not matching {self._regex_pattern.pattern}")
         for index, match in self._group_map.items():
             group: Optional[str] = total_match.group(index)
-            if group is None:
-                res = None
+            if isinstance(match, ElementMatch):
+                res = None if group is None else elem_mapping[group[1:-1].split("_")[0]]
+                result[match.dest] = MatchResult(group is not None, match, res)
+            elif group is None:
+                result[match.dest] = RegexResult(False, match)
             else:
-                res = (
-                    elem_mapping[group[1:-1].split("_")[0]]
-                    if isinstance(match, ElementMatch)
-                    else MessageChain._from_mapping_string(group, elem_mapping)
-                )
-
-            if match.dest:
-                if isinstance(match, WildcardMatch):
-                    result[match.dest] = MatchResult(bool(res), match, res)
-                else:
-                    result[match.dest] = MatchResult(group is not None, match, res)
+                # an empty wildcard restores to an empty chain, which does not count as matched
+                matched = bool(group) or not isinstance(match, WildcardMatch)
+                result[match.dest] = RegexResult(matched, match, source=(group, elem_mapping))
         return result, total_match
 
     def get_help(
@@ -627,11 +691,61 @@ class _TwilightHelpArgs(TypedDict):
     formatter_class: Type[HelpFormatter]
 
 
+class TwilightIndex:
+    """以前缀索引所有 Twilight, 对每条消息链只查找一次可能匹配的 Twilight"""
+
+    def __init__(self) -> None:
+        self.literals: Dict[str, "WeakSet[Twilight]"] = {}
+        self.lengths: List[int] = []
+        self.version: int = 0
+
+    def register(self, twilight: "Twilight") -> None:
+        """将 Twilight 加入索引
+
+        Args:
+            twilight (Twilight): 具有前缀的 Twilight
+        """
+        for literal in twilight.matcher.prefixes or ():
+            self.literals.setdefault(literal, WeakSet()).add(twilight)
+        self.lengths = sorted({len(literal) for literal in self.literals})
+        self.version += 1
+
+    def candidates(self, head: str) -> Set["Twilight"]:
+        """查找前缀与消息开头相符的 Twilight
+
+        Args:
+            head (str): 去除反斜杠后的映射字符串
+
+        Returns:
+            Set[Twilight]: 可能匹配的 Twilight
+        """
+        result: Set[Twilight] = set()
+        for length in self.lengths:
+            if length > len(head):
+                break
+            if twilights := self.literals.get(head[:length]):
+                result.update(twilights)
+        return result
+
+
+def _twilight_lookup(
+    chain: MessageChain, map_param: Dict[str, bool], index: TwilightIndex
+) -> Tuple[int, Set["Twilight"]]:
+    mapping_str, _ = chain._to_mapping_str(**map_param)
+    # `split` only drops backslashes and trailing spaces, so the string matched
+    # by the regex is a prefix of `head` and never holds more spaces than it
+    head = mapping_str.replace("\\", "") if "\\" in mapping_str else mapping_str
+    return head.count(" ") + 1, index.candidates(head)
+
+
 class Twilight(Generic[T_Sparkle], BaseDispatcher):
     """暮光"""
 
     preprocessor: Union[ChainDecorator, AnnotatedType, None] = None
 
+    index: ClassVar[TwilightIndex] = TwilightIndex()
+    """所有 Twilight 共享的前缀索引"""
+
     def __init__(
         self,
         *root: Union[Iterable[Match], Match],
@@ -653,10 +767,31 @@ class Twilight(Generic[T_Sparkle], BaseDispatcher):
         self.help_id: str = TwilightHelpManager.AUTO_ID
         self.help_brief: str = TwilightHelpManager.AUTO_ID
         self.matcher: TwilightMatcher = TwilightMatcher(*root)
+        if self.matcher.prefixes is not None:
+            self.index.register(self)
 
     def __repr__(self) -> str:
         return f"<Twilight: {self.matcher}>"
 
+    def accepts(self, chain: MessageChain) -> bool:
+        """根据前缀与最少片段数快速判断消息链是否可能匹配, 不会解析消息链.
+
+        Args:
+            chain (MessageChain): 传入的消息链.
+
+        Returns:
+            bool: 为 False 时 `generate` 一定会失败.
+        """
+        matcher = self.matcher
+        if matcher.prefixes is None and matcher.min_tokens <= 1:
+            return True
+        index = self.index
+        tokens, candidates = chain.projection(
+            ("twilight_lookup", tuple(self.map_param.items()), id(index), index.version),
+            lambda: _twilight_lookup(chain, self.map_param, index),
+        )
+        return tokens >= matcher.min_tokens and (matcher.prefixes is None or self in candidates)
+
     def generate(self, chain: MessageChain, storage: Optional[Dict[str, Any]] = None) -> T_Sparkle:
         """从消息链生成 Sparkle 实例.
 
@@ -668,7 +803,9 @@ class Twilight(Generic[T_Sparkle], BaseDispatcher):
         """
         mapping_str, elem_mapping = chain._to_mapping_str(**self.map_param)
         token = elem_mapping_ctx.set(elem_mapping)
-        arguments: List[str] = split(mapping_str, keep_quote=True)
+        arguments: List[str] = chain.projection(
+            ("split", mapping_str, True), lambda: split(mapping_str, keep_quote=True)
+        )
         res, match = self.matcher.match(arguments, elem_mapping)
         if storage:
             storage["__parser_regex_match_obj__"] = match
@@ -803,6 +940,8 @@ class Twilight(Generic[T_Sparkle], BaseDispatcher):
             )
         else:
             chain = await interface.lookup_param("message_chain", MessageChain, None)
+        if not self.accepts(chain):
+            interface.stop()
         with contextlib.suppress(Exception):
             local_storage[f"{__name__}:result"] = self.generate(chain, local_storage)
             local_storage[f"{__name__}:twilight"] = self
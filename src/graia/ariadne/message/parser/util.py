@@ -1,24 +1,30 @@
 """消息链处理器用到的工具函数, 类"""
 import argparse
+import enum
 import inspect
 import re
+from collections import Counter, OrderedDict, deque
 from contextvars import ContextVar
 from typing import (
     TYPE_CHECKING,
+    Any,
     Callable,
     ClassVar,
     Dict,
     Final,
+    Iterable,
     List,
     Literal,
     NoReturn,
     Optional,
+    Set,
+    Tuple,
     Type,
     Union,
     overload,
 )
 
-from ...message.element import Element
+from ...message.element import Element, Plain
 from ...typing import T
 from ..chain import Element_T, MessageChain
 
@@ -28,40 +34,452 @@ if TYPE_CHECKING:
 elem_mapping_ctx: ContextVar[Dict[str, Element]] = ContextVar("elem_mapping_ctx")
 
 
-def split(string: str, keep_quote: bool = False) -> List[str]:
-    """尊重引号与转义的字符串切分
+class SplitMode(str, enum.Enum):
+    """指示 `scan_quoted` 的引号与转义规则."""
+
+    value: str
+
+    TWILIGHT = "twilight"
+    """移除反斜杠, 反斜杠后的引号不会结束引用, 支持 `'` 与 `"`"""
+
+    COMMANDER = "commander"
+    """反斜杠与其后的一个字符一同被移除, 额外支持中文引号"""
+
+
+SPLIT_QUOTE_PAIRS: Dict[SplitMode, Dict[str, str]] = {
+    SplitMode.TWILIGHT: {"'": "'", '"': '"'},
+    SplitMode.COMMANDER: {"'": "'", '"': '"', "‘": "’", "“": "”"},
+}
+
+_SPLIT_PATTERNS: Dict[SplitMode, re.Pattern] = {
+    mode: re.compile("[" + re.escape("".join(sorted({"\\", *pairs}))) + "]")
+    for mode, pairs in SPLIT_QUOTE_PAIRS.items()
+}
+
+
+def scan_quoted(
+    text: str, mode: SplitMode, quote: str = "", keep_quote: bool = False
+) -> Tuple[List[str], str]:
+    """按引号与转义规则以引用外的空格切分文本, 引号与反斜杠之间的文本整段处理
 
     Args:
-        string (str): 要切割的字符串
-        keep_quote (bool): 是否保留引号, 默认 False.
+        text (str): 要切分的文本
+        mode (SplitMode): 引号与转义规则
+        quote (str, optional): 开始时所处引用的结束引号. Defaults to "".
+        keep_quote (bool, optional): 是否保留引号, 仅用于 `SplitMode.TWILIGHT`. Defaults to False.
 
     Returns:
-        List[str]: 切割后的字符串, 可能含有空格
+        Tuple[List[str], str]: 切分结果 (片段数总是引用外的空格数加一, 可能为空字符串), \
+            以及结束时所处引用的结束引号
     """
-    result: List[str] = []
-    quote = ""
+    pairs = SPLIT_QUOTE_PAIRS[mode]
+    twilight = mode is SplitMode.TWILIGHT
+    tokens: List[str] = []
     cache: List[str] = []
-    for index, char in enumerate(string):
-        if char in {"'", '"'}:
-            if not quote:
-                quote = char
-            elif char == quote and index and string[index - 1] != "\\":  # is current quote, not transfigured
-                quote = ""
+    pos, length = 0, len(text)
+    while pos < length:
+        if quote:  # spaces and other quotes are plain text here
+            end = text.find(quote, pos)
+            escape = -1
+            if twilight:
+                while end != -1 and (not end or text[end - 1] == "\\"):
+                    end = text.find(quote, end + 1)
             else:
-                cache.append(char)
+                escape = text.find("\\", pos, length if end == -1 else end)
+            if escape != -1:  # drop the backslash and the character after it
+                cache.append(text[pos:escape])
+                pos = escape + 2
                 continue
+            if end == -1:
+                end = length
+            piece = text[pos:end]
+            cache.append(piece.replace("\\", "") if twilight else piece)
+            if end < length:
+                quote = ""
+                if keep_quote:
+                    cache.append(text[end])
+            pos = end + 1
+            continue
+        match = _SPLIT_PATTERNS[mode].search(text, pos)
+        end = match.start() if match else length
+        piece = text[pos:end]
+        if " " in piece:
+            first, *parts, last = piece.split(" ")
+            cache.append(first)
+            tokens.append("".join(cache))
+            tokens.extend(parts)
+            cache = [last]
+        else:
+            cache.append(piece)
+        if end == length:
+            break
+        char = text[end]
+        if char == "\\":
+            pos = end + 1 if twilight else end + 2
+        else:
+            quote = pairs[char]
             if keep_quote:
                 cache.append(char)
-        elif not quote and char == " ":
-            result.append("".join(cache))
-            cache = []
-        elif char != "\\":
-            cache.append(char)
-    if cache:
-        result.append("".join(cache))
+            pos = end + 1
+    tokens.append("".join(cache))
+    return tokens, quote
+
+
+def split(string: str, keep_quote: bool = False) -> List[str]:
+    """尊重引号与转义的字符串切分
+
+    Args:
+        string (str): 要切割的字符串
+        keep_quote (bool): 是否保留引号, 默认 False.
+
+    Returns:
+        List[str]: 切割后的字符串, 可能含有空格
+    """
+    if "\\" in string or "'" in string or '"' in string:
+        result = scan_quoted(string, SplitMode.TWILIGHT, keep_quote=keep_quote)[0]
+    else:
+        result = string.split(" ")
+    if not result[-1]:
+        result.pop()
     return result
 
 
+def _char_masks(text: str) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for pos, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | 1 << pos
+    return masks
+
+
+def _lcs_length(masks: Dict[str, int], length: int, text: str) -> int:
+    # bit-parallel LCS (Hyyrö), every cleared bit of `v` is a matched position of the masked string
+    v = full = (1 << length) - 1
+    for char in text:
+        if mask := masks.get(char):
+            u = v & mask
+            v = ((v + u) | (v - u)) & full
+    return length - bin(v).count("1")
+
+
+def fuzzy_ratio(a: str, b: str) -> float:
+    """计算两个字符串的相似度
+
+    与 `difflib.SequenceMatcher.ratio` 一样定义为 `2 * M / (len(a) + len(b))`, \
+    但 M 为最长公共子序列的长度 (即由插入/删除编辑距离得出), 因此结果不低于 `SequenceMatcher.ratio`.
+
+    Args:
+        a (str): 字符串
+        b (str): 字符串
+
+    Returns:
+        float: 0 到 1 之间的相似度, 两个空字符串的相似度为 1
+    """
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+    if len(a) < len(b):
+        a, b = b, a
+    return 2 * _lcs_length(_char_masks(b), len(b), a) / total
+
+
+class _FuzzyResult:
+    __slots__ = ("common", "rates", "best")
+
+    def __init__(self, common: "Counter[str]") -> None:
+        self.common: "Counter[str]" = common
+        self.rates: Dict[str, float] = {}
+        self.best: Optional[Tuple[str, float]] = None
+
+
+class FuzzyIndex:
+    """模糊匹配模板的字符索引
+
+    由字符的出现次数求出每个模板 `fuzzy_ratio` 的上界, 只为上界足够高的模板计算精确的相似度. \
+    每条文本的结果保存在有界的缓存中, 添加模板时清空缓存.
+    """
+
+    def __init__(self, cache_size: int = 256) -> None:
+        """初始化
+
+        Args:
+            cache_size (int): 缓存的文本数量上限
+        """
+        self.cache_size: int = cache_size
+        self.templates: Dict[str, int] = {}
+        """模板及其最后一次添加的序号"""
+        self.last: Optional[str] = None
+        self.postings: Dict[str, Dict[int, List[str]]] = {}
+        self.masks: Dict[str, Dict[str, int]] = {}
+        self.cache: "OrderedDict[str, _FuzzyResult]" = OrderedDict()
+        self.counter: int = 0
+
+    def add(self, template: str) -> None:
+        """添加模板
+
+        Args:
+            template (str): 模板字符串
+        """
+        if template not in self.templates:
+            for char, count in Counter(template).items():
+                self.postings.setdefault(char, {}).setdefault(count, []).append(template)
+            self.masks[template] = _char_masks(template)
+        self.counter += 1
+        self.templates[template] = self.counter
+        self.last = template
+        self.cache.clear()
+
+    def _lookup(self, text: str) -> _FuzzyResult:
+        if result := self.cache.get(text):
+            self.cache.move_to_end(text)
+            return result
+        common: "Counter[str]" = Counter()
+        for char, count in Counter(text).items():
+            for template_count, group in self.postings.get(char, {}).items():
+                for _ in range(min(count, template_count)):
+                    common.update(group)
+        result = self.cache[text] = _FuzzyResult(common)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def _exact(self, result: _FuzzyResult, text: str, template: str) -> float:
+        if (rate := result.rates.get(template)) is None:
+            if total := len(text) + len(template):
+                rate = 2 * _lcs_length(self.masks[template], len(template), text) / total
+            else:
+                rate = 1.0
+            result.rates[template] = rate
+        return rate
+
+    def rate(self, text: str, template: str, min_rate: float = 0.0) -> float:
+        """计算文本与模板的相似度
+
+        Args:
+            text (str): 文本
+            template (str): 模板字符串
+            min_rate (float): 最小匹配阈值, 相似度的上界低于它时直接返回上界
+
+        Returns:
+            float: 相似度, 低于 min_rate 时可能只是上界
+        """
+        if template not in self.templates:
+            return fuzzy_ratio(text, template)
+        if not text or not template:
+            return float(text == template)
+        result = self._lookup(text)
+        bound = 2 * result.common.get(template, 0) / (len(text) + len(template))
+        if bound < min_rate or not bound:
+            return bound
+        return self._exact(result, text, template)
+
+    def best(self, text: str) -> Optional[Tuple[str, float]]:
+        """查找与文本最相似的模板, 相似度相同时取最后添加的模板
+
+        Args:
+            text (str): 文本
+
+        Returns:
+            Optional[Tuple[str, float]]: 模板与相似度, 没有模板时为 None
+        """
+        if self.last is None:
+            return None
+        if not text:
+            return ("", 1.0) if "" in self.templates else (self.last, 0.0)
+        result = self._lookup(text)
+        if result.best is None:
+            order = self.templates
+            best_template, best_rate, best_order = self.last, 0.0, order[self.last]
+            if counts := result.common.most_common():
+                floor = self._exact(result, text, counts[0][0])
+                candidates: List[Tuple[float, int, str]] = []
+                for template, value in counts:
+                    # `value` never exceeds the template length, so this bounds every remaining ratio
+                    if 2 * value / (len(text) + value) < floor:
+                        break
+                    if (bound := 2 * value / (len(text) + len(template))) >= floor:
+                        candidates.append((bound, order[template], template))
+                for bound, position, template in sorted(candidates, reverse=True):
+                    if bound < best_rate:
+                        break
+                    rate = self._exact(result, text, template)
+                    if rate > best_rate or (rate == best_rate and position > best_order):
+                        best_template, best_rate, best_order = template, rate, position
+            result.best = best_template, best_rate
+        return result.best
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 多模式匹配自动机
+
+    添加关键字只会扩展字典树, 失配链接在下一次 `find` 时才重新计算.
+    """
+
+    def __init__(self) -> None:
+        self.goto: List[Dict[str, int]] = [{}]
+        self.output: List[Optional[str]] = [None]
+        self.fail: List[int] = [0]
+        self.link: List[int] = [-1]
+        self.built: bool = True
+        self.version: int = 0
+
+    def __contains__(self, keyword: str) -> bool:
+        node: Optional[int] = 0
+        for char in keyword:
+            if (node := self.goto[node].get(char)) is None:
+                return False
+        return self.output[node] is not None
+
+    def add(self, keyword: str) -> None:
+        """添加关键字
+
+        Args:
+            keyword (str): 关键字
+        """
+        if keyword in self:
+            return
+        node = 0
+        for char in keyword:
+            if (nxt := self.goto[node].get(char)) is None:
+                nxt = self.goto[node][char] = len(self.goto)
+                self.goto.append({})
+                self.output.append(None)
+            node = nxt
+        self.output[node] = keyword
+        self.built = False
+        self.version += 1
+
+    def build(self) -> None:
+        """计算失配链接与输出链接"""
+        goto, output = self.goto, self.output
+        fail, link = [0] * len(goto), [-1] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            back = fail[node]
+            link[node] = back if back and output[back] is not None else link[back]
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = back
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+        self.fail, self.link, self.built = fail, link, True
+
+    def prefixes(self, text: Iterable[str]) -> Set[str]:
+        """查找作为文本前缀的关键字
+
+        Args:
+            text (Iterable[str]): 文本, 可以是逐个给出字符的迭代器
+
+        Returns:
+            Set[str]: 文本开头的所有关键字
+        """
+        goto, output = self.goto, self.output
+        result: Set[str] = set() if output[0] is None else {""}
+        node: Optional[int] = 0
+        for char in text:
+            if (node := goto[node].get(char)) is None:
+                break
+            if output[node] is not None:
+                result.add(output[node])
+        return result
+
+    def find(self, texts: Iterable[str]) -> Set[str]:
+        """在文本中查找关键字
+
+        Args:
+            texts (Iterable[str]): 文本, 关键字不会跨越两段文本
+
+        Returns:
+            Set[str]: 出现过的所有非空关键字
+        """
+        if not self.built:
+            self.build()
+        goto, fail, output, link = self.goto, self.fail, self.output, self.link
+        found: Set[str] = set()
+        for text in texts:
+            state = 0
+            for char in text:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                if not (state := goto[state].get(char, 0)):
+                    continue
+                node = state if output[state] is not None else link[state]
+                # every keyword ends at a single node, so the rest of the chain is already collected
+                while node > 0 and output[node] not in found:
+                    found.add(output[node])  # type: ignore
+                    node = link[node]
+        return found
+
+
+def _edge_text(chain: MessageChain, index: int) -> Optional[str]:
+    content = chain.content
+    if content and isinstance(element := content[index], Plain):
+        return element.text
+    return None
+
+
+class ChainMatcher:
+    """由 `DetectPrefix`, `DetectSuffix` 与 `ContainKeyword` 共享的多模式匹配器
+
+    各解析器在初始化时注册自己的模式, 每条消息链对每种模式只扫描一次, 结果缓存在消息链的投影中.
+    """
+
+    def __init__(self) -> None:
+        self.prefix: KeywordAutomaton = KeywordAutomaton()
+        self.suffix: KeywordAutomaton = KeywordAutomaton()
+        """以反转后的后缀构建"""
+        self.keyword: KeywordAutomaton = KeywordAutomaton()
+
+    def add_prefix(self, prefix: str) -> None:
+        """注册前缀"""
+        self.prefix.add(prefix)
+
+    def add_suffix(self, suffix: str) -> None:
+        """注册后缀"""
+        self.suffix.add(suffix[::-1])
+
+    def add_keyword(self, keyword: str) -> None:
+        """注册关键字"""
+        self.keyword.add(keyword)
+
+    def _scan_prefixes(self, chain: MessageChain) -> Set[str]:
+        text = _edge_text(chain, 0)
+        return set() if text is None else self.prefix.prefixes(text)
+
+    def _scan_suffixes(self, chain: MessageChain) -> Set[str]:
+        text = _edge_text(chain, -1)
+        return set() if text is None else {s[::-1] for s in self.suffix.prefixes(reversed(text))}
+
+    def _scan_keywords(self, chain: MessageChain) -> Set[str]:
+        segments: List[str] = []
+        buffer: List[str] = []
+        for element in chain.content:
+            if isinstance(element, Plain):
+                buffer.append(element.text)
+            elif buffer:
+                segments.append("".join(buffer))
+                buffer = []
+        if buffer:
+            segments.append("".join(buffer))
+        return self.keyword.find(segments)
+
+    def prefixes(self, chain: MessageChain) -> Set[str]:
+        """获取消息链第一个元素的文本开头的已注册前缀"""
+        key = ("chain_matcher.prefix", id(self), self.prefix.version)
+        return chain.projection(key, lambda: self._scan_prefixes(chain))
+
+    def suffixes(self, chain: MessageChain) -> Set[str]:
+        """获取消息链最后一个元素的文本结尾的已注册后缀"""
+        key = ("chain_matcher.suffix", id(self), self.suffix.version)
+        return chain.projection(key, lambda: self._scan_suffixes(chain))
+
+    def keywords(self, chain: MessageChain) -> Set[str]:
+        """获取消息链中出现的已注册关键字, 关键字可以跨越相邻的 `Plain`, 但不会跨越其他元素"""
+        key = ("chain_matcher.keyword", id(self), self.keyword.version)
+        return chain.projection(key, lambda: self._scan_keywords(chain))
+
+
 def gen_flags_repr(flags: re.RegexFlag) -> str:
     """通过 RegexFlag 生成对应的字符串
 
@@ -168,6 +586,132 @@ class TwilightParser(argparse.ArgumentParser):
         return True
 
 
+class TwilightOptionParser:
+    """由 TwilightParser 中的 Action 编译而成的选项解析器
+
+    只处理与选项名完全相同的参数, 其余以 `-` 开头的参数 (缩写, `--opt=value`, 合并的短选项, `--` 等) \
+    会交给 argparse 处理. 结果与 `TwilightParser.parse_known_args` 相同.
+    """
+
+    def __init__(self, parser: TwilightParser) -> None:
+        self.parser: TwilightParser = parser
+        self.actions: List[argparse.Action] = list(parser._actions)
+        self.options: Dict[str, argparse.Action] = dict(parser._option_string_actions)
+        self.defaults: Dict[str, Any] = {}
+        for action in self.actions:
+            if action.dest is not argparse.SUPPRESS and action.default is not argparse.SUPPRESS:
+                self.defaults.setdefault(action.dest, action.default)
+
+    @classmethod
+    def compile(cls, parser: TwilightParser) -> Optional["TwilightOptionParser"]:
+        """编译解析器
+
+        Args:
+            parser (TwilightParser): 已添加所有参数的 TwilightParser
+
+        Returns:
+            Optional[TwilightOptionParser]: 编译结果, 解析器使用了不支持的功能时为 None
+        """
+        if (
+            parser.prefix_chars != "-"
+            or parser.fromfile_prefix_chars is not None
+            or parser._mutually_exclusive_groups
+            or parser._defaults
+        ):
+            return None
+        for action in parser._actions:
+            if not action.option_strings or action.nargs in (
+                argparse.REMAINDER,
+                argparse.PARSER,
+                argparse.SUPPRESS,
+            ):
+                return None
+        return cls(parser)
+
+    def _get_values(self, action: argparse.Action, arg_strings: List[str]) -> Any:
+        parser = self.parser
+        if not arg_strings and action.nargs == argparse.OPTIONAL:
+            value = action.const
+            if isinstance(value, str):
+                value = parser._get_value(action, value)
+                parser._check_value(action, value)
+        elif len(arg_strings) == 1 and action.nargs in (None, argparse.OPTIONAL):
+            value = parser._get_value(action, arg_strings[0])
+            parser._check_value(action, value)
+        else:
+            value = [parser._get_value(action, v) for v in arg_strings]
+            for v in value:
+                parser._check_value(action, v)
+        return value
+
+    def parse_known_args(self, args: List[str]) -> Tuple[argparse.Namespace, List[str]]:
+        """解析参数
+
+        Args:
+            args (List[str]): 参数列表
+
+        Returns:
+            Tuple[argparse.Namespace, List[str]]: 解析结果与未被使用的参数
+        """
+        options = self.options
+        for arg in args:
+            if arg[:1] == "-" and (arg == "--" or arg not in options):
+                return self.parser.parse_known_args(args)
+
+        namespace = argparse.Namespace(**self.defaults)
+        try:
+            extras = self._parse(args, namespace)
+        except argparse.ArgumentError as err:
+            self.parser.error(str(err))
+        return namespace, extras
+
+    def _parse(self, args: List[str], namespace: argparse.Namespace) -> List[str]:
+        parser, options = self.parser, self.options
+        extras: List[str] = []
+        seen: Set[argparse.Action] = set()
+        index, length = 0, len(args)
+        while index < length:
+            arg = args[index]
+            index += 1
+            if arg[:1] != "-":
+                extras.append(arg)
+                continue
+            action = options[arg]
+            stop = index
+            while stop < length and args[stop][:1] != "-":
+                stop += 1
+            nargs = action.nargs
+            if nargs is None:
+                count = 1
+            elif nargs == argparse.OPTIONAL:
+                count = min(stop - index, 1)
+            elif nargs in (argparse.ZERO_OR_MORE, argparse.ONE_OR_MORE):
+                count = max(stop - index, nargs == argparse.ONE_OR_MORE)
+            else:
+                count = nargs
+            if index + count > stop:
+                parser.error(f"argument {'/'.join(action.option_strings)}: expected {count} argument(s)")
+            seen.add(action)
+            action(parser, namespace, self._get_values(action, args[index : index + count]), arg)
+            index += count
+
+        required: List[str] = []
+        for action in self.actions:
+            if action in seen:
+                continue
+            if action.required:
+                required.append("/".join(action.option_strings))
+            elif (
+                isinstance(action.default, str)
+                and hasattr(namespace, action.dest)
+                and action.default is getattr(namespace, action.dest)
+            ):
+                setattr(namespace, action.dest, parser._get_value(action, action.default))
+        if required:
+            parser.error(f"the following arguments are required: {', '.join(required)}")
+        return extras
+
+
 class TwilightHelpManager:
     AUTO_ID: Final[str] = "&auto_id" + hex(id("&auto_id"))
     _manager_ref: ClassVar[Dict[str, "TwilightHelpManager"]] = {}
@@ -227,6 +227,8 @@ class ElizabethService(Service):
                 app = Ariadne.current(conn.info.account)
                 with enter_context(app=app):
                     self.broadcast.postEvent(AccountLaunch(app))
+                if app.cache_warmup:
+                    app.cache_warmup.start()
 
         async with self.stage("cleanup"):
             logger.info("Elizabeth Service cleaning up...", style="dark_orange")
@@ -236,8 +238,10 @@ class ElizabethService(Service):
                     with enter_context(app=app):
                         await self.broadcast.postEvent(ApplicationShutdown(app))
             for conn in self.connections.values():
+                app = Ariadne.current(conn.info.account)
+                if app.cache_warmup:
+                    app.cache_warmup.stop()
                 if conn.status.available:
-                    app = Ariadne.current(conn.info.account)
                     with enter_context(app=app):
                         await self.broadcast.postEvent(AccountShutdown(app))
 
@@ -0,0 +1,252 @@
+"""Ariadne 的本地消息存档"""
+import asyncio
+import contextlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from launart import Launart, Launchable
+from loguru import logger
+
+from ..event.message import ActiveMessage, GroupMessage, MessageEvent
+from ..model.relationship import Friend, Group, Member
+from .cache import decode_message, encode_message
+
+T = TypeVar("T")
+
+Row = Tuple[int, int, int, int, str, float, bytes]
+"""(账号, 会话对象, 消息 ID, 发送者, 事件类型, 时间戳, 编码后的事件)"""
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS messages (
+        account INTEGER NOT NULL,
+        subject INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        sender INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        time REAL NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (account, subject, id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS messages_id ON messages (account, id)",
+    "CREATE INDEX IF NOT EXISTS messages_subject_time ON messages (account, subject, time)",
+    "CREATE INDEX IF NOT EXISTS messages_time ON messages (account, time)",
+)
+
+
+def message_subject(event: Union[MessageEvent, ActiveMessage]) -> int:
+    """获取消息所在会话的对象 (群号, 好友或对方的 QQ 号)
+
+    Args:
+        event (Union[MessageEvent, ActiveMessage]): 消息事件
+
+    Returns:
+        int: 会话对象
+    """
+    if isinstance(event, ActiveMessage):
+        return int(event.subject)
+    if isinstance(event, GroupMessage):
+        return int(event.sender.group)
+    return int(event.sender)
+
+
+class MessageArchive(Launchable):
+    """基于 SQLite 的本地消息存档, 保存收到与发出的消息, 按消息 ID, 会话对象与时间建立索引
+
+    消息先进入待写入列表, 由后台任务按批次写入, 数据库操作在单独的线程中进行.
+    `id` 由数据库文件路径生成, 同一数据库文件只能由一个存档实例使用.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        compress_threshold: int = 1024,
+    ) -> None:
+        """
+        Args:
+            path (Union[str, Path]): 数据库文件路径
+            batch_size (int, optional): 待写入的消息达到该数量时立即写入
+            flush_interval (float, optional): 定期写入的间隔 (秒)
+            compress_threshold (int, optional): 编码后超过该字节数的消息会被压缩, 为 0 时不压缩
+        """
+        self.path: Path = Path(path)
+        self.id: str = f"elizabeth.service/archive/{self.path.resolve()}"
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.compress_threshold: int = compress_threshold
+        self.pending: List[Row] = []
+        """尚未写入的消息"""
+        self.written: int = 0
+        """已写入的消息数"""
+        self.db: Optional[sqlite3.Connection] = None
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(1, thread_name_prefix="MessageArchive")
+        self.wakeup: Optional[asyncio.Event] = None
+        super().__init__()
+
+    @property
+    def required(self) -> Set[str]:
+        return set()
+
+    @property
+    def stages(self):
+        return {"blocking", "cleanup"}
+
+    async def launch(self, mgr: Launart) -> None:
+        self.wakeup = asyncio.Event()
+        async with self.stage("blocking"):
+            exit_signal = asyncio.create_task(mgr.status.wait_for_sigexit())
+            while not exit_signal.done():
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+                self.wakeup.clear()
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.exception(e)
+        async with self.stage("cleanup"):
+            await self.close()
+
+    def add(
+        self, account: int, event: Union[MessageEvent, ActiveMessage], data: Optional[bytes] = None
+    ) -> None:
+        """将消息加入待写入列表
+
+        Args:
+            account (int): 收到或发出消息的账号
+            event (Union[MessageEvent, ActiveMessage]): 消息事件
+            data (Optional[bytes], optional): 已由 `encode_message` 编码的事件 (如消息缓存的编码结果), \
+            提供时直接写入, 不再重新编码
+        """
+        if event.id < 0:
+            return
+        sender = account if isinstance(event, ActiveMessage) else int(event.sender)
+        self.pending.append(
+            (
+                account,
+                message_subject(event),
+                event.id,
+                sender,
+                event.type,
+                event.source.time.timestamp(),
+                encode_message(event, self.compress_threshold) if data is None else data,
+            )
+        )
+        if len(self.pending) >= self.batch_size and self.wakeup:
+            self.wakeup.set()
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db is None:
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            with self.db:
+                for statement in SCHEMA:
+                    self.db.execute(statement)
+        return self.db
+
+    def _write(self, rows: List[Row]) -> None:
+        with self._connect() as db:
+            db.executemany("INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.written += len(rows)
+
+    def _query(self, sql: str, params: Tuple[Any, ...]) -> List[Tuple[Any, ...]]:
+        return self._connect().execute(sql, params).fetchall()
+
+    def _close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    async def flush(self) -> None:
+        """立即写入所有待写入的消息"""
+        rows, self.pending = self.pending, []
+        if rows:
+            await self._run(self._write, rows)
+
+    async def close(self) -> None:
+        """写入所有待写入的消息并关闭数据库"""
+        await self.flush()
+        await self._run(self._close)
+
+    async def get(
+        self, account: int, message_id: int, subject: Optional[int] = None
+    ) -> Optional[Union[MessageEvent, ActiveMessage]]:
+        """通过消息 ID 获取存档的消息
+
+        Args:
+            account (int): 账号
+            message_id (int): 消息 ID
+            subject (Optional[int], optional): 会话对象, 不指定时返回最近的同 ID 消息
+
+        Returns:
+            Optional[Union[MessageEvent, ActiveMessage]]: 消息事件, 未找到时为 None
+        """
+        for row in reversed(self.pending):
+            if row[0] == account and row[2] == message_id and subject in (None, row[1]):
+                return decode_message(row[6])
+        sql = "SELECT data FROM messages WHERE account = ? AND id = ?"
+        params: Tuple[Any, ...] = (account, message_id)
+        if subject is not None:
+            sql += " AND subject = ?"
+            params += (subject,)
+        rows = await self._run(self._query, sql + " ORDER BY time DESC LIMIT 1", params)
+        return decode_message(rows[0][0]) if rows else None
+
+    async def scan(
+        self,
+        account: int,
+        subject: Optional[Union[Friend, Group, Member, int]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        batch_size: int = 100,
+    ) -> AsyncIterator[Union[MessageEvent, ActiveMessage]]:
+        """按时间顺序遍历存档的消息
+
+        Args:
+            account (int): 账号
+            subject (Optional[Union[Friend, Group, Member, int]], optional): 会话对象, 不指定时遍历所有会话
+            start (Optional[datetime], optional): 起始时间 (含)
+            end (Optional[datetime], optional): 结束时间 (不含)
+            batch_size (int, optional): 每次从数据库读取的消息数
+
+        Yields:
+            Union[MessageEvent, ActiveMessage]: 消息事件
+        """
+        await self.flush()
+        conditions: List[str] = ["account = ?"]
+        params: Tuple[Any, ...] = (account,)
+        if subject is not None:
+            conditions.append("subject = ?")
+            params += (int(subject),)
+        if end is not None:
+            conditions.append("time < ?")
+            params += (end.timestamp(),)
+        cursor: Tuple[float, int] = (float("-inf") if start is None else start.timestamp(), -1)
+        sql = (
+            f"SELECT time, rowid, data FROM messages WHERE {' AND '.join(conditions)}"
+            " AND (time > ? OR (time = ? AND rowid > ?)) ORDER BY time, rowid LIMIT ?"
+        )
+        while True:
+            rows = await self._run(self._query, sql, params + (cursor[0], cursor[0], cursor[1], batch_size))
+            for _, _, data in rows:
+                yield decode_message(data)
+            if len(rows) < batch_size:
+                return
+            cursor = rows[-1][0], rows[-1][1]
@@ -0,0 +1,529 @@
+"""Ariadne 为每个账号维护的缓存"""
+import asyncio
+import time
+import zlib
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from loguru import logger
+from pydantic import BaseModel
+
+from ..connection.util import build_event, json_dumps, json_loads
+from ..event.message import ActiveMessage, MessageEvent
+from ..message.chain import serialize_element
+from ..model.relationship import Friend, Group, Member
+
+if TYPE_CHECKING:
+    from ..app import Ariadne
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class WarmupConfig(NamedTuple):
+    """缓存预热配置"""
+
+    members: bool = False
+    """是否预取所有群组的成员列表"""
+    concurrency: int = 4
+    """同时进行的成员列表请求数"""
+    rate: float = 0.0
+    """每秒最多发起的成员列表请求数, 为 0 时不限制"""
+    report_interval: float = 10.0
+    """报告预热进度的间隔 (秒)"""
+
+
+class CacheConfig(NamedTuple):
+    """Ariadne 缓存配置"""
+
+    relationship_ttl: Optional[float] = None
+    """好友, 群组与群成员缓存的有效期 (秒), 为 None 时不过期"""
+    relationship_max_size: int = 0
+    """好友, 群组与群成员缓存各自的条目上限, 超出时淘汰最久未使用的条目, 为 0 时不限制"""
+    message_ttl: Optional[float] = None
+    """消息缓存的有效期 (秒), 为 None 时不过期"""
+    message_max_size: int = 4096
+    """消息缓存的条目上限, 为 0 时不限制"""
+    message_max_bytes: int = 32 * 1024 * 1024
+    """消息缓存编码后的总字节数上限, 为 0 时不限制"""
+    message_compress_threshold: int = 1024
+    """编码后超过该字节数的消息会被压缩, 为 0 时不压缩"""
+    warmup: Optional[WarmupConfig] = None
+    """账号启动后在后台预取好友, 群组 (与群成员) 列表, 为 None 时不预热"""
+
+
+class CacheStats(NamedTuple):
+    """缓存统计"""
+
+    hits: int
+    """命中次数"""
+    misses: int
+    """未命中次数"""
+    evictions: int
+    """因超出上限被淘汰的条目数"""
+    expirations: int
+    """因过期被移除的条目数"""
+    size: int
+    """当前条目数"""
+    bytes: int
+    """当前条目编码后的总字节数"""
+
+
+class LRUTable(Generic[K, V]):
+    """带有过期时间与 LRU 淘汰的表"""
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_size: int = 0,
+        on_remove: Optional[Callable[[K], None]] = None,
+        weigher: Optional[Callable[[V], int]] = None,
+        max_weight: int = 0,
+    ) -> None:
+        """
+        Args:
+            ttl (Optional[float]): 条目的有效期 (秒), 为 None 时不过期
+            max_size (int): 条目上限, 为 0 时不限制
+            on_remove (Optional[Callable[[K], None]]): 条目因过期, 淘汰或删除被移除时的回调
+            weigher (Optional[Callable[[V], int]]): 计算条目权重 (如字节数) 的函数
+            max_weight (int): 条目总权重上限, 需要同时指定 weigher, 为 0 时不限制
+        """
+        self.ttl: Optional[float] = ttl
+        self.max_size: int = max_size
+        self.on_remove: Optional[Callable[[K], None]] = on_remove
+        self.weigher: Optional[Callable[[V], int]] = weigher
+        self.max_weight: int = max_weight
+        self.weight: int = 0
+        """当前条目总权重"""
+        self.evictions: int = 0
+        """因超出上限被淘汰的条目数"""
+        self.expirations: int = 0
+        """因过期被移除的条目数"""
+        self.data: "OrderedDict[K, Tuple[Optional[float], V]]" = OrderedDict()
+        self.next_purge: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: K) -> Optional[V]:
+        """获取条目并将其标记为最近使用
+
+        Args:
+            key (K): 键
+
+        Returns:
+            Optional[V]: 值, 不存在或已过期时为 None
+        """
+        if (entry := self.data.get(key)) is None:
+            return None
+        expire, value = entry
+        if expire is not None and expire < time.monotonic():
+            self.expirations += 1
+            self.pop(key)
+            return None
+        self.data.move_to_end(key)
+        return value
+
+    def set_many(self, items: Iterable[Tuple[K, V]]) -> None:
+        """批量写入条目
+
+        Args:
+            items (Iterable[Tuple[K, V]]): 键值对
+        """
+        now = time.monotonic()
+        expire = None if self.ttl is None else now + self.ttl
+        data, weigher = self.data, self.weigher
+        for key, value in items:
+            if weigher:
+                if (old := data.get(key)) is not None:
+                    self.weight -= weigher(old[1])
+                self.weight += weigher(value)
+            data[key] = (expire, value)
+            data.move_to_end(key)
+        if expire is not None and now >= self.next_purge:
+            self.purge(now)
+            self.next_purge = expire
+        max_size, max_weight = self.max_size, self.max_weight
+        while data and ((max_size and len(data) > max_size) or (max_weight and self.weight > max_weight)):
+            self.evictions += 1
+            self.pop(next(iter(data)))
+
+    def set(self, key: K, value: V) -> None:
+        """写入条目
+
+        Args:
+            key (K): 键
+            value (V): 值
+        """
+        self.set_many(((key, value),))
+
+    def pop(self, key: K) -> Optional[V]:
+        """移除条目
+
+        Args:
+            key (K): 键
+
+        Returns:
+            Optional[V]: 被移除的值, 不存在时为 None
+        """
+        if (entry := self.data.pop(key, None)) is None:
+            return None
+        if self.weigher:
+            self.weight -= self.weigher(entry[1])
+        if self.on_remove:
+            self.on_remove(key)
+        return entry[1]
+
+    def purge(self, now: Optional[float] = None) -> None:
+        """移除所有已过期的条目"""
+        now = time.monotonic() if now is None else now
+        for key in [key for key, (expire, _) in self.data.items() if expire is not None and expire < now]:
+            self.expirations += 1
+            self.pop(key)
+
+    def clear(self) -> None:
+        """清空表"""
+        for key in list(self.data):
+            self.pop(key)
+
+
+class RelationshipCache:
+    """单个账号的好友, 群组与群成员缓存
+
+    群成员以 (群号, QQ 号) 为键, 并维护群组到成员与成员到群组的索引.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_size: int = 0) -> None:
+        """
+        Args:
+            ttl (Optional[float]): 条目的有效期 (秒), 为 None 时不过期
+            max_size (int): 好友, 群组与群成员各自的条目上限, 为 0 时不限制
+        """
+        self.friends: LRUTable[int, Friend] = LRUTable(ttl, max_size)
+        self.groups: LRUTable[int, Group] = LRUTable(ttl, max_size)
+        self.members: LRUTable[Tuple[int, int], Member] = LRUTable(ttl, max_size, self._unindex)
+        self.group_members: Dict[int, Dict[int, None]] = {}
+        """群号 -> 已缓存成员的 QQ 号"""
+        self.member_groups: Dict[int, Set[int]] = {}
+        """QQ 号 -> 缓存了该成员的群号"""
+
+    def _unindex(self, key: Tuple[int, int]) -> None:
+        group_id, member_id = key
+        if (members := self.group_members.get(group_id)) is not None:
+            members.pop(member_id, None)
+            if not members:
+                del self.group_members[group_id]
+        if (groups := self.member_groups.get(member_id)) is not None:
+            groups.discard(group_id)
+            if not groups:
+                del self.member_groups[member_id]
+
+    def get_friend(self, friend_id: int) -> Optional[Friend]:
+        """获取缓存的好友"""
+        return self.friends.get(friend_id)
+
+    def set_friends(self, friends: Iterable[Friend]) -> None:
+        """批量缓存好友"""
+        self.friends.set_many((friend.id, friend) for friend in friends)
+
+    def delete_friend(self, friend_id: int) -> None:
+        """移除缓存的好友"""
+        self.friends.pop(friend_id)
+
+    def get_group(self, group_id: int) -> Optional[Group]:
+        """获取缓存的群组"""
+        return self.groups.get(group_id)
+
+    def set_groups(self, groups: Iterable[Group]) -> None:
+        """批量缓存群组"""
+        self.groups.set_many((group.id, group) for group in groups)
+
+    def delete_group(self, group_id: int) -> None:
+        """移除缓存的群组及其所有成员"""
+        self.groups.pop(group_id)
+        self.delete_members(group_id)
+
+    def get_member(self, group_id: int, member_id: int) -> Optional[Member]:
+        """获取缓存的群成员"""
+        return self.members.get((group_id, member_id))
+
+    def set_members(self, members: Iterable[Member]) -> None:
+        """批量缓存群成员, 成员所在的群组也会被缓存"""
+        groups: Dict[int, Group] = {}
+        items: List[Tuple[Tuple[int, int], Member]] = []
+        for member in members:
+            group_id = member.group.id
+            groups[group_id] = member.group
+            items.append(((group_id, member.id), member))
+            self.group_members.setdefault(group_id, {})[member.id] = None
+            self.member_groups.setdefault(member.id, set()).add(group_id)
+        self.groups.set_many(groups.items())
+        self.members.set_many(items)
+
+    def delete_member(self, group_id: int, member_id: int) -> None:
+        """移除缓存的群成员"""
+        self.members.pop((group_id, member_id))
+
+    def delete_members(self, group_id: int) -> None:
+        """移除群组的所有缓存成员"""
+        for member_id in list(self.group_members.get(group_id, ())):
+            self.members.pop((group_id, member_id))
+
+    def members_of(self, group_id: int) -> List[Member]:
+        """获取群组的所有缓存成员
+
+        Args:
+            group_id (int): 群号
+
+        Returns:
+            List[Member]: 未过期的成员
+        """
+        get = self.members.get
+        return [
+            member
+            for member_id in list(self.group_members.get(group_id, ()))
+            if (member := get((group_id, member_id))) is not None
+        ]
+
+    def groups_of(self, member_id: int) -> List[Group]:
+        """获取缓存了该成员的所有群组
+
+        Args:
+            member_id (int): QQ 号
+
+        Returns:
+            List[Group]: 成员所在的群组
+        """
+        result: List[Group] = []
+        for group_id in list(self.member_groups.get(member_id, ())):
+            if (member := self.members.get((group_id, member_id))) is not None:
+                result.append(self.groups.get(group_id) or member.group)
+        return result
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.friends.clear()
+        self.groups.clear()
+        self.members.clear()
+
+
+_CHAIN_FIELDS = frozenset({"message_chain", "source", "quote"})
+
+
+def encode_message(event: Union[MessageEvent, ActiveMessage], compress_threshold: int = 0) -> bytes:
+    """将消息事件编码为 mirai-api-http 格式的 JSON 字节串
+
+    尚未被访问的惰性消息链直接使用其序列化态的元素.
+
+    Args:
+        event (Union[MessageEvent, ActiveMessage]): 消息事件
+        compress_threshold (int, optional): 编码后超过该字节数时使用 zlib 压缩, 为 0 时不压缩
+
+    Returns:
+        bytes: 编码后的消息事件
+    """
+    chain = event.message_chain
+    elements = [serialize_element(event.source)]
+    if event.quote is not None:
+        elements.append(serialize_element(event.quote))
+    elements.extend(chain._raw if chain._raw is not None else chain.to_wire())
+    fields = event.__fields__
+    data: Dict[str, Any] = {
+        fields[name].alias: serialize_element(value) if isinstance(value, BaseModel) else value
+        for name, value in event.__dict__.items()
+        if value is not None and name not in _CHAIN_FIELDS
+    }
+    data["messageChain"] = elements
+    encoded = json_dumps(data).encode("utf-8")
+    if compress_threshold and len(encoded) > compress_threshold:
+        return zlib.compress(encoded, 1)
+    return encoded
+
+
+def decode_message(data: bytes) -> Union[MessageEvent, ActiveMessage]:
+    """解码由 `encode_message` 编码的消息事件
+
+    Args:
+        data (bytes): 编码后的消息事件
+
+    Returns:
+        Union[MessageEvent, ActiveMessage]: 消息事件
+    """
+    if data[:1] != b"{":
+        data = zlib.decompress(data)
+    return build_event(json_loads(data))  # type: ignore
+
+
+class MessageCache:
+    """单个账号的消息缓存
+
+    消息事件以编码后的字节串保存, 按条目数与字节数淘汰最久未使用的消息, 读取时重新解码.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_size: int = 0,
+        max_bytes: int = 0,
+        compress_threshold: int = 0,
+    ) -> None:
+        """
+        Args:
+            ttl (Optional[float]): 消息的有效期 (秒), 为 None 时不过期
+            max_size (int): 条目上限, 为 0 时不限制
+            max_bytes (int): 编码后的总字节数上限, 为 0 时不限制
+            compress_threshold (int): 编码后超过该字节数的消息会被压缩, 为 0 时不压缩
+        """
+        self.table: LRUTable[int, bytes] = LRUTable(ttl, max_size, weigher=len, max_weight=max_bytes)
+        self.compress_threshold: int = compress_threshold
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def set(self, event: Union[MessageEvent, ActiveMessage]) -> bytes:
+        """缓存消息事件
+
+        Args:
+            event (Union[MessageEvent, ActiveMessage]): 消息事件
+
+        Returns:
+            bytes: 编码后的事件
+        """
+        data = encode_message(event, self.compress_threshold)
+        self.table.set(int(event), data)
+        return data
+
+    def get(self, message_id: int) -> Optional[Union[MessageEvent, ActiveMessage]]:
+        """获取缓存的消息事件
+
+        Args:
+            message_id (int): 消息 ID
+
+        Returns:
+            Optional[Union[MessageEvent, ActiveMessage]]: 消息事件, 不存在或已过期时为 None
+        """
+        if (data := self.table.get(message_id)) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decode_message(data)
+
+    def delete(self, message_id: int) -> None:
+        """移除缓存的消息事件"""
+        self.table.pop(message_id)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.table.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        """缓存统计"""
+        table = self.table
+        return CacheStats(
+            self.hits, self.misses, table.evictions, table.expirations, len(table), table.weight
+        )
+
+
+class CacheWarmup:
+    """账号启动后在后台预取好友, 群组与群成员列表, 结果保存在 `Ariadne.relationship_cache` 中"""
+
+    def __init__(self, app: "Ariadne", config: WarmupConfig) -> None:
+        """
+        Args:
+            app (Ariadne): 需要预热缓存的 Ariadne 实例
+            config (WarmupConfig): 预热配置
+        """
+        self.app: "Ariadne" = app
+        self.config: WarmupConfig = config
+        self.task: Optional[asyncio.Task] = None
+        self.total: int = 0
+        """需要预取成员列表的群组数"""
+        self.done: int = 0
+        """已预取成员列表的群组数"""
+        self.failed: int = 0
+        """预取成员列表失败的群组数"""
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """预热耗时 (秒), 尚未开始时为 None"""
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+
+    def start(self) -> None:
+        """启动后台预热任务 (若尚未启动)"""
+        if self.task is None:
+            self.task = asyncio.create_task(self.run(), name=f"elizabeth.warmup.{self.app.account}")
+
+    def stop(self) -> None:
+        """取消尚未完成的预热任务"""
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+    def report(self) -> None:
+        logger.info(
+            f"Cache warm-up of {self.app.account}: {self.done}/{self.total} groups, "
+            f"{self.failed} failed, {self.duration:.2f}s"
+        )
+
+    async def run(self) -> None:
+        """等待连接可用后预取好友, 群组与群成员列表"""
+        app, config = self.app, self.config
+        await app.connection.status.wait_for_available()
+        self.started = time.monotonic()
+        try:
+            _, groups = await asyncio.gather(app.get_friend_list(), app.get_group_list())
+        except Exception as e:
+            logger.warning(f"Cache warm-up of {app.account} failed: {e!r}")
+            return
+        if config.members:
+            self.total = len(groups)
+            pending = iter(groups)
+            interval = 1 / config.rate if config.rate > 0 else 0.0
+            next_call = time.monotonic()
+            next_report = next_call + config.report_interval
+
+            async def worker() -> None:
+                nonlocal next_call, next_report
+                for group in pending:
+                    if interval:
+                        now = time.monotonic()
+                        delay, next_call = next_call - now, max(next_call, now) + interval
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    try:
+                        await app.get_member_list(group)
+                    except Exception as e:
+                        self.failed += 1
+                        logger.debug(f"Failed to fetch member list of {group}: {e!r}")
+                    self.done += 1
+                    if time.monotonic() >= next_report:
+                        next_report = time.monotonic() + config.report_interval
+                        self.report()
+
+            await asyncio.gather(*(worker() for _ in range(max(config.concurrency, 1))))
+        self.finished = time.monotonic()
+        self.report()
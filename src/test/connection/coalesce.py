@@ -0,0 +1,131 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from graia.ariadne.connection import (
+    ConnectionInterface,
+    ConnectionMixin,
+    WebsocketClientConnection,
+)
+from graia.ariadne.connection._info import WebsocketClientInfo
+from graia.ariadne.connection.config import HttpServerInfo
+from graia.ariadne.connection.util import CallMethod
+from graia.ariadne.util import Dummy
+
+
+class FakeConnection(ConnectionMixin[HttpServerInfo]):
+    dependencies = set()
+
+    def __init__(self) -> None:
+        super().__init__(HttpServerInfo(account=1, verify_key="", path="", headers={}))
+        self.calls: List[tuple] = []
+        self.gate = asyncio.Event()
+
+    async def call(self, command, method, params=None, *, in_session=True, timeout=None):
+        self.calls.append((command, method, params))
+        await self.gate.wait()
+        if params.get("fail"):
+            raise ValueError(command)
+        return {"command": command, **params}
+
+    async def launch(self, _) -> None:
+        pass
+
+
+def make_interface():
+    connection = FakeConnection()
+    return ConnectionInterface(Dummy(connections={1: connection}), 1), connection  # type: ignore
+
+
+async def settle(gate: asyncio.Event, *calls):
+    tasks = [asyncio.create_task(call) for call in calls]
+    await asyncio.sleep(0)
+    gate.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_coalesce():
+    interface, connection = make_interface()
+    results = await settle(
+        connection.gate,
+        *(interface.call("memberList", CallMethod.GET, {"target": 1}) for _ in range(5)),
+        interface.call("memberList", CallMethod.GET, {"target": 2}),
+        interface.call("memberInfo", CallMethod.RESTPOST, {"target": 1}),
+        interface.call("memberInfo", CallMethod.RESTPOST, {"target": 1}),
+        interface.call("messageFromId", CallMethod.GET, {"id": 1}),
+        interface.call("messageFromId", CallMethod.GET, {"id": 1}, coalesce=True),
+    )
+    assert results[:5] == [{"command": "memberList", "target": 1}] * 5
+    assert results[0] is results[4]
+    assert len(connection.calls) == 6
+    assert connection.status.coalesced_calls == 4
+    assert not connection.coalescing
+
+    interface.coalesced_commands.discard("memberList")
+    connection.gate.clear()
+    await settle(
+        connection.gate, *(interface.call("memberList", CallMethod.GET, {"target": 1}) for _ in range(2))
+    )
+    assert len(connection.calls) == 8
+
+
+@pytest.mark.asyncio
+async def test_coalesce_failure():
+    interface, connection = make_interface()
+    results = await settle(
+        connection.gate,
+        *(interface.call("groupList", CallMethod.GET, {"fail": True}) for _ in range(3)),
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(connection.calls) == 1
+
+    # cancelling one caller does not cancel the shared call
+    connection.gate.clear()
+    first = asyncio.create_task(interface.call("groupList", CallMethod.GET, {}))
+    second = asyncio.create_task(interface.call("groupList", CallMethod.GET, {}))
+    await asyncio.sleep(0)
+    first.cancel()
+    connection.gate.set()
+    assert await second == {"command": "groupList"}
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_timeout():
+    interface, connection = make_interface()
+    slow = asyncio.create_task(interface.call("groupList", CallMethod.GET, {}, timeout=None))
+    await asyncio.sleep(0)
+    with pytest.raises(asyncio.TimeoutError):
+        await interface.call("groupList", CallMethod.GET, {}, timeout=0.01)
+    assert connection.status.coalesced_calls == 1
+    assert connection.status.timed_out_calls == 1
+
+    # the shared call is not cancelled by the caller that timed out
+    assert not slow.done()
+    connection.gate.set()
+    assert await slow == {"command": "groupList"}
+    assert len(connection.calls) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_in_flight", [0, 2])
+async def test_coalesce_websocket(max_in_flight: int):
+    connection = WebsocketClientConnection(
+        WebsocketClientInfo(1, "key", "http://localhost:8080", call_timeout=None, max_in_flight=max_in_flight)
+    )
+    connection.status.session_key = "session"
+    connection.status.alive = True
+    connection.ws_io = Dummy()  # type: ignore
+    interface = ConnectionInterface(Dummy(connections={1: connection}), 1)  # type: ignore
+    tasks = [
+        asyncio.create_task(interface.call("memberList", CallMethod.GET, {"target": 1})) for _ in range(3)
+    ]
+    for _ in range(3):
+        await asyncio.sleep(0)
+    (fut,) = connection.futures.values()
+    fut.set_result([{"id": 2}])
+    assert await asyncio.gather(*tasks) == [[{"id": 2}]] * 3
+    assert connection.status.coalesced_calls == 2
+    assert not connection.coalescing
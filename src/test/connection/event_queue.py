@@ -0,0 +1,151 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from graia.ariadne.connection import (
+    ConnectionStatus,
+    EventQueue,
+    HttpServerConnection,
+    WebsocketServerConnection,
+)
+from graia.ariadne.connection._info import HttpServerInfo, WebsocketServerInfo
+from graia.ariadne.connection.util import EventQueueConfig, EventQueuePolicy
+from graia.ariadne.event.mirai import BotOnlineEvent, BotReloginEvent
+from graia.ariadne.util import Dummy
+
+
+class Receiver:
+    def __init__(self) -> None:
+        self.received = []
+        self.gate = asyncio.Event()
+
+    async def __call__(self, event) -> None:
+        await self.gate.wait()
+        self.received.append(event)
+
+    async def wait(self, count: int) -> list:
+        self.gate.set()
+        while len(self.received) < count:
+            await asyncio.sleep(0)
+        return self.received
+
+
+def make_queue(config: EventQueueConfig):
+    receiver = Receiver()
+    connection = Dummy(id="test", status=ConnectionStatus(), event_callbacks=[receiver])
+    return EventQueue(connection, config), connection.status, receiver  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_event_queue_dispatch():
+    queue, status, receiver = make_queue(EventQueueConfig())
+    events = [BotOnlineEvent(qq=i) for i in range(5)]
+    for event in events:
+        await queue.put(event)
+    assert status.queue_depth == 5
+    assert await asyncio.wait_for(receiver.wait(5), 1) == events
+    assert status.queue_depth == 0
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_event_queue_drop_oldest():
+    queue, status, receiver = make_queue(EventQueueConfig(size=2, policy=EventQueuePolicy.DROP_OLDEST))
+    events = [BotOnlineEvent(qq=i) for i in range(3)]
+    for event in events:
+        await queue.put(event)
+    assert status.dropped_events == {"BotOnlineEvent": 1}
+    assert await asyncio.wait_for(receiver.wait(2), 1) == events[1:]
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_event_queue_drop_by_type():
+    queue, status, receiver = make_queue(
+        EventQueueConfig(size=2, policy="drop_by_type", droppable=frozenset({"BotReloginEvent"}))
+    )
+    online = BotOnlineEvent(qq=1)
+    await queue.put(BotReloginEvent(qq=2))
+    await queue.put(online)
+    await queue.put(BotReloginEvent(qq=3))  # incoming droppable event is dropped
+    await queue.put(BotOnlineEvent(qq=4))  # queued droppable event makes room
+    assert status.dropped_events == {"BotReloginEvent": 2}
+    assert await asyncio.wait_for(receiver.wait(2), 1) == [online, BotOnlineEvent(qq=4)]
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_event_queue_block():
+    queue, status, receiver = make_queue(EventQueueConfig(size=1))
+    await queue.put(BotOnlineEvent(qq=1))
+    await queue.put(BotOnlineEvent(qq=2))  # the consumer holds event 1, event 2 fills the queue
+    blocked = asyncio.create_task(queue.put(BotOnlineEvent(qq=3)))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert not blocked.done()
+    assert [e.qq for e in await asyncio.wait_for(receiver.wait(3), 1)] == [1, 2, 3]
+    assert blocked.done()
+    assert not status.dropped_events
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_event_queue_close():
+    queue, status, receiver = make_queue(EventQueueConfig())
+    events = [BotOnlineEvent(qq=i) for i in range(3)]
+    for event in events:
+        await queue.put(event)
+    asyncio.get_running_loop().call_later(0.05, receiver.gate.set)
+    await asyncio.wait_for(queue.close(), 1)
+    assert receiver.received == events
+    assert not queue.consumers and status.queue_depth == 0
+
+    # events left after the timeout are kept
+    receiver.gate.clear()
+    await queue.put(BotOnlineEvent(qq=3))
+    await queue.put(BotOnlineEvent(qq=4))
+    await queue.close(0.01)
+    assert not queue.consumers and len(queue) == 1 and len(receiver.received) == 3
+
+
+@pytest.mark.asyncio
+async def test_event_queue_restart():
+    queue, _, receiver = make_queue(EventQueueConfig(size=1))
+    await queue.put(BotOnlineEvent(qq=1))
+    await queue.put(BotOnlineEvent(qq=2))
+    blocked = asyncio.create_task(queue.put(BotOnlineEvent(qq=3)))
+    await asyncio.sleep(0)
+    queue.stop()
+    queue.start()  # the blocked producer is woken up by the restarted consumers
+    assert [e.qq for e in await asyncio.wait_for(receiver.wait(2), 1)] == [2, 3]
+    assert blocked.done()
+    queue.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "connection",
+    [
+        lambda: HttpServerConnection(HttpServerInfo(1, "", "/", {})),
+        lambda: WebsocketServerConnection(WebsocketServerInfo(1, "", "/", {}, {})),
+    ],
+)
+async def test_server_connection_cleanup(connection, monkeypatch: pytest.MonkeyPatch):
+    connection = connection()
+    receiver = Receiver()
+    connection.event_callbacks.append(receiver)
+    await connection.dispatch(BotOnlineEvent(qq=1))
+    stages = []
+
+    @asynccontextmanager
+    async def stage(name: str):
+        stages.append(name)
+        receiver.gate.set()
+        yield
+
+    monkeypatch.setattr(connection, "stage", stage)
+    await connection.launch(Dummy())  # type: ignore
+    assert stages == ["cleanup"] and connection.stages == {"cleanup"}
+    assert receiver.received == [BotOnlineEvent(qq=1)]
+    assert not connection.event_queue.consumers
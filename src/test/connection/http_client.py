@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from graia.ariadne.connection import HttpClientConnection
+from graia.ariadne.connection._info import HttpClientInfo
+from graia.ariadne.connection.util import PollingConfig
+
+
+@pytest.mark.asyncio
+async def test_single_flight_auth():
+    conn = HttpClientConnection(HttpClientInfo(1, "key", "http://localhost:8080"))
+    count = 0
+
+    async def authenticate():
+        nonlocal count
+        count += 1
+        await asyncio.sleep(0.01)
+        conn.status.session_key = f"session-{count}"
+
+    conn.authenticate = authenticate
+    await asyncio.gather(*(conn.http_auth() for _ in range(10)))
+    assert count == 1
+    assert conn.status.session_key == "session-1"
+
+    await conn.http_auth()
+    assert count == 2
+
+
+def test_session_store(tmp_path):
+    store = str(tmp_path / "session.json")
+    conn = HttpClientConnection(HttpClientInfo(1, "key", "http://localhost:8080", session_store=store))
+    assert conn.stored_session is None
+    conn.save_session("foo")
+    HttpClientConnection(HttpClientInfo(2, "key", "http://localhost:8080", session_store=store)).save_session(
+        "bar"
+    )
+    assert HttpClientConnection(conn.info).stored_session == "foo"
+    conn.save_session(None)
+    assert conn.load_session() is None
+
+
+def test_adaptive_polling():
+    polling = PollingConfig(min_count=10, max_count=40, min_interval=0.1, max_interval=0.4)
+    conn = HttpClientConnection(HttpClientInfo(1, "key", "http://localhost:8080", polling=polling))
+    assert conn.poll_count == 10
+
+    assert conn.adjust_polling(10) == 0.0  # full batch: poll again at once with a larger count
+    assert conn.poll_count == 20
+    assert conn.adjust_polling(20) == 0.0
+    assert conn.adjust_polling(40) == 0.0
+    assert conn.poll_count == 40
+
+    assert conn.adjust_polling(5) == 0.1
+    assert conn.adjust_polling(0) == 0.2  # empty batch: back off
+    assert conn.adjust_polling(0) == 0.4
+    assert conn.adjust_polling(0) == 0.4
+    assert conn.poll_count == 10
+    assert conn.adjust_polling(1) == 0.1
@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Type
+
+import pytest
+
+from graia.ariadne.connection.util import (
+    EVENT_TYPE_MAPPING,
+    JsonCodec,
+    OrjsonCodec,
+    build_event,
+    extract_event_type,
+)
+from graia.ariadne.event import MiraiEvent
+from graia.ariadne.event.message import GroupMessage
+from graia.ariadne.event.mirai import BotOnlineEvent
+from graia.ariadne.exception import InvalidArgument
+from graia.ariadne.message.chain import MessageChain
+
+
+def test_build_event():
+    data = {
+        "type": "GroupMessage",
+        "messageChain": [{"type": "Source", "id": 1, "time": 1}, {"type": "Plain", "text": "hi"}],
+        "sender": {
+            "id": 12345,
+            "memberName": "foo",
+            "permission": "MEMBER",
+            "group": {"id": 67890, "name": "bar", "permission": "MEMBER"},
+        },
+    }
+    event = build_event(data)
+    assert isinstance(event, GroupMessage)
+    assert event.message_chain == MessageChain("hi")
+    assert event.source.id == 1
+    assert data["type"] == "GroupMessage"  # payload is left untouched
+
+    assert isinstance(build_event({"type": "BotOnlineEvent", "qq": 1}), BotOnlineEvent)
+
+    with pytest.raises(InvalidArgument):
+        build_event({"qq": 1})
+    with pytest.raises(ValueError):
+        build_event({"type": "NotAnEvent"})
+
+
+def test_event_type_mapping():
+    assert extract_event_type("GroupMessage") is GroupMessage
+    assert EVENT_TYPE_MAPPING["BotOnlineEvent"] is BotOnlineEvent
+
+    class CustomTestEvent(MiraiEvent):
+        type = "CustomTestEvent"
+
+        value: int
+
+    event = build_event({"type": "CustomTestEvent", "value": 1})
+    assert isinstance(event, CustomTestEvent)
+    assert event.value == 1
+
+
+@pytest.mark.parametrize("codec_cls", [JsonCodec, OrjsonCodec])
+def test_json_codec(codec_cls: Type[JsonCodec]):
+    if codec_cls is OrjsonCodec:
+        pytest.importorskip("orjson")
+    codec = codec_cls()
+    data = {"time": datetime.fromtimestamp(1660000000), "text": "消息", 1: [None, 1.5, True]}
+    encoded = codec.dumps(data)
+    assert isinstance(encoded, str)
+    assert codec.loads(encoded) == {"time": 1660000000, "text": "消息", "1": [None, 1.5, True]}
+    assert codec.loads(encoded.encode("utf-8")) == codec.loads(encoded)
+    with pytest.raises(TypeError):
+        codec.dumps({"value": object()})
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from graia.amnesia.transport.common.websocket import WebsocketReceivedEvent
+
+from graia.ariadne.connection import WebsocketClientConnection, WebsocketPoolConnection
+from graia.ariadne.connection._info import WebsocketClientInfo, WebsocketPoolInfo
+from graia.ariadne.connection.util import CallMethod, ReconnectConfig
+
+
+class FakeIO:
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def send(self, data) -> None:
+        self.sent.append(data)
+
+
+def make_connection(**kwargs) -> WebsocketClientConnection:
+    conn = WebsocketClientConnection(WebsocketClientInfo(1, "key", "http://localhost:8080", **kwargs))
+    conn.status.session_key = "session"
+    conn.status.alive = True
+    conn.ws_io = FakeIO()  # type: ignore
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_call_timeout():
+    conn = make_connection(call_timeout=0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        await conn.call("about", CallMethod.GET)
+    assert conn.status.timed_out_calls == 1
+    assert not conn.futures
+
+    with pytest.raises(asyncio.TimeoutError):
+        await conn.call("about", CallMethod.GET, timeout=0.01)
+    assert conn.status.timed_out_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_call_timeout_unavailable():
+    conn = make_connection(call_timeout=0.01)
+    conn.status.alive = False
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(conn.call("about", CallMethod.GET), 1)
+    assert conn.status.timed_out_calls == 1
+    assert not conn.futures and not conn.ws_io.sent  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_call_result():
+    conn = make_connection(call_timeout=None)
+    task = asyncio.create_task(conn.call("about", CallMethod.GET))
+    await asyncio.sleep(0)
+    (fut,) = conn.futures.values()
+    fut.set_result({"version": "2.6.0"})
+    assert await task == {"version": "2.6.0"}
+    assert not conn.futures
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight():
+    conn = make_connection(call_timeout=None, max_in_flight=2)
+    tasks = [asyncio.create_task(conn.call("about", CallMethod.GET)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert len(conn.futures) == 2
+    for fut in list(conn.futures.values()):
+        fut.set_result({})
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert len(conn.futures) == 1
+    next(iter(conn.futures.values())).set_result({})
+    await asyncio.gather(*tasks)
+
+
+def test_reconnect_delay():
+    config = ReconnectConfig(
+        base_delay=1.0, max_delay=5.0, jitter=0.0, circuit_threshold=6, circuit_cooldown=30.0
+    )
+    conn = make_connection(reconnect=config)
+    assert [conn.reconnect_delay() for _ in range(6)] == [0.0, 1.0, 2.0, 4.0, 5.0, 5.0]
+    assert not conn.status.circuit_open
+    assert conn.reconnect_delay() == 30.0
+    assert conn.status.circuit_open
+
+
+def test_reconnect_jitter():
+    conn = make_connection(reconnect=ReconnectConfig(base_delay=8.0, jitter=0.5))
+    conn.status.reconnect_attempts = 1
+    assert 4.0 <= conn.reconnect_delay() <= 8.0
+
+
+@pytest.mark.asyncio
+async def test_reconnect_reset():
+    conn = make_connection()
+    conn.status.reconnect_attempts = 20
+    conn.status.circuit_open = True
+    handler = conn.get_callbacks(WebsocketReceivedEvent)[0]
+    await handler(conn.ws_io, '{"syncId": "", "data": {"code": 0, "session": "new"}}')
+    assert conn.status.session_key == "new"
+    assert conn.status.reconnect_attempts == 0
+    assert not conn.status.circuit_open
+
+
+@pytest.mark.asyncio
+async def test_pool_status_and_dispatch():
+    pool = WebsocketPoolConnection(
+        WebsocketPoolInfo(1, "key", "http://localhost:8080", size=3, call_timeout=None)
+    )
+    for member in pool.members[:2]:
+        member.status.session_key = "session"
+        member.status.alive = True
+        member.ws_io = FakeIO()  # type: ignore
+    await asyncio.sleep(0)
+    assert pool.status.available
+
+    busy = asyncio.create_task(pool.call("about", CallMethod.GET))
+    await asyncio.sleep(0)
+    assert len(pool.members[0].futures) == 1
+    idle = asyncio.create_task(pool.call("about", CallMethod.GET))
+    await asyncio.sleep(0)
+    assert len(pool.members[1].futures) == 1  # least outstanding requests
+    assert not pool.members[2].futures  # not available
+    for member in pool.members[:2]:
+        next(iter(member.futures.values())).set_result({})
+    await asyncio.gather(busy, idle)
+
+    pool.members[0].status.alive = False
+    await asyncio.sleep(0)
+    assert pool.status.available
+    pool.members[1].status.session_key = None
+    await asyncio.sleep(0)
+    assert not pool.status.available
+
+
+@pytest.mark.asyncio
+async def test_pool_dedupe():
+    pool = WebsocketPoolConnection(WebsocketPoolInfo(1, "key", "http://localhost:8080", size=2))
+    received = []
+
+    async def callback(event):
+        received.append(event)
+
+    pool.event_callbacks.append(callback)
+    first, second = pool.members
+    await first.receive_event({"type": "BotOnlineEvent", "qq": 1})
+    await second.receive_event({"type": "BotOnlineEvent", "qq": 1})
+    await second.receive_event({"type": "BotOnlineEvent", "qq": 2})
+    await first.receive_event({"type": "BotOnlineEvent", "qq": 2})
+    # the same event happening twice is delivered twice on every socket
+    await first.receive_event({"type": "BotOnlineEvent", "qq": 1})
+    await second.receive_event({"type": "BotOnlineEvent", "qq": 1})
+    assert pool.status.queue_depth == 3
+    while len(received) < 3:
+        await asyncio.sleep(0)
+    assert [e.qq for e in received] == [1, 2, 1]
+    pool.event_queue.stop()
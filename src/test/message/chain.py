@@ -1,20 +1,36 @@
 import base64
+from copy import deepcopy
+from datetime import datetime
 
 import aiohttp
 import pytest
 
-from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.app import Ariadne
+from graia.ariadne.connection.util import build_event
+from graia.ariadne.event.message import FriendMessage
+from graia.ariadne.message.chain import ELEMENT_MAPPING, MessageChain
 from graia.ariadne.message.element import (
     At,
     AtAll,
     BaseText,
     Element,
+    Face,
+    Forward,
+    ForwardNode,
     Image,
+    Json,
+    MusicShare,
+    MusicShareKind,
     Plain,
+    Poke,
+    PokeMethods,
     Quote,
     Source,
+    Voice,
 )
+from graia.ariadne.model import LogConfig
 from graia.ariadne.util import Dummy
+from graia.ariadne.util.cache import MessageCache, RelationshipCache
 
 __name__ = "graia.test.message.chain"  # monkey patch to pass internal class check
 
@@ -307,3 +323,182 @@ def test_list_method():
 
 if __name__ == "__main__":
     pytest.main([__file__, "-vvv"])
+
+
+def test_to_wire():
+    nested = MessageChain(["inner", Face(1, "微笑"), Image(url="https://example.com/a.png", width=10)])
+    forward = Forward(ForwardNode(12345, datetime.fromtimestamp(1660000000), nested, "name"))
+    chains = [
+        MessageChain(["Hello", At(12345), AtAll(), Face(name="hi"), Image(base64="aGVsbG8=")]),
+        MessageChain([Poke(PokeMethods.BiXin)]),
+        MessageChain([Voice(id="v")]),
+        MessageChain([Json({"a": [1, None]})]),
+        MessageChain([MusicShare(MusicShareKind.QQMusic, "title")]),
+        MessageChain([forward]),
+    ]
+    for chain in chains:
+        assert chain.to_wire() == chain.dict()["__root__"]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"type": "Plain", "text": "hello"},
+        {"type": "Plain", "text": "hello", "extra": 1},
+        {"type": "Plain", "text": 1},
+        {"type": "At", "target": 12345, "display": "@name"},
+        {"type": "At", "target": 12345},
+        {"type": "AtAll"},
+        {"type": "Face", "faceId": 1, "name": "微笑"},
+        {"type": "Face", "faceId": None, "name": "微笑"},
+    ],
+)
+def test_fast_deserialize(data: dict):
+    (element,) = MessageChain.build_chain([data])
+    expected = ELEMENT_MAPPING[data["type"]].parse_obj(data)
+    assert element.__class__ is expected.__class__
+    assert element.__dict__ == expected.__dict__
+
+
+@pytest.mark.parametrize("data", [{"type": "Plain"}, {"type": "At", "display": "@name"}])
+def test_fast_deserialize_missing_field(data: dict):
+    with pytest.raises((TypeError, ValueError)):
+        ELEMENT_MAPPING[data["type"]].parse_obj(data)
+    with pytest.raises((TypeError, ValueError)):
+        MessageChain.build_chain([data])
+
+
+def test_lazy():
+    raw = [{"type": "Plain", "text": "Hello "}, {"type": "At", "target": 12345}, {"type": "Broken"}]
+    chain = MessageChain.lazy(raw)
+    assert chain.has(At)
+    assert not chain.has(Image)
+    assert chain.only(Plain, At)
+    assert not chain.only(Plain)
+    assert len(chain) == 2 and chain
+    assert str(chain) == "Hello @12345"
+    assert chain._raw is raw  # not materialized yet
+    assert chain == MessageChain(["Hello ", At(12345)])
+    assert chain._raw is None
+    assert chain.dict()["__root__"] == [{"type": "Plain", "text": "Hello "}, {"type": "At", "target": 12345}]
+
+    chain = MessageChain.lazy([{"type": "Plain", "text": "Hello "}, {"type": "Plain", "text": "World"}])
+    assert chain.display == "Hello World"
+    assert chain._raw is not None
+    assert deepcopy(chain).content == [Plain("Hello "), Plain("World")]
+    assert chain.dict() == MessageChain(["Hello ", "World"]).dict()
+
+    with pytest.raises(ValueError):
+        MessageChain.lazy([{"type": "Xml", "xml": "<a/>"}, {"type": "App", "content": "{}"}])
+
+
+def test_lazy_event():
+    event = build_event(
+        {
+            "type": "FriendMessage",
+            "messageChain": [{"type": "Source", "id": 1, "time": 1}, {"type": "Plain", "text": "hi"}],
+            "sender": {"id": 12345, "nickname": "a", "remark": "b"},
+        }
+    )
+    assert isinstance(event, FriendMessage)
+    assert event.message_chain._raw == [{"type": "Plain", "text": "hi"}]
+    assert str(event.message_chain) == "hi"
+    assert event.message_chain.content == [Plain("hi")]
+
+
+@pytest.mark.asyncio
+async def test_lazy_event_hook():
+    event = build_event(
+        {
+            "type": "GroupMessage",
+            "messageChain": [
+                {"type": "Source", "id": 1, "time": 1},
+                {"type": "Plain", "text": "hi "},
+                {"type": "At", "target": 2, "display": ""},
+                {"type": "Image", "imageId": "{01E9451B-70ED-EAE3-B37C-101F1EEBF5B5}.jpg"},
+            ],
+            "sender": {
+                "id": 12345,
+                "memberName": "a",
+                "permission": "MEMBER",
+                "group": {"id": 1, "name": "g", "permission": "MEMBER"},
+            },
+        }
+    )
+    app = Dummy(
+        account=1,
+        archive=None,
+        message_cache=MessageCache(),
+        relationship_cache=RelationshipCache(),
+    )
+    await LogConfig(extra={"GroupMessage": "{event.message_chain.safe_display}"}).log(app, event)
+    await LogConfig().log(app, event)
+    await Ariadne._event_hook(app, event)  # type: ignore
+    assert event.message_chain._raw is not None
+    assert app.message_cache.get(1) == event
+
+    event = build_event(
+        {
+            "type": "FriendMessage",
+            "messageChain": [{"type": "Source", "id": 2, "time": 1}, {"type": "Unsupported"}],
+            "sender": {"id": 12345, "nickname": "a", "remark": "b"},
+        }
+    )
+    assert not event.message_chain and event.message_chain._raw is not None
+    await Ariadne._event_hook(app, event)  # type: ignore
+    assert str(event.message_chain) == "<! 不支持的消息类型 !>"
+
+
+def test_copy_on_write():
+    at = At(12345)
+    chain = MessageChain(["!cmd arg", at, "tail "])
+
+    copied = chain.copy()
+    assert copied == chain and copied.content is not chain.content
+    assert copied[1] is at
+
+    removed = chain.removeprefix("!").removesuffix(" ")
+    assert removed == MessageChain(["cmd arg", at, "tail"])
+    assert chain == MessageChain(["!cmd arg", at, "tail "])
+    assert removed[1] is at
+
+    plain = chain[0]
+    chain.removeprefix("!", copy=False)
+    assert chain[0].text == "cmd arg" and plain.text == "!cmd arg"
+
+    doubled = chain * 2
+    assert doubled == MessageChain(["cmd arg", at, "tail ", "cmd arg", at, "tail "])
+    doubled *= 0
+    assert not doubled.content and len(chain) == 3
+
+    extended = chain.extend("more", copy=True)
+    assert len(extended) == 4 and len(chain) == 3
+    assert MessageChain(" ").join([MessageChain("a"), MessageChain("b", at)]) == MessageChain(["a b", at])
+
+
+def test_projection():
+    chain = MessageChain(["Hello ", At(12345), " world"])
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return chain.display
+
+    assert chain.projection("test", factory) == "Hello @12345 world"
+    assert chain.projection("test", factory) == "Hello @12345 world"
+    assert len(calls) == 1
+    assert chain._to_mapping_str() is chain._to_mapping_str()
+    assert chain._to_mapping_str() is not chain._to_mapping_str(remove_extra_space=True)
+
+    chain.append("!")
+    assert chain.projection("test", factory) == "Hello @12345 world!"
+    chain.content[0] = Plain("Hi ")
+    assert chain.projection("test", factory) == "Hi @12345 world!"
+    assert chain._to_mapping_str()[0] == "Hi \x021_At\x03 world!"
+    assert len(calls) == 3
+
+    lazy = MessageChain.lazy([{"type": "Plain", "text": "hello"}])
+    assert lazy.display == "hello"
+    assert lazy._raw is not None
+    assert lazy._to_mapping_str()[0] == "hello"
+    assert lazy.display == "hello"
@@ -0,0 +1,144 @@
+import asyncio
+from typing import Any, List
+
+import pytest
+from graia.broadcast import Broadcast
+from graia.broadcast.exceptions import PropagationCancelled
+
+from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.message.commander import (
+    Arg,
+    Commander,
+    ParamDesc,
+    Slot,
+    chain_validator,
+    wildcard_validator,
+)
+from graia.ariadne.message.commander.util import raw
+from graia.ariadne.message.element import At, Face, Forward, Plain
+from graia.ariadne.typing import Sentinel
+
+CONTENTS = [
+    ["abc"],
+    ["12"],
+    [" 7 "],
+    ["yes"],
+    [At(1)],
+    ["a", At(1)],
+    [Face(1)],
+    [Forward([]), Forward([])],
+    [],
+]
+
+
+def validate_both(desc: ParamDesc, value: Any):
+    assert desc.caster is not None
+
+    def run():
+        try:
+            return desc.validate(value)
+        except ValueError:
+            return ValueError
+
+    fast = run()
+    desc.caster, caster = None, desc.caster
+    assert run() == fast
+    desc.caster = caster
+
+
+@pytest.mark.parametrize("annotation", [MessageChain, str, int, bool, At, Plain, Face])
+@pytest.mark.parametrize("content", CONTENTS)
+def test_slot_caster(annotation, content: list):
+    slot = Slot("v", annotation)
+    slot.dest = "v"
+    slot.populate_field([chain_validator])
+    validate_both(slot, content)
+
+
+@pytest.mark.parametrize("annotation", [raw, str, int, At])
+@pytest.mark.parametrize("content", [[c] for c in CONTENTS] + [CONTENTS[:3], []])
+def test_wildcard_caster(annotation, content: List[list]):
+    slot = Slot("v", annotation)
+    slot.dest = "v"
+    slot.is_wildcard = True
+    slot.populate_field([wildcard_validator])
+    validate_both(slot, content)
+
+
+@pytest.mark.parametrize("annotation", [MessageChain, str, int, bool])
+@pytest.mark.parametrize("content", [[c] for c in CONTENTS] + [False, True])
+def test_arg_caster(annotation, content: Any):
+    arg = Arg("--v {v}", annotation, default=None)
+    arg.dest = "v"
+    arg.populate_field([chain_validator])
+    validate_both(arg, content)
+
+
+def test_caster_fallback():
+    slot = Slot("v", int)
+    slot.dest = "v"
+    slot.populate_field([chain_validator, lambda v: v])
+    assert slot.caster is None
+
+    slot = Slot("v", float)
+    slot.dest = "v"
+    slot.populate_field([chain_validator])
+    assert slot.caster is None
+
+    arg = Arg("--flag")
+    arg.dest = "flag"
+    arg.populate_field([chain_validator])
+    assert arg.caster and arg.caster(True) is True and arg.caster(None) is Sentinel
+
+
+@pytest.mark.asyncio
+async def test_execute_inline():
+    cmd = Commander(Broadcast(loop=asyncio.get_running_loop()), listen=False)
+    received = []
+
+    @cmd.command("ping {target} {...rest}", {"flag": Arg("--flag")})
+    def _(target: At, rest: int, flag: bool):
+        received.append((asyncio.current_task(), target, rest, flag))
+
+    task = asyncio.current_task()
+    await cmd.execute(MessageChain("ping ", At(1), " 1 2 --flag"))
+    await cmd.execute(MessageChain("ping ", At(2)))
+    assert received == [(task, At(1), [1, 2], True), (task, At(2), [], False)]
+
+
+@pytest.mark.asyncio
+async def test_execute_group():
+    cmd = Commander(Broadcast(loop=asyncio.get_running_loop()), listen=False)
+    received = []
+
+    @cmd.command("ping {target}", priority=1)
+    def _(target: str):
+        received.append(("str", target))
+
+    @cmd.command("ping {target}", priority=1)
+    def _(target: int):
+        received.append(("int", target))
+        raise PropagationCancelled
+
+    @cmd.command("ping {target}", priority=2)
+    def _(target: str):
+        received.append(("low", target))
+
+    @cmd.command("ping")
+    def _():
+        raise ValueError
+
+    @cmd.command("pong {target}", priority=1)
+    def _(target: int):
+        raise ValueError
+
+    @cmd.command("pong {target}", priority=2)
+    def _(target: str):
+        received.append(("pong", target))
+
+    await cmd.execute(MessageChain("ping 1"))
+    assert sorted(received) == [("int", 1), ("str", "1")]
+    received.clear()
+    await cmd.execute(MessageChain("ping"))
+    await cmd.execute(MessageChain("pong 1"))
+    assert received == [("pong", "1")]
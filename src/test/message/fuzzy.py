@@ -0,0 +1,62 @@
+import difflib
+from typing import List
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.message.parser.base import FuzzyMatch
+from graia.ariadne.message.parser.util import FuzzyIndex, fuzzy_ratio
+
+texts = st.text(alphabet=st.sampled_from(list("abcd 你好")), max_size=20)
+
+
+def reference_ratio(a: str, b: str) -> float:
+    if not a and not b:
+        return 1.0
+    row = [0] * (len(b) + 1)
+    for char in a:
+        prev = 0
+        for index, other in enumerate(b, 1):
+            prev, row[index] = row[index], prev + 1 if char == other else max(row[index], row[index - 1])
+    return 2 * row[-1] / (len(a) + len(b))
+
+
+@given(texts, texts)
+def test_fuzzy_ratio(a: str, b: str):
+    assert fuzzy_ratio(a, b) == reference_ratio(a, b)
+    assert fuzzy_ratio(a, b) >= difflib.SequenceMatcher(a=a, b=b).ratio()
+
+
+@given(st.lists(texts, min_size=1, max_size=8), texts, st.floats(0.0, 1.0))
+def test_fuzzy_index(templates: List[str], text: str, min_rate: float):
+    index = FuzzyIndex()
+    for template in templates:
+        index.add(template)
+    best_rate = max(reference_ratio(text, template) for template in templates)
+    # ties go to the template added last
+    best_template = [template for template in templates if reference_ratio(text, template) == best_rate][-1]
+    assert index.best(text) == (best_template, best_rate)
+    for template in templates:
+        rate = index.rate(text, template, min_rate)
+        expected = reference_ratio(text, template)
+        assert rate == expected if expected >= min_rate else rate < min_rate
+
+
+def test_fuzzy_index_cache():
+    index = FuzzyIndex(cache_size=2)
+    index.add("hello")
+    for text in ("hello", "help", "yellow"):
+        index.rate(text, "hello")
+    assert list(index.cache) == ["help", "yellow"]
+    index.add("world")
+    assert not index.cache
+    assert index.best("word") == ("world", 8 / 9)
+    assert index.best("") == ("world", 0.0)
+    assert FuzzyIndex().best("hello") is None
+
+
+def test_fuzzy_match():
+    assert FuzzyMatch("github").match(MessageChain("gayhub"))
+    assert not FuzzyMatch("github", 0.8).match(MessageChain("gayhub"))
+    assert not FuzzyMatch("hello").match(MessageChain("world"))
@@ -0,0 +1,70 @@
+from typing import List
+
+import pytest
+from graia.broadcast.exceptions import ExecutionStop
+from hypothesis import given
+from hypothesis import strategies as st
+
+from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.message.element import At, Face, Plain
+from graia.ariadne.message.parser.base import (
+    ContainKeyword,
+    DetectPrefix,
+    DetectSuffix,
+    MatchContent,
+)
+from graia.ariadne.message.parser.util import ChainMatcher, KeywordAutomaton
+
+words = st.text(alphabet="abc", max_size=6)
+elements = st.one_of(words.map(Plain), st.just(At(1)), st.just(Face(1)))
+
+
+@given(st.lists(words, max_size=12), st.lists(words, max_size=12), st.lists(words, max_size=4))
+def test_automaton(keywords: List[str], extra: List[str], texts: List[str]):
+    automaton = KeywordAutomaton()
+    for keyword in keywords:
+        automaton.add(keyword)
+    for text in texts:
+        assert automaton.prefixes(text) == {k for k in keywords if text.startswith(k)}
+    assert automaton.find(texts) == {k for k in keywords if k and any(k in text for text in texts)}
+    for keyword in extra:  # rebuilt after incremental registration
+        automaton.add(keyword)
+    assert automaton.find(texts) == {k for k in keywords + extra if k and any(k in text for text in texts)}
+    assert all(k in automaton for k in keywords + extra)
+
+
+@given(st.lists(words, min_size=1, max_size=8), st.lists(elements, max_size=6))
+def test_chain_matcher(patterns: List[str], content: list):
+    matcher = ChainMatcher()
+    for pattern in patterns:
+        matcher.add_prefix(pattern)
+        matcher.add_suffix(pattern)
+        if pattern:
+            matcher.add_keyword(pattern)
+    chain = MessageChain(content, inline=True)
+    assert matcher.prefixes(chain) == {p for p in patterns if chain.startswith(p)}
+    assert matcher.suffixes(chain) == {p for p in patterns if chain.endswith(p)}
+    assert matcher.keywords(chain) == {p for p in patterns if p and p in chain}
+
+
+@pytest.mark.asyncio
+async def test_decorators():
+    chain = MessageChain([Plain(".ping "), Plain("hello"), At(1), Plain("world!")], inline=True)
+    assert await DetectPrefix([".pong", ".ping"])(chain, None) == MessageChain(
+        [Plain(""), Plain("hello"), At(1), Plain("world!")], inline=True
+    )
+    assert await DetectSuffix("!")(chain, None) == chain.removesuffix("!")
+    assert await ContainKeyword("ping hello")(chain, None) is chain
+    assert await MatchContent(".ping hello@1world!")(chain, None) is chain
+    for decorator in (
+        DetectPrefix("hello"),
+        DetectSuffix("world"),
+        ContainKeyword("hello@"),
+        MatchContent(""),
+    ):
+        with pytest.raises(ExecutionStop):
+            await decorator(chain, None)
+    # registering new patterns invalidates results cached on the chain
+    assert await ContainKeyword("world")(chain, None) is chain
+    with pytest.raises(ExecutionStop):
+        await ContainKeyword("helloworld")(chain, None)
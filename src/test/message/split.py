@@ -0,0 +1,84 @@
+from typing import List
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.message.commander.util import quote_pairs
+from graia.ariadne.message.commander.util import split as commander_split
+from graia.ariadne.message.element import At, Plain
+from graia.ariadne.message.parser.util import split
+
+texts = st.text(alphabet=st.sampled_from(list("ab \\'\"‘’“”")) | st.characters(), max_size=40)
+
+
+def reference_split(string: str, keep_quote: bool = False) -> List[str]:
+    result: List[str] = []
+    quote = ""
+    cache: List[str] = []
+    for index, char in enumerate(string):
+        if char in {"'", '"'}:
+            if not quote:
+                quote = char
+            elif char == quote and index and string[index - 1] != "\\":
+                quote = ""
+            else:
+                cache.append(char)
+                continue
+            if keep_quote:
+                cache.append(char)
+        elif not quote and char == " ":
+            result.append("".join(cache))
+            cache = []
+        elif char != "\\":
+            cache.append(char)
+    if cache:
+        result.append("".join(cache))
+    return result
+
+
+def reference_commander_split(chain: MessageChain) -> list:
+    result = []
+    quote: str = ""
+    buffer = []
+    for elem in chain.__root__:
+        if not isinstance(elem, Plain):
+            buffer.append(elem)
+            continue
+        cache: List[str] = []
+        skipping: bool = False
+        for char in elem.text:
+            if char == "\\" or skipping:
+                skipping = not skipping
+                continue
+            if char in quote_pairs and not quote:
+                quote = quote_pairs[char]
+                continue
+            elif char == quote:
+                quote = ""
+                continue
+            if char == " " and (cache or buffer) and not quote:
+                if cache:
+                    buffer.append("".join(cache))
+                    cache.clear()
+                if buffer:
+                    result.append(buffer)
+                    buffer = []
+            elif quote or char != " ":
+                cache.append(char)
+        if cache:
+            buffer.append("".join(cache))
+    if buffer:
+        result.append(buffer)
+    return result
+
+
+@given(texts, st.booleans())
+def test_split(string: str, keep_quote: bool):
+    assert split(string, keep_quote) == reference_split(string, keep_quote)
+
+
+@given(st.lists(texts | st.builds(At, st.integers(1, 3)), max_size=5))
+def test_commander_split(content: list):
+    chain = MessageChain([Plain(c) if isinstance(c, str) else c for c in content])
+    assert commander_split(chain) == reference_commander_split(chain)
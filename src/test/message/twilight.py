@@ -0,0 +1,168 @@
+import argparse
+
+import pytest
+
+from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.message.element import At
+from graia.ariadne.message.parser.twilight import (
+    ArgumentMatch,
+    FullMatch,
+    ParamMatch,
+    RegexResult,
+    SpacePolicy,
+    Twilight,
+    TwilightIndex,
+    UnionMatch,
+    WildcardMatch,
+)
+from graia.ariadne.message.parser.util import (
+    TwilightOptionParser,
+    TwilightParser,
+    elem_mapping_ctx,
+)
+
+
+def test_prefixes():
+    assert Twilight(FullMatch(".ping")).matcher.prefixes == (".ping",)
+    assert Twilight(UnionMatch(".a", ".b"), WildcardMatch()).matcher.prefixes == (".a", ".b")
+    assert Twilight(FullMatch(".ping", optional=True)).matcher.prefixes is None
+    assert Twilight(ParamMatch(), FullMatch(".ping")).matcher.prefixes is None
+    assert Twilight(FullMatch(".ping"), ArgumentMatch("--foo")).matcher.prefixes is None
+
+
+def test_min_tokens():
+    assert Twilight(FullMatch(".ping")).matcher.min_tokens == 1
+    assert Twilight(FullMatch(".ping"), ParamMatch()).matcher.min_tokens == 1
+    assert Twilight(FullMatch(".ping").space(SpacePolicy.FORCE), ParamMatch()).matcher.min_tokens == 2
+    assert Twilight(ParamMatch(optional=True).space(SpacePolicy.FORCE)).matcher.min_tokens == 2
+    assert Twilight(FullMatch("a b").space(SpacePolicy.NOSPACE)).matcher.min_tokens == 2
+    assert Twilight(UnionMatch("a b", "c d e")).matcher.min_tokens == 2
+
+
+def test_index():
+    index = TwilightIndex()
+    ping = Twilight(FullMatch(".ping"))
+    pong = Twilight(UnionMatch(".pong", ".p"))
+    index.register(ping)
+    index.register(pong)
+    assert index.candidates(".ping") == {ping, pong}
+    assert index.candidates(".pong x") == {pong}
+    assert index.candidates("ping") == set()
+    assert not ping.accepts(MessageChain("ping"))
+    assert not Twilight(FullMatch(".a").space(SpacePolicy.FORCE), ParamMatch()).accepts(MessageChain(".a"))
+
+
+@pytest.mark.parametrize(
+    "twilight",
+    [
+        Twilight(FullMatch(".ping")),
+        Twilight(FullMatch(".ping"), "arg" @ ParamMatch()),
+        Twilight(FullMatch(".ping").space(SpacePolicy.FORCE), ParamMatch()),
+        Twilight(UnionMatch(".ping", ".pong"), WildcardMatch()),
+        Twilight(FullMatch(".ping"), ArgumentMatch("--foo")),
+        Twilight(FullMatch("\\"), ParamMatch()),
+        Twilight(ParamMatch(), ParamMatch()),
+    ],
+)
+@pytest.mark.parametrize(
+    "chain",
+    [
+        MessageChain(".ping"),
+        MessageChain(".ping "),
+        MessageChain(".ping foo"),
+        MessageChain(".pong ", At(1)),
+        MessageChain(".pi\\ng"),
+        MessageChain("'.ping foo'"),
+        MessageChain("\\ foo"),
+        MessageChain("ping"),
+    ],
+)
+def test_accepts(twilight: Twilight, chain: MessageChain):
+    try:
+        twilight.generate(chain)
+    except Exception:
+        return
+    assert twilight.accepts(chain)
+
+
+OPTION_DEFINITIONS = [
+    [ArgumentMatch("--foo", "-f")],
+    [ArgumentMatch("--foo", type=int, default="3"), ArgumentMatch("--bar", action="store_true")],
+    [ArgumentMatch("--foo", nargs="?", const="c"), ArgumentMatch("--bar", nargs="*")],
+    [ArgumentMatch("--foo", nargs="+", type=int), ArgumentMatch("--bar", nargs=2)],
+    [ArgumentMatch("--foo", action="append", default=None), ArgumentMatch("-v", action="count")],
+    [ArgumentMatch("--foo", action="extend", nargs="+", default=None)],
+    [
+        ArgumentMatch("--foo", choices=["a", "b"], type=str),
+        ArgumentMatch("--bar", action="store_const", const=1),
+    ],
+    [ArgumentMatch("--foo", optional=False), ArgumentMatch("--bar", action=argparse.BooleanOptionalAction)],
+    [ArgumentMatch("--foo", type=At), ArgumentMatch("--bar", type=MessageChain, default="x")],
+]
+
+OPTION_INPUTS = [
+    "",
+    "text",
+    "--foo",
+    "--foo a",
+    "--foo a b c",
+    "a --foo 1 b --foo 2",
+    "-f 1 --bar",
+    "--bar --foo 7",
+    "--bar x y z --foo a",
+    "--no-bar --foo a",
+    "-v -v --foo x -v",
+    "--foo \x021_At\x03",
+    "--fo a",
+    "--foo=a",
+    "-fa",
+    "-- --foo a",
+    "--foo -1",
+    "- --foo a",
+]
+
+
+@pytest.mark.parametrize("matches", OPTION_DEFINITIONS)
+@pytest.mark.parametrize("string", OPTION_INPUTS)
+def test_option_parser(matches, string: str):
+    parser = Twilight(matches).matcher._parser
+    option_parser = TwilightOptionParser.compile(parser)
+    assert option_parser
+    args = string.replace("\\x02", "\x02").replace("\\x03", "\x03").split(" ") if string else []
+    token = elem_mapping_ctx.set({"1": At(1)})
+    try:
+        try:
+            expected = parser.parse_known_args(args)
+        except Exception as e:
+            with pytest.raises(type(e)):
+                option_parser.parse_known_args(args)
+            return
+        assert option_parser.parse_known_args(args) == expected
+    finally:
+        elem_mapping_ctx.reset(token)
+
+
+def test_option_parser_fallback():
+    parser = TwilightParser(prog="", add_help=False)
+    parser.add_argument("--foo", nargs=argparse.REMAINDER)
+    assert TwilightOptionParser.compile(parser) is None
+    twilight = Twilight(FullMatch(".cmd"), "foo" @ ArgumentMatch("--foo", nargs=argparse.REMAINDER))
+    assert twilight.matcher._option_parser is twilight.matcher._parser
+    result = twilight.generate(MessageChain(".cmd --foo a b")).res["foo"].result
+    assert result == [MessageChain("a"), MessageChain("b")]
+
+
+def test_lazy_result():
+    twilight = Twilight(FullMatch(".cmd"), "a" @ ParamMatch(optional=True), "b" @ WildcardMatch())
+    sparkle = twilight.generate(MessageChain(".cmd foo ", At(1), " bar"))
+    a, b = sparkle["a"], sparkle["b"]
+    assert isinstance(a, RegexResult) and a._source is not None
+    assert a.matched and a.result == MessageChain("foo") and a._source is None
+    assert b.matched and b.result == MessageChain([At(1), " bar"])
+
+    sparkle = twilight.generate(MessageChain(".cmd"))
+    assert not sparkle["a"].matched and sparkle["a"].result is None
+    assert not sparkle["b"].matched and sparkle["b"].result == MessageChain([])
+
+    sparkle["b"].result = MessageChain("override")
+    assert sparkle["b"].result == MessageChain("override")
@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from graia.ariadne.app import Ariadne
+from graia.ariadne.connection.util import build_event
+from graia.ariadne.event.message import ActiveFriendMessage, GroupMessage
+from graia.ariadne.util import Dummy
+from graia.ariadne.util.archive import MessageArchive, message_subject
+from graia.ariadne.util.cache import MessageCache, RelationshipCache
+
+
+def group_message(message_id: int, group_id: int, time: int) -> GroupMessage:
+    return build_event(
+        {
+            "type": "GroupMessage",
+            "messageChain": [
+                {"type": "Source", "id": message_id, "time": time},
+                {"type": "Plain", "text": f"message {message_id}"},
+            ],
+            "sender": {
+                "id": 2,
+                "memberName": "m2",
+                "permission": "MEMBER",
+                "group": {"id": group_id, "name": f"g{group_id}", "permission": "MEMBER"},
+            },
+        }
+    )
+
+
+def friend_message(message_id: int, time: int) -> ActiveFriendMessage:
+    return build_event(
+        {
+            "type": "ActiveFriendMessage",
+            "messageChain": [
+                {"type": "Source", "id": message_id, "time": time},
+                {"type": "Plain", "text": "x"},
+            ],
+            "subject": {"id": 5, "nickname": "n", "remark": "r"},
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_message_archive(tmp_path: Path):
+    archive = MessageArchive(tmp_path / "archive.db")
+    for i in range(10):
+        archive.add(1, group_message(i, 100 + i % 2, 1650000000 + i))
+    archive.add(1, friend_message(3, 1650000003))
+    archive.add(1, friend_message(-1, 1650000003))  # failed to send
+    archive.add(2, group_message(0, 100, 1650000100))
+    assert message_subject(friend_message(3, 0)) == 5
+
+    # pending messages are visible before they are written
+    assert await archive.get(1, 4) == group_message(4, 100, 1650000004)
+    await archive.flush()
+    assert not archive.pending and archive.written == 12
+
+    assert isinstance(await archive.get(1, 3), ActiveFriendMessage)
+    assert await archive.get(1, 3, 101) == group_message(3, 101, 1650000003)
+    assert await archive.get(2, 0) == group_message(0, 100, 1650000100)
+    assert await archive.get(1, 42) is None
+
+    assert [int(e) async for e in archive.scan(1, batch_size=3)] == [0, 1, 2, 3, 3, 4, 5, 6, 7, 8, 9]
+    assert [int(e) async for e in archive.scan(1, 101, batch_size=2)] == [1, 3, 5, 7, 9]
+    start = datetime.fromtimestamp(1650000003, timezone.utc)
+    end = datetime.fromtimestamp(1650000006, timezone.utc)
+    assert [int(e) async for e in archive.scan(1, start=start, end=end, batch_size=1)] == [3, 3, 4, 5]
+    await archive.close()
+
+    # the archive survives reopening
+    archive = MessageArchive(tmp_path / "archive.db")
+    archive.add(1, group_message(4, 100, 1650000004))
+    assert [int(e) async for e in archive.scan(1, 100)] == [0, 2, 4, 6, 8]
+    await archive.close()
+
+
+def test_message_archive_id(tmp_path: Path):
+    archive = MessageArchive(tmp_path / "archive.db")
+    assert archive.id == MessageArchive(str(tmp_path / "archive.db")).id
+    assert archive.id != MessageArchive(tmp_path / "other.db").id
+
+
+@pytest.mark.asyncio
+async def test_message_archive_event_hook(tmp_path: Path):
+    app = Dummy(
+        account=1,
+        archive=MessageArchive(tmp_path / "archive.db", compress_threshold=0),
+        message_cache=MessageCache(compress_threshold=0),
+        relationship_cache=RelationshipCache(),
+    )
+    await Ariadne._event_hook(app, group_message(1, 100, 1650000000))  # type: ignore
+    assert app.archive.pending[0][6] is app.message_cache.table.get(1)  # the cached encoding is reused
+
+    app.archive.compress_threshold = 1024
+    await Ariadne._event_hook(app, group_message(2, 100, 1650000000))  # type: ignore
+    assert app.archive.pending[1][6] is not app.message_cache.table.get(2)
+    assert await app.archive.get(1, 2) == group_message(2, 100, 1650000000)
+    await app.archive.close()
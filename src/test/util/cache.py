@@ -0,0 +1,228 @@
+import asyncio
+import time
+
+import pytest
+
+from graia.ariadne.connection.util import build_event
+from graia.ariadne.event.message import ActiveFriendMessage, GroupMessage
+from graia.ariadne.message.element import Image
+from graia.ariadne.model import Friend, Group, Member
+from graia.ariadne.util import Dummy
+from graia.ariadne.util.cache import (
+    CacheStats,
+    CacheWarmup,
+    LRUTable,
+    MessageCache,
+    RelationshipCache,
+    WarmupConfig,
+    decode_message,
+    encode_message,
+)
+
+
+def make_group(group_id: int) -> Group:
+    return Group.parse_obj({"id": group_id, "name": f"g{group_id}", "permission": "MEMBER"})
+
+
+def make_member(group_id: int, member_id: int) -> Member:
+    return Member.parse_obj(
+        {
+            "id": member_id,
+            "memberName": f"m{member_id}",
+            "permission": "MEMBER",
+            "group": {"id": group_id, "name": f"g{group_id}", "permission": "MEMBER"},
+        }
+    )
+
+
+def test_lru_table():
+    removed = []
+    table = LRUTable(max_size=2, on_remove=removed.append)
+    table.set_many([(1, "a"), (2, "b")])
+    assert table.get(1) == "a"
+    table.set(3, "c")
+    assert removed == [2]
+    assert 2 not in table and 1 in table and 3 in table
+    assert table.pop(1) == "a"
+    assert table.pop(1) is None
+    assert removed == [2, 1]
+    table.clear()
+    assert not table and removed == [2, 1, 3]
+
+
+def test_lru_table_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = 0.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    removed = []
+    table = LRUTable(ttl=10, on_remove=removed.append)
+    table.set(1, "a")
+    now = 5.0
+    table.set(2, "b")
+    assert table.get(1) == "a"
+    now = 12.0
+    assert table.get(1) is None
+    assert table.get(2) == "b"
+    now = 20.0
+    table.set(3, "c")
+    assert list(table.data) == [3]
+    assert removed == [1, 2]
+
+
+def test_lru_table_weight():
+    table = LRUTable(weigher=len, max_weight=10)
+    table.set_many([(1, "aaaa"), (2, "bbbb")])
+    assert table.weight == 8
+    table.set(1, "a")
+    assert table.weight == 5
+    table.set(3, "cccccc")
+    assert list(table.data) == [1, 3] and table.weight == 7
+    table.set(4, "d" * 11)
+    assert not table and table.weight == 0
+    assert table.evictions == 4
+
+
+def test_relationship_cache():
+    cache = RelationshipCache()
+    cache.set_friends([Friend(id=1, nickname="n", remark="r")])
+    assert cache.get_friend(1).id == 1
+    cache.delete_friend(1)
+    assert cache.get_friend(1) is None
+
+    cache.set_members([make_member(10, i) for i in range(5)] + [make_member(20, 1)])
+    assert cache.get_group(10) == make_group(10)
+    assert cache.get_member(20, 1) == make_member(20, 1)
+    assert [m.id for m in cache.members_of(10)] == list(range(5))
+    assert sorted(g.id for g in cache.groups_of(1)) == [10, 20]
+
+    cache.delete_member(10, 1)
+    assert [g.id for g in cache.groups_of(1)] == [20]
+    assert [m.id for m in cache.members_of(10)] == [0, 2, 3, 4]
+
+    cache.delete_group(10)
+    assert cache.get_group(10) is None
+    assert cache.members_of(10) == []
+    assert 10 not in cache.group_members
+    assert cache.member_groups == {1: {20}}
+
+    cache.delete_members(20)
+    assert cache.get_group(20) is not None
+    assert not cache.members and not cache.group_members and not cache.member_groups
+
+
+def test_relationship_cache_eviction():
+    cache = RelationshipCache(max_size=3)
+    cache.set_members(make_member(10, i) for i in range(5))
+    assert [m.id for m in cache.members_of(10)] == [2, 3, 4]
+    assert set(cache.member_groups) == {2, 3, 4}
+    cache.get_member(10, 2)
+    cache.set_members([make_member(20, 5)])
+    assert [m.id for m in cache.members_of(10)] == [2, 4]
+    assert [g.id for g in cache.groups_of(5)] == [20]
+    cache.clear()
+    assert not cache.group_members and not cache.member_groups and not cache.groups
+
+
+def make_message(message_id: int, text: str = "hello") -> GroupMessage:
+    return build_event(
+        {
+            "type": "GroupMessage",
+            "messageChain": [
+                {"type": "Source", "id": message_id, "time": 1650000000},
+                {"type": "Quote", "id": 1, "groupId": 10, "senderId": 2, "targetId": 10, "origin": []},
+                {"type": "Plain", "text": text},
+                {"type": "At", "target": 1, "display": ""},
+            ],
+            "sender": {
+                "id": 1,
+                "memberName": "m1",
+                "permission": "MEMBER",
+                "group": {"id": 10, "name": "g10", "permission": "MEMBER"},
+            },
+        }
+    )
+
+
+def test_encode_message():
+    event = make_message(42)
+    encoded = encode_message(event)
+    assert event.message_chain._raw is not None  # lazy chains are encoded as is
+    assert decode_message(encoded) == event
+    event.message_chain.append(Image(base64="QUFB" * 1000))
+    compressed = encode_message(event, 1024)
+    assert len(compressed) < 1024 < len(encode_message(event))
+    assert decode_message(compressed) == event
+
+    active = build_event(
+        {
+            "type": "ActiveFriendMessage",
+            "messageChain": [
+                {"type": "Source", "id": 43, "time": 1650000000},
+                {"type": "Plain", "text": "x"},
+            ],
+            "subject": {"id": 5, "nickname": "n", "remark": "r"},
+        }
+    )
+    decoded = decode_message(encode_message(active))
+    assert isinstance(decoded, ActiveFriendMessage) and decoded == active
+
+
+def test_message_cache():
+    size = len(encode_message(make_message(0)))
+    cache = MessageCache(max_size=3, max_bytes=size * 2)
+    for message_id in range(3):
+        cache.set(make_message(message_id))
+    assert cache.get(0) is None
+    assert cache.get(2) == make_message(2)
+    cache.set(make_message(3, "a much longer message"))
+    assert cache.get(2) is None and cache.get(3) is not None
+    cache.delete(3)
+    assert cache.stats == CacheStats(hits=2, misses=2, evictions=3, expirations=0, size=0, bytes=0)
+
+
+class WarmupApp:
+    def __init__(self, groups: int) -> None:
+        self.account = 1
+        self.connection = Dummy()
+        self.relationship_cache = RelationshipCache()
+        self.groups = [make_group(i) for i in range(groups)]
+        self.running = self.max_running = 0
+
+    async def get_friend_list(self):
+        return []
+
+    async def get_group_list(self):
+        self.relationship_cache.set_groups(self.groups)
+        return self.groups
+
+    async def get_member_list(self, group: Group):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if group.id == 3:
+            raise ValueError(group)
+        self.relationship_cache.set_members([make_member(group.id, 1)])
+
+
+@pytest.mark.asyncio
+async def test_cache_warmup():
+    app = WarmupApp(10)
+    warmup = CacheWarmup(app, WarmupConfig(members=True, concurrency=3))  # type: ignore
+    assert warmup.duration is None
+    warmup.start()
+    await asyncio.wait_for(warmup.task, 1)
+    assert (warmup.total, warmup.done, warmup.failed) == (10, 10, 1)
+    assert app.max_running == 3
+    assert [g.id for g in app.relationship_cache.groups_of(1)] == [i for i in range(10) if i != 3]
+    assert warmup.duration == warmup.finished - warmup.started
+
+    app = WarmupApp(5)
+    warmup = CacheWarmup(app, WarmupConfig(members=True, concurrency=5, rate=100))  # type: ignore
+    await warmup.run()
+    assert warmup.duration >= 0.04
+    assert app.max_running < 5
+
+    app = WarmupApp(5)
+    warmup = CacheWarmup(app, WarmupConfig())  # type: ignore
+    await warmup.run()
+    assert warmup.total == 0 and app.relationship_cache.get_group(4) is not None
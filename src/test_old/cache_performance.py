@@ -0,0 +1,116 @@
+import asyncio
+import time
+import tracemalloc
+from typing import List
+
+from graia.amnesia.builtins.memcache import Memcache
+
+from graia.ariadne.connection.util import build_event
+from graia.ariadne.model import Member
+from graia.ariadne.util.cache import MessageCache, RelationshipCache
+
+RUN = 50
+ACCOUNT = 1
+MESSAGES = 5000
+
+
+async def memcache_store(cache: Memcache, group_id: int, members: List[Member]) -> None:
+    await asyncio.gather(
+        cache.set(f"account.{ACCOUNT}.group.{group_id}", members[0].group),
+        *(cache.set(f"account.{ACCOUNT}.group.{group_id}.member.{int(i)}", i) for i in members),
+    )
+
+
+async def memcache_lookup(cache: Memcache, group_id: int, members: List[Member]) -> None:
+    for member in members:
+        await cache.get(f"account.{ACCOUNT}.group.{group_id}.member.{int(member)}")
+
+
+def make_message(message_id: int) -> dict:
+    return {
+        "type": "GroupMessage",
+        "messageChain": [
+            {"type": "Source", "id": message_id, "time": 1650000000},
+            {"type": "Plain", "text": f"message {message_id} " * 8},
+            {"type": "At", "target": 1, "display": ""},
+            {"type": "Image", "imageId": "{01E9451B-70ED-EAE3-B37C-101F1EEBF5B5}.jpg", "url": "https://a/b"},
+        ],
+        "sender": {
+            "id": 1,
+            "memberName": "member",
+            "permission": "MEMBER",
+            "group": {"id": 12345, "name": "group", "permission": "MEMBER"},
+        },
+    }
+
+
+def relationship_lookup(cache: RelationshipCache, group_id: int, members: List[Member]) -> None:
+    for member in members:
+        cache.get_member(group_id, member.id)
+
+
+if __name__ == "__main__":
+    group = {"id": 12345, "name": "group", "permission": "MEMBER"}
+    members = [
+        Member.parse_obj({"id": i, "memberName": f"m{i}", "permission": "MEMBER", "group": group})
+        for i in range(3000)
+    ]
+
+    async def main():
+        memcache = Memcache({}, [])
+        st = time.time()
+        for _ in range(RUN):
+            await memcache_store(memcache, 12345, members)
+        print(f"Memcache store: {RUN / (time.time() - st):.2f} lists/s, {len(members)} members")
+        st = time.time()
+        for _ in range(RUN):
+            await memcache_lookup(memcache, 12345, members)
+        print(f"Memcache lookup: {RUN * len(members) / (time.time() - st):.2f} lookups/s")
+
+        cache = RelationshipCache()
+        st = time.time()
+        for _ in range(RUN):
+            cache.delete_members(12345)
+            cache.set_members(members)
+        print(f"RelationshipCache store: {RUN / (time.time() - st):.2f} lists/s, {len(members)} members")
+        st = time.time()
+        for _ in range(RUN):
+            relationship_lookup(cache, 12345, members)
+        print(f"RelationshipCache lookup: {RUN * len(members) / (time.time() - st):.2f} lookups/s")
+
+    asyncio.run(main())
+
+    def received():
+        for i in range(MESSAGES):
+            event = build_event(make_message(i))
+            event.message_chain.__root__  # events are usually materialized by the time they are cached
+            yield event
+
+    async def store_memcache():
+        memcache = Memcache({}, [])
+        for event in received():
+            await memcache.set(f"account.{ACCOUNT}.message.{int(event)}", event)
+        return memcache
+
+    tracemalloc.start()
+    memcache = asyncio.run(store_memcache())
+    print(f"Memcache: {MESSAGES} messages, {tracemalloc.get_traced_memory()[0] / 1024:.0f} KiB")
+    tracemalloc.stop()
+    del memcache
+
+    events = list(received())
+    tracemalloc.start()
+    message_cache = MessageCache(compress_threshold=1024)
+    st = time.time()
+    for event in events:
+        message_cache.set(event)
+    sec = time.time() - st
+    print(
+        f"MessageCache: {MESSAGES} messages, {tracemalloc.get_traced_memory()[0] / 1024:.0f} KiB, "
+        f"{MESSAGES / sec:.2f} msg/s encoded"
+    )
+    tracemalloc.stop()
+    st = time.time()
+    for i in range(MESSAGES):
+        message_cache.get(i)
+    print(f"MessageCache: {MESSAGES / (time.time() - st):.2f} msg/s decoded, {message_cache.stats}")
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import time
+from datetime import datetime
+
+from graia.ariadne.message.chain import ELEMENT_MAPPING, MessageChain
+from graia.ariadne.message.element import At, Face, Forward, ForwardNode, Image, Plain
+
+
+def bench(name: str, func, run: int) -> None:
+    st = time.time()
+    for _ in range(run):
+        func()
+    ed = time.time()
+    print(f"{name}: {run / (ed - st):.2f}op/s")
+
+
+if __name__ == "__main__":
+    typical = MessageChain(["Hello ", At(12345), " world", Face(1, "微笑"), Image(url="https://example.com")])
+    long_text = MessageChain([Plain("长文本" * 20), *(At(i) for i in range(500))])
+    forward = MessageChain(
+        [Forward([ForwardNode(i, datetime.now(), typical, f"user{i}") for i in range(200)])],
+    )
+
+    for title, chain, run in (
+        ("Typical", typical, 20000),
+        ("Long", long_text, 200),
+        ("Forward", forward, 200),
+    ):
+        print(f"{title}:")
+        assert chain.to_wire() == chain.dict()["__root__"]
+        bench("  dict()", lambda: chain.dict()["__root__"], run)
+        bench("  to_wire()", chain.to_wire, run)
+        wire = chain.to_wire()
+        bench("  parse_obj", lambda: [ELEMENT_MAPPING[o["type"]].parse_obj(o) for o in wire], run)
+        bench("  build_chain", lambda: MessageChain.build_chain(wire), run)
+        bench("  lazy", lambda: MessageChain.lazy(wire), run)
@@ -10,6 +10,19 @@ from graia.ariadne.util import Dummy
 
 RUN = 10000
 
+
+async def measure(cmd: Commander, msg: MessageChain, handles: int, title: str, run: int = RUN) -> None:
+    sec: float = 0.0
+
+    for _ in range(run):
+        st = time.time()
+        await cmd.execute(msg)
+        ed = time.time()
+        sec += ed - st
+
+    print(f"{title}: {run*handles/sec} loop/s per handler, {run} loops, {handles} handlers")
+
+
 if __name__ == "__main__":
 
     async def m():
@@ -39,14 +52,34 @@ if __name__ == "__main__":
 
         cmd.broadcast.Executor = a
 
-        sec: float = 0.0
+        await measure(cmd, msg, handles, "Commander")
+
+        for count in (1, handles):
+            cmd = Commander(Broadcast(loop=asyncio.get_running_loop()))
+
+            for _ in range(count):
+
+                @cmd.command(".test foo bar fox mop {v}")
+                def _(v: At):
+                    ...
+
+            await measure(cmd, msg, count, "Commander (Executor)", RUN // 10)
+
+        for annotation in (At, int, str, MessageChain):
+            cmd = Commander(Broadcast(loop=asyncio.get_running_loop()))
+            cmd.broadcast.Executor = a
+            msg = MessageChain(".cast ", At(123) if annotation is At else "123", " 1 2 3 --flag")
+
+            for _ in range(handles):
 
-        for _ in range(RUN):
-            st = time.time()
-            await cmd.execute(msg)
-            ed = time.time()
-            sec += ed - st
+                @cmd.command(".cast {v} {...rest}", {"flag": Arg("--flag")})
+                def _(v: annotation, rest: int, flag: bool):  # type: ignore
+                    ...
 
-        print(f"Commander: {RUN*handles/sec} loop/s per handler, {RUN} loops, {handles} handlers")
+            await measure(cmd, msg, handles, f"Commander ({annotation.__name__}, casters)", RUN // 10)
+            slots = [slot for entry in cmd.entries for slot in (*entry.slot_map.values(), entry.wildcard)]
+            for desc in (*slots, *(arg for entry in cmd.entries for arg in entry.arg_map.values())):
+                desc.caster = None
+            await measure(cmd, msg, handles, f"Commander ({annotation.__name__}, pydantic)", RUN // 10)
 
     asyncio.run(m())
@@ -0,0 +1,50 @@
+import difflib
+import random
+import time
+from typing import List, Tuple
+
+from graia.ariadne.message.parser.util import FuzzyIndex
+
+
+def difflib_best(text: str, templates: List[str]) -> Tuple[str, float]:
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(text)
+    result, max_match = (templates[-1], 0.0), 0.0
+    for template in templates:
+        matcher.set_seq1(template)
+        if matcher.real_quick_ratio() < max_match:
+            continue
+        if matcher.quick_ratio() < max_match:
+            continue
+        if matcher.ratio() < max_match:
+            continue
+        result = (template, matcher.ratio())
+        max_match = matcher.ratio()
+    return result
+
+
+def bench(name: str, func, messages: List[str], run: int) -> None:
+    st = time.time()
+    for _ in range(run):
+        for message in messages:
+            func(message)
+    ed = time.time()
+    print(f"{name}: {run * len(messages) / (ed - st):.2f}msg/s")
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    words = ["怎么", "如何", "安装", "配置", "账号", "登录", "发送", "消息", "图片", "插件", "报错", "更新", "版本"]
+    words += ["mirai", "http", "ws", "api", "token", "qq", "bot", "group"]
+    templates = ["".join(rand.choices(words, k=rand.randint(3, 7))) for _ in range(500)]
+    messages = [t[: rand.randint(2, len(t))] + rand.choice(words) for t in rand.sample(templates, 50)]
+
+    index = FuzzyIndex(cache_size=0)
+    for template in templates:
+        index.add(template)
+
+    print(f"{len(templates)} templates, {len(messages)} messages:")
+    bench("  difflib scan", lambda m: difflib_best(m, templates), messages, 2)
+    bench("  FuzzyIndex", index.best, messages, 20)
+    index.cache_size = len(messages)
+    bench("  FuzzyIndex (cached)", index.best, messages, 200)
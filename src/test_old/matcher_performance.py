@@ -0,0 +1,70 @@
+import asyncio
+import random
+import time
+
+from graia.broadcast.exceptions import ExecutionStop
+
+from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.message.element import At
+from graia.ariadne.message.parser.base import ContainKeyword, DetectPrefix
+
+RUN = 20
+
+
+async def run_decorators(decorators, chains) -> int:
+    passed = 0
+    for chain in chains:
+        for decorator in decorators:
+            try:
+                await decorator(chain, None)
+                passed += 1
+            except ExecutionStop:
+                pass
+    return passed
+
+
+def scan(chains, keywords, prefixes) -> int:
+    passed = 0
+    for chain in chains:
+        passed += sum(keyword in chain for keyword in keywords)
+        passed += sum(chain.startswith(prefix) for prefix in prefixes)
+    return passed
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    chars = "的一是不了人我在有他这为之大来以个中上们到说时要就出会可也你对生能而子那得于着下自之年过发后作里"
+    keywords = list({"".join(rand.choices(chars, k=rand.randint(2, 4))) for _ in range(3000)})
+    prefixes = list({"." + "".join(rand.choices("abcdefgh", k=rand.randint(2, 6))) for _ in range(500)})
+    texts = ["".join(rand.choices(chars, k=40)) for _ in range(20)]
+    chains = [MessageChain(rand.choice(prefixes) + " " + text, At(1), text) for text in texts]
+
+    decorators = [ContainKeyword(k) for k in keywords] + [DetectPrefix(p) for p in prefixes]
+    handlers = len(decorators)
+
+    async def main():
+        fresh = lambda: [MessageChain(chain.content, inline=True) for chain in chains]  # noqa: E731
+        assert await run_decorators(decorators, fresh()) == scan(fresh(), keywords, prefixes)
+
+        st = time.time()
+        for _ in range(RUN // 10):
+            scan(fresh(), keywords, prefixes)
+        sec = time.time() - st
+        print(f"Per-listener scan: {RUN // 10 * len(chains) / sec:.2f} msg/s, {handlers} handlers")
+
+        st = time.time()
+        for _ in range(RUN):
+            await run_decorators(decorators, fresh())
+        sec = time.time() - st
+        print(f"Shared automaton: {RUN * len(chains) / sec:.2f} msg/s, {handlers} handlers")
+
+        matcher = ContainKeyword.matcher
+        st = time.time()
+        for _ in range(RUN):
+            for chain in fresh():
+                matcher.keywords(chain)
+                matcher.prefixes(chain)
+        sec = time.time() - st
+        print(f"Automaton pass only: {RUN * len(chains) / sec:.2f} msg/s")
+
+    asyncio.run(main())
@@ -15,6 +15,7 @@ from graia.ariadne.message.element import At, Plain
 from graia.ariadne.message.parser.twilight import (
     ArgumentMatch,
     FullMatch,
+    ParamMatch,
     Sparkle,
     Twilight,
     WildcardMatch,
@@ -50,3 +51,45 @@ if __name__ == "__main__":
     ed = time.time()
 
     print(f"Twilight: {RUN / (ed-st):.2f}msg/s")
+
+    print("Run 3:")
+
+    twi = Twilight(
+        [
+            FullMatch(".test"),
+            "foo" @ ArgumentMatch("--foo", "-f"),
+            "bar" @ ArgumentMatch("--bar", action="store_true"),
+            "baz" @ ArgumentMatch("--baz", nargs="+", type=int, default=None),
+            WildcardMatch(),
+        ]
+    )
+    msg = MessageChain(".test --foo ", At(123), " --baz 1 2 3 --bar rest")
+    parser = twi.matcher._option_parser
+
+    debug(twi.generate(msg))
+
+    for name, option_parser in (("argparse", twi.matcher._parser), ("compiled", parser)):
+        twi.matcher._option_parser = option_parser
+        st = time.time()
+        for _ in range(RUN):
+            twi.generate(msg)
+        ed = time.time()
+
+        print(f"Twilight ({name}): {RUN / (ed-st):.2f}msg/s")
+
+    print("Run 4:")
+
+    twi = Twilight([FullMatch(".test"), *(f"p{i}" @ ParamMatch(optional=True) for i in range(8))])
+    msg = MessageChain(".test a b c d ", At(123), " e f g")
+
+    debug(twi.generate(msg))
+
+    for name, names in (("first param", ["p0"]), ("all params", [f"p{i}" for i in range(8)])):
+        st = time.time()
+        for _ in range(RUN):
+            sparkle = twi.generate(msg)
+            for param in names:
+                sparkle[param].result
+        ed = time.time()
+
+        print(f"Twilight ({name}): {RUN / (ed-st):.2f}msg/s")
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..", "test", "message")))
+
+import time
+
+from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.message.commander.util import _split as commander_split
+from graia.ariadne.message.parser.util import split
+
+from split import reference_commander_split, reference_split  # isort: skip
+
+
+def bench(name: str, func, run: int) -> None:
+    st = time.time()
+    for _ in range(run):
+        func()
+    ed = time.time()
+    print(f"{name}: {run / (ed - st):.2f}op/s")
+
+
+if __name__ == "__main__":
+    plain = "这是一段很长的粘贴文本 with some words " * 100
+    quoted = ("这是一段很长的粘贴文本 with some words " * 5 + "'a quoted phrase' \\\" ") * 25
+    dense = "say 'hello world' to \"every one\" and \\'escape\\' " * 100
+
+    for title, text in (("Plain", plain), ("Quoted", quoted), ("Dense quotes", dense)):
+        print(f"{title} ({len(text.encode())} bytes):")
+        chain = MessageChain(text)
+        assert split(text, True) == reference_split(text, True)
+        assert commander_split(chain) == reference_commander_split(chain)
+        bench("  Twilight split (char loop)", lambda: reference_split(text, True), 200)
+        bench("  Twilight split (scanner)", lambda: split(text, True), 200)
+        bench("  Commander split (char loop)", lambda: reference_commander_split(chain), 200)
+        bench("  Commander split (scanner)", lambda: commander_split(chain), 200)
@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import time
+
+from graia.ariadne.message.chain import MessageChain
+from graia.ariadne.message.element import At
+from graia.ariadne.message.parser.twilight import (
+    FullMatch,
+    ParamMatch,
+    Twilight,
+    UnionMatch,
+    WildcardMatch,
+)
+
+COMMANDS = 500
+RUN = 200
+
+
+def dispatch(twilights, chain: MessageChain, check: bool) -> int:
+    matched = 0
+    for twi in twilights:
+        if check and not twi.accepts(chain):
+            continue
+        try:
+            twi.generate(chain)
+        except Exception:
+            continue
+        matched += 1
+    return matched
+
+
+if __name__ == "__main__":
+    twilights = []
+    for i in range(COMMANDS):
+        if i % 3 == 0:
+            twilights.append(Twilight(FullMatch(f".cmd{i}"), "arg" @ ParamMatch()))
+        elif i % 3 == 1:
+            twilights.append(Twilight(UnionMatch(f".cmd{i}", f"/cmd{i}"), WildcardMatch()))
+        else:
+            twilights.append(Twilight(FullMatch(f".cmd{i}"), FullMatch("list")))
+
+    messages = [
+        MessageChain(".cmd300 foo"),
+        MessageChain("/cmd301 ", At(123), " bar"),
+        MessageChain("hello world"),
+        MessageChain(".unknown command"),
+    ]
+
+    for chain in messages:
+        assert dispatch(twilights, chain, False) == dispatch(twilights, chain, True)
+
+    for check in (False, True):
+        st = time.time()
+        for _ in range(RUN):
+            for chain in messages:
+                # a fresh chain per event, as dispatched by the broadcast
+                dispatch(twilights, MessageChain(chain.__root__), check)
+        ed = time.time()
+        print(f"{'index' if check else 'generate'}: {RUN * len(messages) / (ed-st):.2f}msg/s")